@@ -12,7 +12,7 @@ module package.
 from src.main import *  # noqa: F401,F403 – re-export everything
 
 if __name__ == "__main__":
-    from src.main import mcp  # pylint: disable=wrong-import-position
+    from src.main import main  # pylint: disable=wrong-import-position
 
-    mcp.run()
+    main()
 
@@ -19,21 +19,39 @@ file (see `models.py`, `hercules_manager.py`, and `main.py`).
 
 from __future__ import annotations
 
+import importlib
+
 # Re-export the important symbols so that users can simply write
 # `from src import HerculesManager`.
+#
+# Everything is imported on first access rather than here: `python -m
+# src.<module>` imports this package first, and anything it imported
+# eagerly would be loaded a second time as `__main__` (runpy warns about
+# exactly that).  It also keeps FastMCP out of processes that never serve.
 
 # Public re-exports ----------------------------------------------------------------
 
-from .hercules_manager import HerculesManager  # noqa: F401
-from .models import TestCase, TestResult  # noqa: F401
-
-# Lazily import the FastMCP server setup – this has the happy side effect
-# of not importing heavy dependencies (FastAPI, etc.) unless the caller
-# explicitly needs the server.
-
-try:
-    from .main import mcp  # noqa: F401
-except Exception:  # pragma: no cover – FastMCP is optional in the sandbox
-    # If the import fails we silently ignore it.  The manager class is the
-    # only thing the tests really need.
-    mcp = None  # type: ignore
+_EXPORTS = {
+    "HerculesManager": ".hercules_manager",
+    "TestCase": ".models",
+    "TestResult": ".models",
+}
+
+__all__ = [*_EXPORTS, "mcp"]
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    elif name == "mcp":
+        # The FastMCP server setup
+        try:
+            from .main import mcp as value
+        except Exception:  # pragma: no cover – FastMCP is optional in the sandbox
+            # If the import fails we silently ignore it.  The manager class is
+            # the only thing the tests really need.
+            value = None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
@@ -0,0 +1,290 @@
+"""Content-addressed storage for binary run artifacts.
+
+Hercules leaves screenshots (and sometimes videos, traces, etc.) behind
+after a run.  Inlining those into `TestResult` would make every MCP
+response huge, so instead each file is stored once under its SHA-256
+digest and results only carry `hercules://artifacts/<digest>` URIs that
+clients can fetch as MCP resources.
+
+Identical blobs produced by different runs are stored only once.  Disk
+use is bounded by a quota; when it is exceeded the oldest blobs that are
+no longer referenced by any result are collected first.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_URI_PREFIX = "hercules://artifacts/"
+
+DEFAULT_QUOTA_BYTES = 1024 * 1024 * 1024  # 1 GiB
+DEFAULT_MMAP_THRESHOLD = 1024 * 1024  # open() mmaps files above this
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Magic numbers for the formats Hercules (Playwright) actually produces
+_MAGIC_TYPES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),  # playwright traces
+]
+
+
+def sniff_mime_type(head: bytes) -> str:
+    """Guess a MIME type from the first few bytes of a blob."""
+    for magic, mime_type in _MAGIC_TYPES:
+        if head.startswith(magic):
+            return mime_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp":
+        return "video/mp4"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "video/webm"
+    return "application/octet-stream"
+
+
+def digest_from_uri(uri: str) -> str:
+    """Extract the digest from an artifact URI (bare digests pass through)."""
+    digest = uri[len(ARTIFACT_URI_PREFIX):] if uri.startswith(ARTIFACT_URI_PREFIX) else uri
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise ValueError(f"Invalid artifact reference: {uri}")
+    return digest
+
+
+class ArtifactStore:
+    """Deduplicating on-disk blob store with a size quota."""
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        *,
+        quota_bytes: Optional[int] = None,
+        mmap_threshold: int = DEFAULT_MMAP_THRESHOLD,
+    ):
+        if root is None:
+            root = os.getenv("HERCULES_ARTIFACT_DIR") or (
+                Path(tempfile.gettempdir()) / "hercules_artifacts"
+            )
+        if quota_bytes is None:
+            quota_mb = os.getenv("HERCULES_ARTIFACT_QUOTA_MB")
+            quota_bytes = int(float(quota_mb) * 1024 * 1024) if quota_mb else DEFAULT_QUOTA_BYTES
+
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.mmap_threshold = mmap_threshold
+
+        self._blob_dir = self.root / "blobs"
+        self._tmp_dir = self.root / "tmp"
+        self._lock = threading.Lock()
+        self._usage: Optional[int] = None  # computed lazily on first need
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store a blob and return its artifact URI."""
+        digest = hashlib.sha256(data).hexdigest()
+        target = self._blob_path(digest)
+        if self._touch_existing(target):
+            return self.uri_for(digest)
+
+        self._write_atomic(target, [data])
+        return self.uri_for(digest)
+
+    def put_file(self, path: str | Path) -> str:
+        """Store a file's contents and return its artifact URI.
+
+        The file is hashed and copied in chunks so large videos never
+        have to fit in memory.
+        """
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, "rb") as src:
+                while chunk := src.read(_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    out.write(chunk)
+
+            digest = hasher.hexdigest()
+            target = self._blob_path(digest)
+            if self._touch_existing(target):
+                return self.uri_for(digest)
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, target)
+            tmp_name = None
+            self._add_usage(target.stat().st_size)
+            return self.uri_for(digest)
+        finally:
+            if tmp_name is not None and os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def exists(self, uri: str) -> bool:
+        return self._blob_path(digest_from_uri(uri)).exists()
+
+    @contextmanager
+    def open(self, uri: str) -> Iterator[memoryview]:
+        """Yield a read-only view of an artifact.
+
+        Blobs above `mmap_threshold` are memory-mapped so only the pages a
+        caller actually touches are read from disk.  That only pays off for
+        callers that look at part of a blob; use `read()` for all of it.
+        """
+        path = self._existing_path(uri)
+        size = path.stat().st_size
+
+        if size < self.mmap_threshold or size == 0:
+            yield memoryview(path.read_bytes())
+            return
+
+        with open(path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def read(self, uri: str) -> bytes:
+        """The whole artifact.
+
+        A plain read: MCP resources are sent base64-encoded in one message,
+        so every page would be touched and copied out of a mapping anyway.
+        """
+        return self._existing_path(uri).read_bytes()
+
+    def stat(self, uri: str) -> Dict[str, object]:
+        """Size and sniffed MIME type of an artifact."""
+        path = self._existing_path(uri)
+        with open(path, "rb") as fh:
+            head = fh.read(16)
+        return {
+            "uri": self.uri_for(path.name),
+            "size": path.stat().st_size,
+            "mime_type": sniff_mime_type(head),
+        }
+
+    # ------------------------------------------------------------------
+    # Quota / GC
+    # ------------------------------------------------------------------
+
+    def usage(self) -> int:
+        """Total bytes currently held in the blob store."""
+        with self._lock:
+            if self._usage is None:
+                self._usage = sum(size for _, size, _ in self._scan())
+            return self._usage
+
+    def over_quota(self) -> bool:
+        return self.usage() > self.quota_bytes
+
+    def collect_garbage(self, referenced: Iterable[str] = ()) -> List[str]:
+        """Delete blobs until the store fits in its quota.
+
+        Unreferenced blobs go first, oldest first.  If that still isn't
+        enough, referenced blobs are evicted too (again oldest first) –
+        the quota is a hard limit and a dangling screenshot URI is better
+        than a full disk.  Returns the URIs that were removed.
+        """
+        keep = {digest_from_uri(uri) for uri in referenced}
+        removed: List[str] = []
+
+        with self._lock:
+            blobs = self._scan()
+            usage = sum(size for _, size, _ in blobs)
+
+            # Unreferenced first, then by age
+            blobs.sort(key=lambda b: (b[0].name in keep, b[2]))
+            for path, size, _ in blobs:
+                if usage <= self.quota_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                usage -= size
+                removed.append(self.uri_for(path.name))
+
+            self._usage = usage
+
+        if removed:
+            logger.info(f"Artifact GC removed {len(removed)} blob(s)")
+        return removed
+
+    @staticmethod
+    def uri_for(digest: str) -> str:
+        return f"{ARTIFACT_URI_PREFIX}{digest}"
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blob_dir / digest[:2] / digest
+
+    def _existing_path(self, uri: str) -> Path:
+        path = self._blob_path(digest_from_uri(uri))
+        if not path.exists():
+            raise FileNotFoundError(f"Artifact not found: {uri}")
+        return path
+
+    def _touch_existing(self, target: Path) -> bool:
+        """Refresh the mtime of an already-stored blob (dedup hit)."""
+        try:
+            os.utime(target)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _write_atomic(self, target: Path, chunks: List[bytes]) -> None:
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+            os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        self._add_usage(target.stat().st_size)
+
+    def _add_usage(self, size: int) -> None:
+        with self._lock:
+            if self._usage is not None:
+                self._usage += size
+
+    def _scan(self) -> List[Tuple[Path, int, float]]:
+        blobs = []
+        if not self._blob_dir.exists():
+            return blobs
+        for shard in os.scandir(self._blob_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                blobs.append((Path(entry.path), st.st_size, st.st_mtime))
+        return blobs
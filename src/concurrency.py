@@ -0,0 +1,285 @@
+"""Adaptive limit on concurrent Hercules runs.
+
+A fixed `max_parallel` is either too cautious for light tests or swamps
+the box with heavy ones.  `AdaptiveLimiter` is a counting semaphore whose
+limit is steered by an AIMD controller (as in TCP congestion control):
+while the host looks healthy and the limit is actually being used it
+grows by one per interval; as soon as the host looks overloaded it is
+cut multiplicatively.
+
+"Overloaded" means any of:
+
+- 1-minute load average per CPU above `target_load`
+- less than `min_free_memory` of RAM available
+- recent runs slower than usual - each run's duration is compared to
+  that test's own moving average, so slow tests don't look like
+  congestion - by more than `latency_tolerance`
+- more than `max_error_rate` of recent runs ending in `error`
+
+Every evaluation is kept in `decisions()` so the thresholds can be tuned
+against what the controller actually saw.
+
+This sits in front of the machine-wide `HostSlotLimiter`, which remains
+the hard cap across servers.
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (load per CPU, fraction of memory available); None where unknown
+LoadSample = Tuple[Optional[float], Optional[float]]
+
+
+def sample_host_load() -> LoadSample:
+    """1-minute load average per CPU and available memory fraction."""
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        load = None
+
+    free_memory = None
+    try:
+        with open("/proc/meminfo") as fh:
+            meminfo = {}
+            for line in fh:
+                key, _, rest = line.partition(":")
+                meminfo[key] = int(rest.split()[0])
+        free_memory = meminfo["MemAvailable"] / meminfo["MemTotal"]
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        pass
+    return load, free_memory
+
+
+class AdaptiveLimiter:
+    """Semaphore with an AIMD-controlled limit, usable from any event loop."""
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        *,
+        initial: Optional[int] = None,
+        target_load: float = 1.0,
+        min_free_memory: float = 0.15,
+        latency_tolerance: float = 1.5,
+        max_error_rate: float = 0.2,
+        decrease_factor: float = 0.5,
+        interval: float = 5.0,
+        window: int = 20,
+        sampler: Callable[[], LoadSample] = sample_host_load,
+    ):
+        if max_limit is None:
+            max_limit = os.cpu_count() or 2
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.target_load = target_load
+        self.min_free_memory = min_free_memory
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.decrease_factor = decrease_factor
+        self.interval = interval
+        self._sampler = sampler
+
+        self._lock = threading.Lock()
+        self._limit = min(self.max_limit, max(self.min_limit, initial or self.min_limit))
+        self._in_flight = 0
+        self._peak_in_flight = 0  # since the last evaluation
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+        self._baselines: Dict[str, float] = {}  # test_id -> EWMA duration
+        self._latency_ratios: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = no error
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self._last_evaluation = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> Optional["AdaptiveLimiter"]:
+        """Build from `HERCULES_ADAPTIVE_*` vars, or None if not enabled."""
+        if os.getenv("HERCULES_ADAPTIVE_CONCURRENCY", "").lower() not in ("1", "true", "yes"):
+            return None
+        env = os.environ
+        max_limit = env.get("HERCULES_ADAPTIVE_MAX")
+        return cls(
+            int(env.get("HERCULES_ADAPTIVE_MIN", "1")),
+            int(max_limit) if max_limit else None,
+            target_load=float(env.get("HERCULES_ADAPTIVE_TARGET_LOAD", "1.0")),
+            min_free_memory=float(env.get("HERCULES_ADAPTIVE_MIN_FREE_MEM", "0.15")),
+            interval=float(env.get("HERCULES_ADAPTIVE_INTERVAL", "5")),
+        )
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # ------------------------------------------------------------------
+    # Semaphore
+    # ------------------------------------------------------------------
+
+    async def acquire(self) -> None:
+        self._maybe_evaluate()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_flight < self._limit and not self._waiters:
+                self._take_locked()
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                except ValueError:
+                    # Already granted; if the grant landed before the cancel
+                    # nobody else will give the slot back
+                    if future.done() and not future.cancelled():
+                        self._release_locked()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._release_locked()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _take_locked(self) -> None:
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _release_locked(self) -> None:
+        self._in_flight -= 1
+        self._wake_locked()
+
+    def _wake_locked(self) -> None:
+        while self._waiters and self._in_flight < self._limit:
+            loop, future = self._waiters.popleft()
+            self._take_locked()
+            try:
+                loop.call_soon_threadsafe(self._grant, future)
+            except RuntimeError:  # that loop is closed
+                self._in_flight -= 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():  # waiter was cancelled in the meantime
+            self.release()
+        else:
+            future.set_result(None)
+
+    # ------------------------------------------------------------------
+    # Controller
+    # ------------------------------------------------------------------
+
+    def record(self, test_id: str, duration: Optional[float], errored: bool) -> None:
+        """Feed back how a run went."""
+        with self._lock:
+            self._outcomes.append(not errored)
+            if duration is not None and duration > 0 and not errored:
+                baseline = self._baselines.get(test_id)
+                if baseline:
+                    self._latency_ratios.append(duration / baseline)
+                    self._baselines[test_id] = 0.8 * baseline + 0.2 * duration
+                else:
+                    self._baselines[test_id] = duration
+        self._maybe_evaluate()
+
+    def evaluate(self) -> Dict[str, Any]:
+        """Run one controller step now and return the decision."""
+        load, free_memory = self._sampler()
+        with self._lock:
+            error_rate = (
+                1 - sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+            )
+            latency_ratio = (
+                statistics.median(self._latency_ratios) if self._latency_ratios else None
+            )
+
+            reasons = []
+            if load is not None and load > self.target_load:
+                reasons.append(f"load {load:.2f}/cpu > {self.target_load}")
+            if free_memory is not None and free_memory < self.min_free_memory:
+                reasons.append(f"free memory {free_memory:.0%} < {self.min_free_memory:.0%}")
+            if latency_ratio is not None and latency_ratio > self.latency_tolerance:
+                reasons.append(f"runs {latency_ratio:.2f}x slower than usual")
+            if len(self._outcomes) >= 3 and error_rate > self.max_error_rate:
+                reasons.append(f"error rate {error_rate:.0%} > {self.max_error_rate:.0%}")
+
+            old_limit = self._limit
+            if reasons:
+                self._limit = max(self.min_limit, int(self._limit * self.decrease_factor))
+                action = "decrease"
+                # Judge the new limit on fresh runs only
+                self._latency_ratios.clear()
+                self._outcomes.clear()
+            elif self._peak_in_flight >= self._limit:
+                self._limit = min(self.max_limit, self._limit + 1)
+                action = "increase"
+                reasons.append("healthy and limit reached")
+            else:
+                action = "hold"
+                reasons.append("healthy, limit not reached")
+            if self._limit == old_limit and action != "hold":
+                action = "hold"
+                reasons.append("at bound")
+
+            decision = {
+                "at": datetime.now().isoformat(),
+                "action": action,
+                "old_limit": old_limit,
+                "new_limit": self._limit,
+                "reasons": reasons,
+                "load_per_cpu": load,
+                "free_memory": free_memory,
+                "latency_ratio": latency_ratio,
+                "error_rate": error_rate,
+                "in_flight": self._in_flight,
+            }
+            self._decisions.append(decision)
+            self._peak_in_flight = self._in_flight
+            self._last_evaluation = time.monotonic()
+            self._wake_locked()  # a raised limit may admit waiters
+
+        if action != "hold":
+            logger.info(f"Concurrency limit {old_limit} -> {self._limit}: {'; '.join(reasons)}")
+        return decision
+
+    def decisions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent controller decisions, oldest first."""
+        with self._lock:
+            decisions = list(self._decisions)
+        return decisions[-limit:] if limit else decisions
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self._limit,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+            }
+
+    def _maybe_evaluate(self) -> None:
+        if time.monotonic() - self._last_evaluation >= self.interval:
+            self.evaluate()
@@ -0,0 +1,275 @@
+"""Long-running local daemon behind `vscode_plugin.py`.
+
+Every VSCode task used to start a fresh interpreter with its own empty
+`HerculesManager`, so a test created by one click was gone by the next.
+The daemon keeps one manager alive and serves it over a Unix domain
+socket; the plugin is a thin stdlib-only client that starts the daemon
+on first use.
+
+The protocol is one JSON object per line in each direction:
+
+    -> {"action": "run", "args": {"test_id": "..."}}
+    <- {"ok": true, "result": {...}}
+    <- {"ok": false, "error": "..."}
+
+Only one daemon runs per socket: it holds an exclusive `flock` on
+`<socket>.lock` for its whole life, so two clients racing to auto-start
+it can't end up with two servers.  The daemon exits after
+`HERCULES_DAEMON_IDLE` seconds without a request.
+
+    python -m src.daemon [--socket PATH] [--idle-timeout SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from .hercules_manager import HerculesManager
+from .models import to_json_dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 30 * 60  # seconds
+
+
+def default_socket_path() -> Path:
+    """`$HERCULES_DAEMON_SOCKET`, else a per-user socket in the runtime dir."""
+    env_path = os.getenv("HERCULES_DAEMON_SOCKET")
+    if env_path:
+        return Path(env_path)
+    base = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(base) / f"hercules-daemon-{os.getuid()}.sock"
+
+
+class HerculesDaemon:
+    """Serves one shared `HerculesManager` over a Unix socket."""
+
+    def __init__(
+        self,
+        socket_path: str | Path | None = None,
+        manager: Optional[HerculesManager] = None,
+        *,
+        idle_timeout: Optional[float] = None,
+    ):
+        if idle_timeout is None:
+            env_idle = os.getenv("HERCULES_DAEMON_IDLE")
+            idle_timeout = float(env_idle) if env_idle else DEFAULT_IDLE_TIMEOUT
+
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self._manager = manager
+        self.idle_timeout = idle_timeout
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._last_request = time.monotonic()
+        self._active = 0
+
+        self._actions: Dict[str, Callable[..., Awaitable[Any]]] = {
+            "ping": self._ping,
+            "create": self._create,
+            "list": self._list,
+            "run": self._run,
+            "result": self._result,
+            "delete": self._delete,
+            "shutdown": self._shutdown,
+        }
+
+    @property
+    def manager(self) -> HerculesManager:
+        """The served manager; a daemon that loses the socket never builds one."""
+        if self._manager is None:
+            self._manager = HerculesManager()
+        return self._manager
+
+    async def serve(self) -> bool:
+        """Serve until shutdown or idle timeout.
+
+        Returns False without serving if another daemon owns the socket.
+        """
+        if not self._claim():
+            logger.info(f"Another daemon already serves {self.socket_path}")
+            return False
+
+        # Only the daemon that owns the socket takes over after a crash
+        self.manager.recover()
+        self._stopped = asyncio.Event()
+        try:
+            # Whoever held the lock before us is gone, so any socket file is stale
+            self.socket_path.unlink(missing_ok=True)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=str(self.socket_path)
+            )
+            os.chmod(self.socket_path, 0o600)
+            logger.info(f"Hercules daemon listening on {self.socket_path}")
+
+            idle_watch = asyncio.create_task(self._watch_idle())
+            await self._stopped.wait()
+            idle_watch.cancel()
+        finally:
+            if self._server is not None:
+                self._server.close()
+                await self._server.wait_closed()
+            self.socket_path.unlink(missing_ok=True)
+            self._release()
+        return True
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one decoded request to its action."""
+        action = request.get("action")
+        handler = self._actions.get(action)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown action: {action}"}
+        try:
+            result = await handler(**(request.get("args") or {}))
+        except TypeError as e:
+            return {"ok": False, "error": f"Bad arguments for {action}: {e}"}
+        except Exception as e:
+            logger.error(f"Daemon action {action} failed: {e}")
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "result": result}
+
+    # ------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------
+
+    async def _ping(self) -> Dict[str, Any]:
+        return {"pid": os.getpid()}
+
+    async def _create(
+        self,
+        name: str,
+        description: str,
+        steps: list,
+        expected_outcome: str,
+    ) -> Dict[str, Any]:
+        test_case = self.manager.create_test_case(
+            name=name,
+            description=description,
+            steps=steps,
+            expected_outcome=expected_outcome,
+        )
+        return to_json_dict(test_case)
+
+    async def _list(self) -> list:
+        return [to_json_dict(case) for case in self.manager.list_test_cases()]
+
+    async def _run(self, test_id: str, use_cache: bool = False) -> Dict[str, Any]:
+        result = await self.manager.run_test(test_id, use_cache=use_cache)
+        return to_json_dict(result)
+
+    async def _result(self, test_id: str) -> Optional[Dict[str, Any]]:
+        result = self.manager.get_test_result(test_id)
+        return to_json_dict(result) if result else None
+
+    async def _delete(self, test_id: str) -> bool:
+        return self.manager.delete_test_case(test_id)
+
+    async def _shutdown(self) -> Dict[str, Any]:
+        # Let the reply go out before the server closes
+        asyncio.get_running_loop().call_soon(self.stop)
+        return {"pid": os.getpid()}
+
+    # ------------------------------------------------------------------
+    # Plumbing
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._active += 1
+                self._last_request = time.monotonic()
+                try:
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        response = {"ok": False, "error": f"Invalid request: {e}"}
+                    else:
+                        response = await self.handle_request(request)
+                finally:
+                    self._active -= 1
+                    self._last_request = time.monotonic()
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # client gave up (e.g. VSCode task cancelled)
+        finally:
+            writer.close()
+
+    async def _watch_idle(self) -> None:
+        if self.idle_timeout <= 0:
+            return
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 30.0))
+            idle = time.monotonic() - self._last_request
+            if self._active == 0 and idle >= self.idle_timeout:
+                logger.info(f"Daemon idle for {idle:.0f}s - shutting down")
+                self.stop()
+                return
+
+    def _claim(self) -> bool:
+        if fcntl is None:
+            return True
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(f"{self.socket_path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, str(os.getpid()).encode(), 0)
+        self._lock_fd = fd
+        return True
+
+    def _release(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hercules daemon for vscode_plugin.py")
+    parser.add_argument("--socket", help="Unix socket path (default $HERCULES_DAEMON_SOCKET)")
+    parser.add_argument(
+        "--idle-timeout", type=float,
+        help=f"exit after this many idle seconds, 0 = never (default {DEFAULT_IDLE_TIMEOUT})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    if not hasattr(socket, "AF_UNIX"):
+        print("Unix domain sockets are not available on this platform", file=sys.stderr)
+        return 1
+    args = _parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    daemon = HerculesDaemon(args.socket, idle_timeout=args.idle_timeout)
+    asyncio.run(daemon.serve())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
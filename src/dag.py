@@ -0,0 +1,133 @@
+"""Dependency graphs of test cases.
+
+A case may list prerequisites in `depends_on` ("create account" before
+"checkout").  `run_dag` runs a set of cases so that each starts as soon
+as all of its prerequisites have passed - independent branches run in
+parallel, bounded by `max_parallel` - and skips everything downstream
+of a prerequisite that didn't pass.  `critical_path` then finds the
+chain of runs that determined the suite's wall-clock time.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+PASSED = "passed"
+SKIPPED = "skipped"
+
+
+def topological_order(deps: Mapping[str, Iterable[str]]) -> List[str]:
+    """Nodes ordered so prerequisites come first.
+
+    Only edges between nodes in `deps` count.  Raises ValueError naming
+    the cycle if there is one.
+    """
+    order: List[str] = []
+    state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
+
+    for root in deps:
+        if state.get(root):
+            continue
+        # Iterative DFS; suites can be long chains
+        stack: List[Tuple[str, Iterable[str]]] = [(root, iter(deps[root]))]
+        path = [root]
+        state[root] = 1
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in deps:
+                    continue
+                if state.get(child) == 1:
+                    cycle = path[path.index(child):] + [child]
+                    raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+                if not state.get(child):
+                    state[child] = 1
+                    stack.append((child, iter(deps[child])))
+                    path.append(child)
+                    break
+            else:
+                stack.pop()
+                path.pop()
+                state[node] = 2
+                order.append(node)
+    return order
+
+
+def levels(deps: Mapping[str, Iterable[str]]) -> List[List[str]]:
+    """Group nodes into waves; every node's prerequisites are in earlier waves."""
+    depth: Dict[str, int] = {}
+    for node in topological_order(deps):
+        depth[node] = 1 + max((depth[d] for d in deps[node] if d in deps), default=-1)
+    waves: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for node in deps:
+        waves[depth[node]].append(node)
+    return waves
+
+
+def critical_path(
+    deps: Mapping[str, Iterable[str]], durations: Mapping[str, float]
+) -> Tuple[List[str], float]:
+    """Longest chain of prerequisites by total duration, and that total."""
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+    for node in topological_order(deps):
+        best, best_time = None, 0.0
+        for dep in deps[node]:
+            if dep in finish and finish[dep] > best_time:
+                best, best_time = dep, finish[dep]
+        via[node] = best
+        finish[node] = best_time + (durations.get(node) or 0.0)
+
+    if not finish:
+        return [], 0.0
+    end = max(finish, key=finish.get)
+    path = [end]
+    while via[path[-1]] is not None:
+        path.append(via[path[-1]])
+    return list(reversed(path)), finish[end]
+
+
+async def run_dag(
+    deps: Mapping[str, Iterable[str]],
+    run: Callable[[str], Awaitable[str]],
+    *,
+    max_parallel: int,
+    skip: Callable[[str, str, str], None],
+    external: Optional[Mapping[str, str]] = None,
+) -> Dict[str, str]:
+    """Run every node in `deps` once its prerequisites have passed.
+
+    `run(node)` returns the node's outcome.  A node whose prerequisite
+    didn't pass is not run; `skip(node, prerequisite, outcome)` is called
+    instead and its outcome is "skipped", which cascades downstream.
+    Prerequisites outside `deps` are looked up in `external` (outcomes
+    from an earlier attempt); one absent there too - say, a deleted test
+    case - counts as an error, so its dependents are skipped.
+    """
+    topological_order(deps)  # refuse cycles up front rather than deadlock
+    external = external or {}
+    loop = asyncio.get_running_loop()
+    outcomes: Dict[str, "asyncio.Future[str]"] = {node: loop.create_future() for node in deps}
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def prerequisite_outcome(dep: str) -> str:
+        if dep in outcomes:
+            return await outcomes[dep]
+        return external.get(dep, "error")
+
+    async def run_node(node: str) -> None:
+        outcome = "error"
+        try:
+            for dep in deps[node]:
+                dep_outcome = await prerequisite_outcome(dep)
+                if dep_outcome != PASSED:
+                    skip(node, dep, dep_outcome)
+                    outcome = SKIPPED
+                    return
+            async with semaphore:
+                outcome = await run(node)
+        finally:
+            outcomes[node].set_result(outcome)
+
+    await asyncio.gather(*(run_node(node) for node in deps))
+    return {node: future.result() for node, future in outcomes.items()}
+
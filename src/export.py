@@ -0,0 +1,151 @@
+"""Streaming export of test results as JSONL or JUnit XML.
+
+Both writers take any iterable of result dicts and write one record at a
+time, so memory stays constant however many runs are exported.  The
+usual source is the result journal (see `result_journal.py`), either via
+`HerculesManager.export_results` or from the command line without a
+running server:
+
+    python -m src.export --format junit --status failed \\
+        --since 2026-10-01 --output nightly.xml
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from .result_journal import default_journal_dir, iter_journal
+
+FORMATS = ("jsonl", "junit")
+
+# Characters XML 1.0 can't carry even escaped (ANSI escapes from browsers etc.)
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], out: IO[str]) -> int:
+    """Write one JSON object per line. Returns the number written."""
+    count = 0
+    for record in records:
+        out.write(json.dumps(record))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_junit(
+    records: Iterable[Dict[str, Any]],
+    out: IO[str],
+    suite_name: str = "hercules",
+) -> int:
+    """Write a JUnit XML report, one `<testcase>` per record as it arrives.
+
+    Aggregate counts aren't known until the end, so they are not put on
+    `<testsuite>`; CI tools (Jenkins, GitLab, GitHub reporters) count the
+    test cases themselves.
+    """
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f"<testsuites>\n  <testsuite name={quoteattr(suite_name)}>\n")
+
+    count = 0
+    for record in records:
+        out.write(_junit_testcase(record))
+        count += 1
+
+    out.write("  </testsuite>\n</testsuites>\n")
+    return count
+
+
+def write_results(
+    records: Iterable[Dict[str, Any]], out: IO[str], fmt: str = "jsonl"
+) -> int:
+    if fmt == "jsonl":
+        return write_jsonl(records, out)
+    if fmt == "junit":
+        return write_junit(records, out)
+    raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+
+def _xml_text(value: Any) -> str:
+    return escape(_XML_INVALID.sub("", str(value)))
+
+
+def _junit_testcase(record: Dict[str, Any]) -> str:
+    name = _XML_INVALID.sub("", str(record.get("test_name") or record.get("test_id")))
+    attrs = [
+        f"classname={quoteattr('hercules.' + str(record.get('test_id')))}",
+        f"name={quoteattr(name)}",
+        f'time="{float(record.get("execution_time") or 0.0):.3f}"',
+    ]
+    if record.get("completed_at"):
+        attrs.append(f"timestamp={quoteattr(str(record['completed_at']))}")
+
+    body: List[str] = []
+    status = record.get("status")
+    message = record.get("error_message") or status or ""
+    if status == "failed":
+        body.append(f"      <failure message={quoteattr(_XML_INVALID.sub('', message))}/>\n")
+    elif status == "error":
+        body.append(f"      <error message={quoteattr(_XML_INVALID.sub('', message))}/>\n")
+    elif status == "skipped":
+        body.append("      <skipped/>\n")
+
+    logs = record.get("logs") or []
+    if logs:
+        text = _xml_text("\n".join(logs))
+        body.append(f"      <system-out>{text}</system-out>\n")
+
+    opening = f"    <testcase {' '.join(attrs)}"
+    if not body:
+        return opening + "/>\n"
+    return opening + ">\n" + "".join(body) + "    </testcase>\n"
+
+
+def _parse_until(value: str) -> datetime:
+    # A bare date means "through the end of that day"
+    parsed = datetime.fromisoformat(value)
+    if len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Stream Hercules test results from the result journal"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--output", "-o", default="-", help="file path, or - for stdout")
+    parser.add_argument(
+        "--status", action="append",
+        help="only export this status (repeatable), e.g. --status failed --status error",
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    parser.add_argument("--until", type=_parse_until, help="ISO date/time, inclusive")
+    parser.add_argument("--state-dir", help="server state dir (default $HERCULES_STATE_DIR)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    records = iter_journal(
+        default_journal_dir(args.state_dir),
+        since=args.since,
+        until=args.until,
+        statuses=args.status,
+    )
+
+    if args.output == "-":
+        count = write_results(records, sys.stdout, args.format)
+    else:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            count = write_results(records, fh, args.format)
+
+    print(f"Exported {count} result(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
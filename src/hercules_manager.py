@@ -6,30 +6,159 @@ by tests and other scripts independently.
 """
 
 import asyncio
+import json
 import logging
 import os
+import shutil
+import signal
 import subprocess
+import sys
 import tempfile
+import threading
 import time
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    IO, Any, AsyncIterator, Callable, Dict, Iterable, List, MutableMapping, Optional, Tuple,
+)
 
-from .models import TestCase, TestResult
+from .artifacts import ArtifactStore, sniff_mime_type
+from .concurrency import AdaptiveLimiter
+from .dag import critical_path, run_dag, topological_order
+from .dag import levels as dag_levels
+from .host_limiter import HostSlotLimiter
+from .inflight import InFlightJournal
+from .export import write_results
+from .models import ResourceUsage, SuiteRun, TestCase, TestResult, to_json_dict
+from .parameters import PARAMS_ENV, describe, substitute, validate_parameters
+from .result_cache import ResultCache, hash_file
+from .result_journal import ResultJournal
+from .result_store import TieredResultStore
+from .rusage import WRAPPER_PATH, UsageAggregator, read_usage_file
+from .rusage import available as rusage_available
+from .step_timing import StepLatencyStats, StepTimer
+from .search import SearchIndex
+from .suites import FINISHED_OUTCOMES, PASSED_OUTCOMES, SuiteCheckpointStore
+from .templates import TemplateRenderer
+from .workspace import Workspace
 
 logger = logging.getLogger(__name__)
 
+# Brackets each test's output in a batched suite run
+SUITE_MARKER = "@@hercules-suite"
+
+# Output lines can be long (stack traces, DOM dumps); longer ones are cut
+_STREAM_LIMIT = 1024 * 1024
+_TRUNCATED = " ... [line truncated]"
+
+# Fields a caller may set when creating a test case
+DEFINITION_FIELDS = {
+    "name", "description", "steps", "expected_outcome", "parameters", "depends_on",
+}
+
+# Test case fields that end up in the generated file / the search index
+RENDERED_FIELDS = {"name", "description", "steps", "expected_outcome", "parameters"}
+SEARCHED_FIELDS = {"name", "description", "steps", "expected_outcome"}
+
+
+async def _read_lines(stream: asyncio.StreamReader) -> AsyncIterator[str]:
+    """Decoded lines of a subprocess stream, cutting any over `_STREAM_LIMIT`.
+
+    Unlike `async for` over the stream, an overlong line doesn't raise
+    half-way through a run.
+    """
+    while True:
+        try:
+            raw = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            raw = e.partial  # last line without a newline, or EOF
+            if not raw:
+                return
+        except asyncio.LimitOverrunError as e:
+            raw = (await stream.readexactly(e.consumed))[:_STREAM_LIMIT]
+            while True:  # skip the rest of the line
+                try:
+                    await stream.readuntil(b"\n")
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError as more:
+                    await stream.readexactly(more.consumed)
+            yield raw.decode(errors="replace").rstrip("\r\n") + _TRUNCATED
+            continue
+        yield raw.decode(errors="replace").rstrip("\r\n")
+
 
 class HerculesManager:
     """Manages Hercules test cases and execution."""
 
-    def __init__(self, hercules_path: str | None = None):
+    def __init__(
+        self,
+        hercules_path: str | None = None,
+        *,
+        artifact_store: ArtifactStore | None = None,
+        state_dir: str | Path | None = None,
+        host_limiter: HostSlotLimiter | None = None,
+        workspace: Workspace | None = None,
+        adaptive_limiter: AdaptiveLimiter | None = None,
+    ):
         self.hercules_path = hercules_path or self._find_hercules_path()
+        self.artifacts = artifact_store or ArtifactStore()
+        # Shared with every other server on this machine
+        self.host_limiter = host_limiter or HostSlotLimiter()
+        # Optional load-driven cap in front of it (HERCULES_ADAPTIVE_CONCURRENCY)
+        self.adaptive_limiter = adaptive_limiter or AdaptiveLimiter.from_env()
+        # Private to this instance; generated files are written behind
+        self.workspace = workspace or Workspace()
+        self.state_dir = Path(
+            state_dir
+            or os.getenv("HERCULES_STATE_DIR")
+            or Path(tempfile.gettempdir()) / "hercules_state"
+        )
         
+        # Guards the dicts below. Sync MCP tools run in a thread pool and,
+        # with the HTTP transport, many clients share this one manager.
+        self._lock = threading.RLock()
+
         # TODO: Replace with proper database in production
-        self._test_cases: Dict[str, TestCase] = {}
-        self._test_results: Dict[str, TestResult] = {}
-        self._running_processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._test_cases: Dict[str, TestCase] = {}  # id -> current version
+        # Earlier versions of updated cases, oldest first (current included)
+        self._test_case_versions: Dict[str, List[TestCase]] = {}
+        # Latest result per test; settled ones are compressed onto disk
+        self._test_results: MutableMapping[str, TestResult] = TieredResultStore(
+            self.state_dir / "results-cold"
+        )
+        self._running_processes: Dict[str, asyncio.subprocess.Process] = {}  # by run_id
+        self._search_index = SearchIndex()
+        self._renderer = TemplateRenderer()
+        self._result_cache = ResultCache()
+        self._suite_runs: Dict[str, SuiteRun] = {}
+        self._active_suite_files: set = set()
+        self._suite_checkpoints = SuiteCheckpointStore(self.state_dir / "suites")
+        self._result_journal = ResultJournal(self.state_dir / "results")
+        self._usage_stats: Optional[UsageAggregator] = None  # loaded on first query
+        self._step_stats: Optional[StepLatencyStats] = None  # likewise
+        self._inflight = InFlightJournal(self.state_dir / "inflight")
+        self.workspace.start_collector(self._live_workspace_files)
+
+    def close(self) -> None:
+        """Flush and stop background work; this manager's suites become resumable."""
+        self._suite_checkpoints.close()
+        self._result_journal.close()
+        self.workspace.close()
+
+    def recover(self) -> None:
+        """Take over what servers that died left in the state dir.
+
+        Kills their orphaned runs (failing those results) and picks up
+        their interrupted suites so they can be resumed.  Only a server
+        entry point should call this, once, at startup - a manager built
+        by a script or a test must not reap anybody's processes.
+        """
+        self._recover_orphaned_runs()
+        self._load_suite_checkpoints()
 
     def create_test_case(
         self,
@@ -38,54 +167,269 @@ class HerculesManager:
         description: str,
         steps: List[str],
         expected_outcome: str,
+        parameters: Optional[List[Dict[str, str]]] = None,
+        depends_on: Optional[List[str]] = None,
     ) -> TestCase:
-        """Create a new test case and generate the test file."""
-        
+        """Create a new test case and generate the test file.
+
+        With `parameters`, steps and expected outcome may use `{{name}}`
+        placeholders; every parameter set becomes one run of the case.
+        `depends_on` lists test ids that must pass before this one runs
+        in a suite.
+        """
+
+        if parameters:
+            validate_parameters(steps, expected_outcome, parameters)
         test_case = TestCase(
             name=name,
             description=description,
             steps=steps,
             expected_outcome=expected_outcome,
+            parameters=parameters or [],
+            depends_on=depends_on or [],
         )
+        self._check_dependencies([test_case])
 
-        # Generate test file in temp dir
-        test_dir = Path(tempfile.gettempdir()) / "hercules_tests"
-        test_dir.mkdir(parents=True, exist_ok=True)
-
-        test_file = test_dir / f"{test_case.id}.py"
-        test_file.write_text(self._generate_test_file(test_case))
-        test_case.file_path = str(test_file)
-
-        self._test_cases[test_case.id] = test_case
+        self._write_test_file(test_case)
+        with self._lock:
+            self._test_cases[test_case.id] = test_case
+        self._index_test_case(test_case)
         logger.info(f"Created test case '{name}' ({test_case.id})")
         return test_case
 
-    async def run_test(self, test_id: str) -> TestResult:
-        """Execute a test and return results."""
+    def create_test_cases(self, definitions: List[Dict[str, object]]) -> List[TestCase]:
+        """Create several test cases, rendering all their files in one pass.
+
+        Every definition is validated (and its file syntax-checked) first;
+        if any is bad a ValueError is raised and nothing is created.
+        Definitions take the same fields as `create_test_case`; ids,
+        versions and file paths are always assigned here.
+        """
+
+        test_cases = []
+        for i, definition in enumerate(definitions):
+            if not isinstance(definition, dict):
+                raise ValueError(f"Test case {i} must be an object")
+            unknown = set(definition) - DEFINITION_FIELDS
+            if unknown:
+                raise ValueError(
+                    f"Test case {i} has unknown field(s): {', '.join(sorted(unknown))}"
+                )
+            definition = {k: v for k, v in definition.items() if v is not None}
+            parameters = definition.get("parameters")
+            if parameters:
+                validate_parameters(
+                    definition.get("steps", []), definition.get("expected_outcome", ""), parameters
+                )
+            try:
+                test_cases.append(TestCase(**definition))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Test case {i} is invalid: {e}") from None
+        self._check_dependencies(test_cases)
+
+        sources = self._renderer.render_many(test_cases)
+        for test_case, source in zip(test_cases, sources):
+            self._write_test_file(test_case, source)
+        with self._lock:
+            for test_case in test_cases:
+                self._test_cases[test_case.id] = test_case
+        for test_case in test_cases:
+            self._index_test_case(test_case)
+        logger.info(f"Created {len(test_cases)} test cases")
+        return test_cases
+
+    def _check_dependencies(self, test_cases: List[TestCase]) -> None:
+        """Raise ValueError for unknown prerequisites or a dependency cycle."""
+        new = {test_case.id: test_case for test_case in test_cases}
+        with self._lock:
+            known = {**self._test_cases, **new}
+        for test_case in test_cases:
+            missing = [d for d in test_case.depends_on if d not in known]
+            if missing:
+                raise ValueError(
+                    f"Test case '{test_case.name}' depends on unknown test case(s): "
+                    f"{', '.join(missing)}"
+                )
+        topological_order(self._prerequisite_graph(list(new), known))
+
+    @staticmethod
+    def _prerequisite_graph(
+        test_ids: List[str], test_cases: Dict[str, TestCase]
+    ) -> Dict[str, List[str]]:
+        """`test_ids` and everything they transitively depend on, as a graph."""
+        graph: Dict[str, List[str]] = {}
+        pending = list(test_ids)
+        while pending:
+            test_id = pending.pop()
+            if test_id in graph or test_id not in test_cases:
+                continue
+            graph[test_id] = list(test_cases[test_id].depends_on)
+            pending.extend(graph[test_id])
+        return graph
+
+    def update_test_case(
+        self,
+        test_id: str,
+        *,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        steps: Optional[List[str]] = None,
+        expected_outcome: Optional[str] = None,
+        parameters: Optional[List[Dict[str, str]]] = None,
+        depends_on: Optional[List[str]] = None,
+    ) -> TestCase:
+        """Publish a new version of a test case with the given fields changed.
+
+        The previous version is kept as-is; the new one is a shallow copy,
+        so fields that didn't change (say, a long step list) are shared
+        between versions rather than duplicated.  The test file is only
+        re-rendered if a field that appears in it changed.  Returns the
+        current version unchanged if nothing actually differs.
+        """
+
+        fields = {
+            "name": name,
+            "description": description,
+            "steps": steps,
+            "expected_outcome": expected_outcome,
+            "parameters": parameters,
+            "depends_on": depends_on,
+        }
+        with self._lock:
+            current = self._test_cases.get(test_id)
+            if current is None:
+                raise ValueError(f"Test case {test_id} not found")
+            changes = {
+                field: list(value) if isinstance(value, list) else value
+                for field, value in fields.items()
+                if value is not None and value != getattr(current, field)
+            }
+            if not changes:
+                return current
+
+            new_version = current.model_copy(update={
+                **changes,
+                "version": current.version + 1,
+                "created_at": datetime.now(),
+            })
+            if new_version.parameters:
+                validate_parameters(
+                    new_version.steps, new_version.expected_outcome, new_version.parameters
+                )
+            if "depends_on" in changes:
+                self._check_dependencies([new_version])
+            if RENDERED_FIELDS & changes.keys():
+                self._write_test_file(new_version)
+
+            self._test_cases[test_id] = new_version
+            self._test_case_versions.setdefault(test_id, [current]).append(new_version)
+
+        if SEARCHED_FIELDS & changes.keys():
+            self._index_test_case(new_version)
+        logger.info(
+            f"Updated test case '{new_version.name}' ({test_id}) to version "
+            f"{new_version.version}: {', '.join(sorted(changes))}"
+        )
+        return new_version
+
+    def get_test_case_versions(self, test_id: str) -> List[TestCase]:
+        """Every version of a test case, oldest first."""
+        with self._lock:
+            current = self._test_cases.get(test_id)
+            if current is None:
+                raise ValueError(f"Test case {test_id} not found")
+            return list(self._test_case_versions.get(test_id, [current]))
+
+    def delete_test_case(self, test_id: str) -> bool:
+        """Remove a test case and its generated file. Results are kept."""
+        with self._lock:
+            test_case = self._test_cases.pop(test_id, None)
+            self._test_case_versions.pop(test_id, None)
+        if test_case is None:
+            return False
+
+        self._search_index.remove(test_id)
+        self._result_cache.invalidate(test_id)
+        if test_case.file_path:
+            self.workspace.discard(test_case.file_path)
+        # Its suites would otherwise restore it if interrupted
+        with self._lock:
+            suites = [s.id for s in self._suite_runs.values() if test_id in s.test_ids]
+        for suite_id in suites:
+            self._suite_checkpoints.record_deleted(suite_id, test_id)
+
+        logger.info(f"Deleted test case '{test_case.name}' ({test_id})")
+        return True
+
+    async def run_test(
+        self,
+        test_id: str,
+        *,
+        use_cache: bool = False,
+        env_fingerprint: str = "",
+    ) -> TestResult:
+        """Execute a test and return results.
+
+        With `use_cache`, a previous passing result is returned again
+        (marked `cached`, under a new run id) when the generated file, the Hercules executable
+        and `env_fingerprint` are all unchanged since that run.
+        """
         
-        if test_id not in self._test_cases:
+        with self._lock:
+            test_case = self._test_cases.get(test_id)
+        if test_case is None:
             raise ValueError(f"Test case {test_id} not found")
 
-        test_case = self._test_cases[test_id]
+        await self._ensure_test_file(test_case)
+
+        cache_key = None
+        if use_cache:
+            cache_key = await asyncio.to_thread(self._cache_key, test_case, env_fingerprint)
+            if cache_key and (cached := self._result_cache.get(cache_key)):
+                logger.info(f"Test {test_id} unchanged since last pass - using cached result")
+                with self._lock:
+                    self._test_results[test_id] = cached
+                self._record_result(cached)
+                return cached
         
         result = TestResult(
             test_id=test_id,
             test_name=test_case.name,
+            test_version=test_case.version,
             status="running",
             started_at=datetime.now(),
         )
         
-        self._test_results[test_id] = result
+        with self._lock:
+            self._test_results[test_id] = result
 
         try:
-            # Try real Hercules if available, otherwise simulate
-            if (test_case.file_path 
+            real_run = bool(
+                test_case.file_path
                 and os.path.exists(test_case.file_path)
                 and os.path.exists(self.hercules_path)
-                and os.access(self.hercules_path, os.X_OK)):
-                await self._run_hercules_test(test_case.file_path, result)
-            else:
-                await self._simulate_test_run(test_case, result)
+                and os.access(self.hercules_path, os.X_OK)
+            )
+            # Try real Hercules if available, otherwise simulate.  While the
+            # run waits for a slot, the workspace collector must leave its
+            # file alone.
+            with self.workspace.pinned(test_case.file_path if real_run else None):
+                if test_case.parameters:
+                    await self._run_parametrized(test_case, result, real_run)
+                elif real_run:
+                    result.status = "queued"
+                    async with self._execution_slot(owner=test_id):
+                        result.status = "running"
+                        try:
+                            await self._ensure_test_file(test_case)
+                            await self._run_hercules_test(test_case.file_path, result)
+                        except Exception:
+                            result.status = "error"
+                            self._record_load_feedback(result)
+                            raise
+                        self._record_load_feedback(result)
+                else:
+                    await self._simulate_test_run(test_case, result)
                 
         except Exception as e:
             result.status = "error"
@@ -93,16 +437,572 @@ class HerculesManager:
             result.completed_at = datetime.now()
             logger.error(f"Test {test_id} failed: {e}")
 
+        if cache_key:
+            self._result_cache.put(cache_key, result)
+
+        self._record_result(result)
         return result
 
+    async def run_batch(
+        self,
+        test_ids: List[str],
+        *,
+        on_result: Optional[Callable[[TestResult], None]] = None,
+    ) -> List[TestResult]:
+        """Run several tests in a single Hercules process.
+
+        All cases are rendered into one suite module, so interpreter start,
+        Hercules import and environment setup are paid once.  The combined
+        output is split back into one `TestResult` per test, timed by the
+        child's own markers.  `on_result` is called as each test finishes.
+        """
+
+        with self._lock:
+            missing = [t for t in test_ids if t not in self._test_cases]
+            if missing:
+                raise ValueError(f"Test case(s) not found: {', '.join(missing)}")
+            test_cases = [self._test_cases[t] for t in dict.fromkeys(test_ids)]
+            parametrized = [t.id for t in test_cases if t.parameters]
+            if parametrized:
+                raise ValueError(
+                    f"Parametrized case(s) run via run_test, not batches: {', '.join(parametrized)}"
+                )
+
+            results = {}
+            for test_case in test_cases:
+                results[test_case.id] = TestResult(
+                    test_id=test_case.id,
+                    test_name=test_case.name,
+                    test_version=test_case.version,
+                    status="queued",
+                    started_at=datetime.now(),
+                )
+                self._test_results[test_case.id] = results[test_case.id]
+
+        caller_on_result = on_result
+        real_run = os.path.exists(self.hercules_path) and os.access(self.hercules_path, os.X_OK)
+
+        def on_result(result: TestResult) -> None:
+            if real_run:
+                self._record_load_feedback(result)
+            self._record_result(result)
+            if caller_on_result:
+                caller_on_result(result)
+
+        try:
+            if real_run:
+                suite_file = await self._write_suite_file(test_cases)
+                try:
+                    async with self._execution_slot(owner=f"batch:{test_cases[0].id}"):
+                        await self._run_hercules_batch(suite_file, results, on_result)
+                finally:
+                    self._active_suite_files.discard(suite_file)
+                    self.workspace.unpin(suite_file)
+                    os.unlink(suite_file)
+            else:
+                for test_case in test_cases:
+                    results[test_case.id].status = "running"
+                    await self._simulate_test_run(test_case, results[test_case.id])
+                    on_result(results[test_case.id])
+        except Exception as e:
+            for result in results.values():
+                if result.status in ("queued", "running"):
+                    result.status = "error"
+                    result.error_message = str(e)
+                    result.completed_at = datetime.now()
+                    on_result(result)
+            logger.error(f"Batch run failed: {e}")
+
+        return list(results.values())
+
+    async def run_suite(
+        self,
+        test_ids: List[str],
+        *,
+        max_parallel: int = 4,
+        use_cache: bool = False,
+        env_fingerprint: str = "",
+        batch: bool = False,
+    ) -> SuiteRun:
+        """Run a batch of tests, checkpointing each outcome as it lands.
+
+        With `batch`, tests are split across at most `max_parallel` Hercules
+        processes (see `run_batch`) instead of one process per test; the
+        result cache isn't consulted in that mode.
+
+        Prerequisites (`depends_on`) of the requested tests are added to
+        the suite; each test starts once its prerequisites have passed and
+        is skipped if one didn't.
+        """
+
+        test_ids = list(dict.fromkeys(test_ids))
+        with self._lock:
+            missing = [t for t in test_ids if t not in self._test_cases]
+            if missing:
+                raise ValueError(f"Test case(s) not found: {', '.join(missing)}")
+            graph = self._prerequisite_graph(test_ids, self._test_cases)
+            ordered = {t: graph[t] for t in test_ids}
+            ordered.update(graph)
+            test_ids = topological_order(ordered)
+            test_cases = [self._test_cases[t] for t in test_ids]
+
+            suite = SuiteRun(test_ids=test_ids, outcomes={t: "pending" for t in test_ids})
+            self._suite_runs[suite.id] = suite
+        self._suite_checkpoints.start(suite, test_cases)
+
+        await self._execute_suite(
+            suite, test_ids, max_parallel, use_cache, env_fingerprint, batch
+        )
+        return suite
+
+    async def rerun_failed(
+        self,
+        suite_run_id: str,
+        *,
+        max_parallel: int = 4,
+        use_cache: bool = False,
+        env_fingerprint: str = "",
+        batch: bool = False,
+    ) -> SuiteRun:
+        """Re-execute only the failed, errored or unfinished tests of a suite."""
+        suite = self._resumable_suite(suite_run_id)
+        todo = [t for t in suite.test_ids if suite.outcomes.get(t) not in PASSED_OUTCOMES]
+        return await self._start_attempt(
+            suite, todo, max_parallel, use_cache, env_fingerprint, batch
+        )
+
+    async def resume_suite(
+        self,
+        suite_run_id: str,
+        *,
+        max_parallel: int = 4,
+        use_cache: bool = False,
+        env_fingerprint: str = "",
+        batch: bool = False,
+    ) -> SuiteRun:
+        """Finish an interrupted suite without repeating completed tests."""
+        suite = self._resumable_suite(suite_run_id)
+        todo = [t for t in suite.test_ids if suite.outcomes.get(t) not in FINISHED_OUTCOMES]
+        return await self._start_attempt(
+            suite, todo, max_parallel, use_cache, env_fingerprint, batch
+        )
+
+    def get_suite_run(self, suite_run_id: str) -> Optional[SuiteRun]:
+        with self._lock:
+            return self._suite_runs.get(suite_run_id)
+
+    def list_suite_runs(self) -> List[SuiteRun]:
+        with self._lock:
+            return list(self._suite_runs.values())
+
     def get_test_result(self, test_id: str) -> Optional[TestResult]:
-        return self._test_results.get(test_id)
+        with self._lock:
+            return self._test_results.get(test_id)
 
     def list_test_cases(self) -> List[TestCase]:
-        return list(self._test_cases.values())
+        with self._lock:
+            return list(self._test_cases.values())
 
     def list_test_results(self) -> List[TestResult]:
-        return list(self._test_results.values())
+        with self._lock:
+            return list(self._test_results.values())
+
+    def search_test_cases(self, query: str, limit: int = 10) -> List[TestCase]:
+        """Ranked full-text search over name, description, steps and outcome."""
+        hits = self._search_index.search(query, limit)
+        with self._lock:
+            cases = [self._test_cases.get(doc_id) for doc_id, _ in hits]
+        return [case for case in cases if case is not None]
+
+    def get_concurrency_status(self, decisions: int = 20) -> Dict[str, object]:
+        """Adaptive limit, in-flight runs and recent controller decisions."""
+        if self.adaptive_limiter is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            **self.adaptive_limiter.status(),
+            "decisions": self.adaptive_limiter.decisions(decisions),
+        }
+
+    def get_execution_slots(self) -> Dict[str, object]:
+        """Host-wide Hercules slots and which process/test holds each."""
+        return {
+            "enabled": self.host_limiter.enabled,
+            "slots": self.host_limiter.slots,
+            "holders": self.host_limiter.holders(),
+        }
+
+    def invalidate_result_cache(self, test_id: Optional[str] = None) -> int:
+        """Forget cached passes for one test (or all). Returns entries dropped."""
+        return self._result_cache.invalidate(test_id)
+
+    def result_cache_stats(self) -> Dict[str, int]:
+        return self._result_cache.stats()
+
+    def export_results(
+        self,
+        out: IO[str],
+        fmt: str = "jsonl",
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        statuses: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Stream every finished run (not just the latest per test) to `out`.
+
+        Reads the result journal line by line, so memory use doesn't grow
+        with history.  `fmt` is "jsonl" or "junit".  Returns the count.
+        """
+        records = self._result_journal.iter_records(
+            since=since, until=until, statuses=statuses
+        )
+        return write_results(records, out, fmt)
+
+    def get_resource_usage(self, test_id: Optional[str] = None) -> Dict[str, object]:
+        """CPU, peak RSS and context switches per test, over its whole history.
+
+        Aggregated from every journaled run of a real Hercules process
+        (simulated and cached results carry no usage).
+        """
+        with self._lock:
+            if self._usage_stats is None:
+                stats = UsageAggregator()
+                stats.add_records(self._result_journal.iter_records())
+                self._usage_stats = stats
+        if test_id is not None:
+            return {test_id: self._usage_stats.summary(test_id)}
+        return self._usage_stats.summaries()
+
+    def get_step_timings(self, test_id: str) -> Dict[str, object]:
+        """Per-step latency of a test's latest run and over its recent runs."""
+        with self._lock:
+            if test_id not in self._test_cases and test_id not in self._test_results:
+                raise ValueError(f"Test case {test_id} not found")
+            result = self._test_results.get(test_id)
+        latest = None
+        if result is not None:
+            runs = result.instances or [result]
+            latest = {
+                "run_id": result.run_id,
+                "status": result.status,
+                "execution_time": result.execution_time,
+                "steps": [to_json_dict(t) for run in runs for t in run.step_timings],
+            }
+        return {
+            "test_id": test_id,
+            "latest_run": latest,
+            "recent_runs": self._step_latency().summary(test_id),
+        }
+
+    def get_slowest_steps(
+        self, limit: int = 10, suite_run_id: Optional[str] = None
+    ) -> List[Dict[str, object]]:
+        """Steps with the highest mean duration over recent runs.
+
+        Across every test, or only the tests of `suite_run_id`.
+        """
+        test_ids = None
+        if suite_run_id is not None:
+            suite = self.get_suite_run(suite_run_id)
+            if suite is None:
+                raise ValueError(f"Suite run {suite_run_id} not found")
+            test_ids = suite.test_ids
+        return self._step_latency().slowest(limit, test_ids)
+
+    def _step_latency(self) -> StepLatencyStats:
+        with self._lock:
+            if self._step_stats is None:
+                stats = StepLatencyStats()
+                stats.add_records(self._result_journal.iter_records())
+                self._step_stats = stats
+            return self._step_stats
+
+    def read_artifact(self, uri: str) -> bytes:
+        """Return the raw bytes of a stored screenshot or run output."""
+        return self.artifacts.read(uri)
+
+    def read_artifact_with_type(self, uri: str) -> Tuple[bytes, str]:
+        """Return an artifact's bytes and its sniffed MIME type."""
+        data = self.artifacts.read(uri)
+        return data, sniff_mime_type(data[:16])
+
+    def collect_artifact_garbage(self) -> List[str]:
+        """Trim the artifact store to its quota, sparing referenced blobs first."""
+        referenced = []
+        # One result at a time - cold ones are decoded on demand
+        for result in self._test_results.values():
+            referenced.extend(result.screenshots)
+            referenced.extend(result.artifacts)
+        return self.artifacts.collect_garbage(referenced)
+
+    def render_stats(self) -> Dict[str, float]:
+        """Test files rendered so far and the time spent doing it."""
+        return self._renderer.stats()
+
+    def flush_test_files(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued test file write has reached the disk."""
+        return self.workspace.flush(timeout=timeout)
+
+    @asynccontextmanager
+    async def _execution_slot(self, owner: str) -> AsyncIterator[None]:
+        """This server's adaptive limit (if enabled), then a host-wide slot."""
+        if self.adaptive_limiter is None:
+            async with self.host_limiter.slot(owner=owner):
+                yield
+            return
+        async with self.adaptive_limiter.slot():
+            async with self.host_limiter.slot(owner=owner):
+                yield
+
+    def _record_load_feedback(self, result: TestResult) -> None:
+        if self.adaptive_limiter is not None:
+            self.adaptive_limiter.record(
+                result.test_id, result.execution_time, errored=result.status == "error"
+            )
+
+    def _record_result(self, result: TestResult) -> None:
+        # Under the lock so a concurrent first `get_resource_usage` (or
+        # step latency query) either sees this run in the journal or gets
+        # it here - never both
+        with self._lock:
+            try:
+                self._result_journal.append(result)
+            except OSError as e:
+                logger.warning(f"Could not journal result for {result.test_id}: {e}")
+            if self._usage_stats is not None and result.resource_usage and not result.cached:
+                self._usage_stats.add(result.test_id, to_json_dict(result.resource_usage))
+            if self._step_stats is not None and not result.cached:
+                self._step_stats.add_records([to_json_dict(result)])
+
+    def _write_test_file(self, test_case: TestCase, source: Optional[str] = None) -> None:
+        # Rendered (and syntax-checked) now, so bad definitions fail here;
+        # the write itself is queued on the workspace writer thread
+        if source is None:
+            source = self._generate_test_file(test_case)
+        test_file = self.workspace.path_for(f"{test_case.id}.py")
+        self.workspace.write(test_file, source)
+        test_case.file_path = str(test_file)
+
+    async def _ensure_test_file(self, test_case: TestCase) -> None:
+        """Make sure the generated file is on disk before anything reads it.
+
+        Waits for a queued write, or re-renders the file if the workspace
+        collector removed it (or it belonged to a previous instance).
+        """
+        if test_case.file_path:
+            await self.workspace.aflush(test_case.file_path)
+            if os.path.exists(test_case.file_path):
+                return
+        self._write_test_file(test_case)
+        await self.workspace.aflush(test_case.file_path)
+
+    async def _write_suite_file(self, test_cases: List[TestCase]) -> str:
+        suite_file = str(self.workspace.path_for(f"suite-{uuid.uuid4()}.py"))
+        self._active_suite_files.add(suite_file)
+        self.workspace.pin(suite_file)  # until the batch is done with it
+        self.workspace.write(suite_file, self._generate_suite_file(test_cases))
+        await self.workspace.aflush(suite_file)
+        return suite_file
+
+    def _live_workspace_files(self) -> List[str]:
+        live = [case.file_path for case in self.list_test_cases() if case.file_path]
+        live.extend(self._active_suite_files)
+        return live
+
+    def _resumable_suite(self, suite_run_id: str) -> SuiteRun:
+        with self._lock:
+            suite = self._suite_runs.get(suite_run_id)
+            if suite is None:
+                raise ValueError(f"Suite run {suite_run_id} not found")
+            if suite.status == "running":
+                raise ValueError(f"Suite run {suite_run_id} is still running")
+            # Claim it now so a concurrent rerun from another client is refused
+            suite.status = "running"
+        return suite
+
+    async def _start_attempt(
+        self,
+        suite: SuiteRun,
+        test_ids: List[str],
+        max_parallel: int,
+        use_cache: bool,
+        env_fingerprint: str,
+        batch: bool,
+    ) -> SuiteRun:
+        suite.attempts += 1
+        suite.completed_at = None
+        for test_id in test_ids:
+            suite.outcomes[test_id] = "pending"
+        self._suite_checkpoints.record_attempt(suite)
+
+        await self._execute_suite(
+            suite, test_ids, max_parallel, use_cache, env_fingerprint, batch
+        )
+        return suite
+
+    async def _execute_suite(
+        self,
+        suite: SuiteRun,
+        test_ids: List[str],
+        max_parallel: int,
+        use_cache: bool,
+        env_fingerprint: str,
+        batch: bool = False,
+    ) -> None:
+        """Run `test_ids` in dependency order, checkpointing each outcome.
+
+        Tests start as soon as their prerequisites pass (see `run_dag`);
+        dependents of a prerequisite that didn't pass are skipped.  In
+        batch mode the graph is run wave by wave, each wave split across
+        at most `max_parallel` suite processes.
+        """
+        # Prerequisites not rerun this attempt keep their earlier outcome
+        earlier = {t: suite.outcomes.get(t, "pending") for t in suite.test_ids if t not in test_ids}
+        with self._lock:
+            deps = {
+                t: list(self._test_cases[t].depends_on) if t in self._test_cases else []
+                for t in test_ids
+            }
+            # Ones outside the suite were either deleted since, which is an
+            # error, or added since, in which case their latest run counts
+            for dep in {d for ds in deps.values() for d in ds} - deps.keys() - earlier.keys():
+                if dep not in self._test_cases:
+                    earlier[dep] = "error"
+                else:
+                    latest = self._test_results.get(dep)
+                    earlier[dep] = latest.status if latest else "pending"
+        durations: Dict[str, float] = {}
+
+        def record(test_id: str, outcome: str) -> None:
+            suite.outcomes[test_id] = outcome
+            self._suite_checkpoints.record_outcome(suite.id, test_id, outcome)
+
+        def skip(test_id: str, prerequisite: str, outcome: str) -> None:
+            self._record_skipped(test_id, prerequisite, outcome)
+            record(test_id, "skipped")
+
+        async def run_one(test_id: str) -> str:
+            try:
+                result = await self.run_test(
+                    test_id, use_cache=use_cache, env_fingerprint=env_fingerprint
+                )
+                outcome = result.status
+                durations[test_id] = result.execution_time or 0.0
+            except ValueError as e:
+                logger.error(f"Suite {suite.id}: {e}")
+                outcome = "error"
+            record(test_id, outcome)
+            return outcome
+
+        def on_batch_result(result: TestResult) -> None:
+            durations[result.test_id] = result.execution_time or 0.0
+            record(result.test_id, result.status)
+
+        async def run_chunk(chunk: List[str]) -> None:
+            runnable = [t for t in chunk if t in self._test_cases]
+            for test_id in set(chunk) - set(runnable):
+                logger.error(f"Suite {suite.id}: Test case {test_id} not found")
+                record(test_id, "error")
+            # Parametrized cases fan out on their own
+            for test_id in [t for t in runnable if self._test_cases[t].parameters]:
+                runnable.remove(test_id)
+                await run_one(test_id)
+            if runnable:
+                await self.run_batch(runnable, on_result=on_batch_result)
+
+        async def run_waves() -> None:
+            for wave in dag_levels(deps):
+                ready = []
+                for test_id in wave:
+                    blocker = next(
+                        (d for d in deps[test_id]
+                         if suite.outcomes.get(d, earlier.get(d, "error")) != "passed"),
+                        None,
+                    )
+                    if blocker is None:
+                        ready.append(test_id)
+                    else:
+                        skip(test_id, blocker, suite.outcomes.get(blocker, earlier.get(blocker, "error")))
+                n_chunks = max(1, min(max_parallel, len(ready)))
+                chunks = [ready[i::n_chunks] for i in range(n_chunks)]
+                await asyncio.gather(*(run_chunk(c) for c in chunks if c))
+
+        try:
+            if batch:
+                await run_waves()
+            else:
+                await run_dag(
+                    deps, run_one, max_parallel=max_parallel, skip=skip, external=earlier
+                )
+        finally:
+            if suite.status == "running" and all(
+                suite.outcomes.get(t) in FINISHED_OUTCOMES for t in suite.test_ids
+            ):
+                suite.critical_path, suite.critical_path_seconds = critical_path(deps, durations)
+                suite.status = "completed"
+                suite.completed_at = datetime.now()
+                self._suite_checkpoints.record_finished(suite)
+            elif suite.status == "running":
+                # Cancelled part-way; the journal still says running, which
+                # reloads as interrupted too.
+                suite.status = "interrupted"
+
+    def _record_skipped(self, test_id: str, prerequisite: str, outcome: str) -> None:
+        with self._lock:
+            test_case = self._test_cases.get(test_id)
+        now = datetime.now()
+        result = TestResult(
+            test_id=test_id,
+            test_name=test_case.name if test_case else test_id,
+            test_version=test_case.version if test_case else None,
+            status="skipped",
+            error_message=f"Skipped: prerequisite {prerequisite} {outcome}",
+            execution_time=0.0,
+            started_at=now,
+            completed_at=now,
+        )
+        with self._lock:
+            self._test_results[test_id] = result
+        self._record_result(result)
+
+    def _load_suite_checkpoints(self) -> None:
+        """Pick up suites interrupted by a dead server so they can be resumed."""
+        for suite, cases in self._suite_checkpoints.load_all():
+            if all(suite.outcomes.get(t) in PASSED_OUTCOMES for t in suite.test_ids):
+                cases = []  # nothing left to rerun, don't resurrect its cases
+            for data in cases:
+                if data.get("id") in self._test_cases:
+                    continue
+                test_case = TestCase(**data)
+                self._write_test_file(test_case)
+                self._test_cases[test_case.id] = test_case
+                self._index_test_case(test_case)
+            self._suite_runs[suite.id] = suite
+            self._suite_checkpoints.record_adopted(suite.id)
+
+        interrupted = sum(1 for s in self._suite_runs.values() if s.status == "interrupted")
+        if interrupted:
+            logger.info(f"Found {interrupted} interrupted suite run(s) to resume")
+
+    def _index_test_case(self, test_case: TestCase) -> None:
+        self._search_index.add(
+            test_case.id,
+            {
+                "name": test_case.name,
+                "description": test_case.description,
+                "steps": test_case.steps,
+                "expected_outcome": test_case.expected_outcome,
+            },
+        )
+
+    def _cache_key(self, test_case: TestCase, env_fingerprint: str) -> Optional[str]:
+        if not test_case.file_path or not os.path.exists(test_case.file_path):
+            return None
+        return ResultCache.make_key(
+            hash_file(test_case.file_path),
+            self._result_cache.hercules_identity(self.hercules_path),
+            env_fingerprint,
+        )
 
     def _find_hercules_path(self) -> str:
         """Try to find Hercules executable."""
@@ -136,104 +1036,402 @@ class HerculesManager:
 
     def _generate_test_file(self, test_case: TestCase) -> str:
         """Generate Python test file for Hercules."""
-        
-        # Clean up class name
-        class_name = (test_case.name
-                     .replace(" ", "_")
-                     .replace("-", "_")
-                     .replace("/", "_")) + "Test"
-
-        # Format test steps
-        step_code = []
-        for i, step in enumerate(test_case.steps, 1):
-            step_code.append(f'        self.log("Step {i}: {step}")')
-            step_code.append(f'        self.execute_step("{step}")')
-        
-        steps_str = "\n".join(step_code)
+        return self._renderer.render(test_case)
 
-        return f'''"""
-Test: {test_case.name}
-Description: {test_case.description}
-Generated: {test_case.created_at.isoformat()}
-"""
-
-from hercules import HerculesTest
+    def _generate_suite_file(self, test_cases: List[TestCase]) -> str:
+        """Generate one module that runs many tests in a single Hercules process.
 
+        Environment setup/teardown happens once for the whole module rather
+        than once per test.  The runner brackets each test with
+        `SUITE_MARKER` lines (with the child's own timestamps) so the combined
+        output can be split back into per-test results.  END markers also
+        carry the CPU time and context switches the test used; peak RSS is
+        the shared process's high-water mark at that point.
+        """
+        return self._renderer.render_suite(test_cases, SUITE_MARKER)
 
-class {class_name}(HerculesTest):
-    def __init__(self):
-        super().__init__()
-        self.test_name = "{test_case.name}"
-        self.test_id = "{test_case.id}"
+    async def _run_parametrized(
+        self, test_case: TestCase, result: TestResult, real_run: bool
+    ) -> None:
+        """Run every parameter set of a case concurrently into `result.instances`.
 
-    def setup(self):
-        self.log("Setting up test environment")
+        All instances share the one generated file (placeholders are filled
+        in from $HERCULES_PARAMS) and each takes its own execution slot, so
+        the normal host/adaptive limits decide how many run at once.
+        """
 
-    def execute(self):
-        self.log("Starting test execution")
+        start_time = time.time()
+        result.instances = [
+            TestResult(
+                test_id=test_case.id,
+                test_name=f"{test_case.name} [{describe(params)}]",
+                test_version=test_case.version,
+                status="queued",
+                parameters=params,
+            )
+            for params in test_case.parameters
+        ]
 
-{steps_str}
+        async def run_instance(index: int, instance: TestResult) -> None:
+            instance.started_at = datetime.now()
+            try:
+                if real_run:
+                    async with self._execution_slot(owner=f"{test_case.id}[{index}]"):
+                        instance.status = "running"
+                        await self._ensure_test_file(test_case)
+                        await self._run_hercules_test(
+                            test_case.file_path, instance,
+                            extra_env={PARAMS_ENV: json.dumps(instance.parameters)},
+                        )
+                        self._record_load_feedback(instance)
+                else:
+                    instance.status = "running"
+                    await self._simulate_test_run(
+                        self._instantiate(test_case, instance.parameters), instance
+                    )
+            except Exception as e:
+                instance.status = "error"
+                instance.error_message = str(e)
+                instance.completed_at = datetime.now()
+                if real_run:
+                    self._record_load_feedback(instance)
 
-        self.log("Verifying expected outcome")
-        self.verify_outcome("{test_case.expected_outcome}")
+        result.status = "running"
+        await asyncio.gather(*(run_instance(i, r) for i, r in enumerate(result.instances)))
 
-    def teardown(self):
-        self.log("Cleaning up")
+        statuses = [instance.status for instance in result.instances]
+        bad = [i for i in result.instances if i.status != "passed"]
+        if "error" in statuses:
+            result.status = "error"
+        elif bad:
+            result.status = "failed"
+        else:
+            result.status = "passed"
+        if bad:
+            result.error_message = (
+                f"{len(bad)} of {len(statuses)} parameter sets did not pass: "
+                + "; ".join(f"[{describe(i.parameters)}] {i.status}" for i in bad)
+            )
+        result.logs.extend(f"{i.test_name}: {i.status}" for i in result.instances)
+        result.resource_usage = self._sum_usage(result.instances)
+        result.execution_time = time.time() - start_time
+        result.completed_at = datetime.now()
 
+    @staticmethod
+    def _instantiate(test_case: TestCase, params: Dict[str, str]) -> TestCase:
+        """The case with one parameter set filled in (for simulated runs)."""
+        return test_case.model_copy(update={
+            "steps": [substitute(step, params) for step in test_case.steps],
+            "expected_outcome": substitute(test_case.expected_outcome, params),
+        })
 
-if __name__ == "__main__":
-    {class_name}().run()
-'''
+    @staticmethod
+    def _sum_usage(results: List[TestResult]) -> Optional[ResourceUsage]:
+        usages = [r.resource_usage for r in results if r.resource_usage]
+        if not usages:
+            return None
+        return ResourceUsage(
+            user_cpu=sum(u.user_cpu for u in usages),
+            system_cpu=sum(u.system_cpu for u in usages),
+            max_rss_kb=max(u.max_rss_kb for u in usages),
+            voluntary_ctx_switches=sum(u.voluntary_ctx_switches for u in usages),
+            involuntary_ctx_switches=sum(u.involuntary_ctx_switches for u in usages),
+        )
 
-    async def _run_hercules_test(self, test_file: str, result: TestResult) -> None:
+    async def _run_hercules_test(
+        self,
+        test_file: str,
+        result: TestResult,
+        extra_env: Optional[Dict[str, str]] = None,
+    ) -> None:
         """Execute actual Hercules test."""
         
         start_time = time.time()
+
+        # Each run gets its own output dir so we know exactly which files
+        # it produced; they are moved into the artifact store afterwards.
+        output_dir = tempfile.mkdtemp(prefix="hercules_run_")
+        env = dict(os.environ, HERCULES_OUTPUT_DIR=output_dir, **(extra_env or {}))
+        env.setdefault("PYTHONUNBUFFERED", "1")  # step markers as they're logged
         
         cmd = [self.hercules_path, "run", test_file]
+        usage_file = None
+        if rusage_available():
+            # Reaped by the wrapper so we get the run's rusage back
+            usage_file = f"{output_dir}.usage.json"
+            cmd = [sys.executable, WRAPPER_PATH, usage_file, *cmd]
         proc = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             cwd=os.path.dirname(test_file),
+            env=env,
+            start_new_session=True,  # own process group, so browsers die with it
+            limit=_STREAM_LIMIT,
         )
 
-        self._running_processes[result.test_id] = proc
-        stdout, stderr = await proc.communicate()
+        timer = StepTimer(result.step_timings)
+
+        async def read_stdout() -> None:
+            async for line in _read_lines(proc.stdout):
+                timer.feed(line, time.time())
+                result.logs.append(line)
+
+        self._running_processes[result.run_id] = proc
+        self._track_process(result.run_id, proc, {result.test_id: result.test_name})
+        try:
+            _, stderr = await asyncio.gather(read_stdout(), proc.stderr.read())
+            await proc.wait()
+        except BaseException:
+            # Don't leave a browser running for a caller that's gone, or
+            # for output we failed to read
+            self._kill_process_group(proc)
+            await proc.wait()
+            raise
+        finally:
+            timer.finish(time.time())
+            self._running_processes.pop(result.run_id, None)
+            self._inflight.remove(result.run_id)
+            await asyncio.to_thread(self._collect_artifacts, output_dir, result)
+            if usage_file:
+                result.resource_usage = self._read_usage(usage_file)
 
-        # Collect output
-        result.logs.extend(stdout.decode().splitlines())
-        if stderr:
-            result.logs.extend(stderr.decode().splitlines())
+        # stdout was collected as it streamed in
+        stderr_text = stderr.decode(errors="replace")
+        if stderr_text:
+            result.logs.extend(stderr_text.splitlines())
 
         # Determine result
         if proc.returncode == 0:
             result.status = "passed"
         else:
             result.status = "failed"
-            result.error_message = stderr.decode() or "Test failed"
+            result.error_message = stderr_text or "Test failed"
 
         result.execution_time = time.time() - start_time
         result.completed_at = datetime.now()
-        
-        # Cleanup
-        self._running_processes.pop(result.test_id, None)
+
+    async def _run_hercules_batch(
+        self,
+        suite_file: str,
+        results: Dict[str, TestResult],
+        on_result: Optional[Callable[[TestResult], None]],
+    ) -> None:
+        """Run a generated suite module and split its output per test."""
+
+        output_root = tempfile.mkdtemp(prefix="hercules_batch_")
+        env = dict(os.environ, HERCULES_OUTPUT_DIR=output_root)
+        env.setdefault("PYTHONUNBUFFERED", "1")
+
+        proc = await asyncio.create_subprocess_exec(
+            self.hercules_path, "run", suite_file,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,  # keep ordering for attribution
+            cwd=os.path.dirname(suite_file),
+            env=env,
+            start_new_session=True,
+            limit=_STREAM_LIMIT,
+        )
+        for result in results.values():
+            self._running_processes[result.run_id] = proc
+        batch_run_id = f"batch-{uuid.uuid4()}"
+        self._track_process(
+            batch_run_id, proc, {t: r.test_name for t, r in results.items()}
+        )
+
+        shared_logs: List[str] = []  # output outside any test (setup, teardown)
+        current: Optional[TestResult] = None
+        start_times: Dict[str, float] = {}
+        timers: Dict[str, StepTimer] = {}
+
+        try:
+            async for line in _read_lines(proc.stdout):
+                marker = None
+                if line.startswith(SUITE_MARKER):
+                    try:
+                        marker = self._parse_suite_marker(line)
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Ignoring malformed suite marker {line[:200]!r}: {e}")
+                if marker is None:
+                    if current:
+                        timers[current.test_id].feed(line, time.time())
+                        current.logs.append(line)
+                    else:
+                        shared_logs.append(line)
+                    continue
+
+                kind, test_id, fields = marker
+                result = results.get(test_id)
+                if result is None:
+                    continue
+
+                if kind == "START":
+                    start_times[test_id] = fields["at"]
+                    result.status = "running"
+                    result.started_at = datetime.fromtimestamp(start_times[test_id])
+                    timers[test_id] = StepTimer(result.step_timings)
+                    current = result
+                elif kind == "ERROR":
+                    result.error_message = fields["message"]
+                elif kind == "END":
+                    end_ts, status = fields["at"], fields["status"]
+                    if test_id in timers:
+                        timers[test_id].finish(end_ts)
+                    result.status = status
+                    if fields["usage"] is not None:
+                        result.resource_usage = fields["usage"]
+                    result.completed_at = datetime.fromtimestamp(end_ts)
+                    result.execution_time = end_ts - start_times.get(test_id, end_ts)
+                    if status != "passed" and not result.error_message:
+                        result.error_message = "Test failed"
+                    current = None
+                    self._running_processes.pop(result.run_id, None)
+                    await asyncio.to_thread(
+                        self._collect_artifacts, os.path.join(output_root, test_id), result
+                    )
+                    if on_result:
+                        on_result(result)
+            await proc.wait()
+        except BaseException:
+            self._kill_process_group(proc)
+            await proc.wait()
+            raise
+        finally:
+            for result in results.values():
+                self._running_processes.pop(result.run_id, None)
+            self._inflight.remove(batch_run_id)
+            shutil.rmtree(output_root, ignore_errors=True)
+
+        # Anything without an END marker died with the process
+        for result in results.values():
+            if result.status in ("queued", "running"):
+                result.status = "error"
+                result.error_message = (
+                    f"Suite process exited with code {proc.returncode} before this test finished"
+                )
+                result.logs.extend(shared_logs[-20:])
+                result.completed_at = datetime.now()
+                if on_result:
+                    on_result(result)
+
+    @staticmethod
+    def _parse_suite_marker(line: str) -> Tuple[str, str, Dict[str, Any]]:
+        """Split a `SUITE_MARKER` line into kind, test id and its fields.
+
+        Raises ValueError (or TypeError) if the line doesn't parse.
+        """
+        _, kind, test_id, payload = line.split(" ", 3)
+        if kind == "START":
+            return kind, test_id, {"at": float(payload)}
+        if kind == "ERROR":
+            return kind, test_id, {"message": str(json.loads(payload))}
+        if kind == "END":
+            end_ts, status, *usage = payload.split(" ", 2)
+            if status not in ("passed", "failed", "error"):
+                raise ValueError(f"unknown status {status!r}")
+            resource_usage = None
+            if usage and usage[0] != "null":
+                resource_usage = ResourceUsage(**json.loads(usage[0]))
+            return kind, test_id, {"at": float(end_ts), "status": status, "usage": resource_usage}
+        raise ValueError(f"unknown marker {kind!r}")
+
+    def _track_process(
+        self, run_id: str, proc: asyncio.subprocess.Process, test_names: Dict[str, str]
+    ) -> None:
+        try:
+            self._inflight.add(run_id, proc.pid, test_names)
+        except OSError as e:
+            logger.warning(f"Could not journal in-flight run {run_id}: {e}")
+
+    def _recover_orphaned_runs(self) -> None:
+        """Kill runs left behind by a server that died, and fail their results."""
+        for entry in self._inflight.recover():
+            message = (
+                f"Server (pid {entry.get('owner_pid')}) exited while this run was in "
+                f"flight; {entry['reaped']} orphaned process(es) killed"
+            )
+            logger.warning(f"Run {entry['run_id']}: {message}")
+            started_at = datetime.fromisoformat(entry["started_at"])
+            test_names = entry.get("test_names", {})
+            for test_id, test_name in test_names.items():
+                result = TestResult(
+                    test_id=test_id,
+                    test_name=test_name,
+                    status="error",
+                    error_message=message,
+                    started_at=started_at,
+                    completed_at=datetime.now(),
+                )
+                if len(test_names) == 1:
+                    result.run_id = entry["run_id"]  # the id the old server handed out
+                with self._lock:
+                    self._test_results[test_id] = result
+                self._record_result(result)
+
+    @staticmethod
+    def _read_usage(usage_file: str) -> Optional[ResourceUsage]:
+        usage = read_usage_file(usage_file)
+        try:
+            os.unlink(usage_file)
+        except FileNotFoundError:
+            pass
+        return ResourceUsage(**usage) if usage else None
+
+    @staticmethod
+    def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+        if proc.returncode is not None:
+            return
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+
+    def _collect_artifacts(self, output_dir: str, result: TestResult) -> None:
+        """Move files a run produced into the artifact store."""
+        try:
+            for path in sorted(Path(output_dir).rglob("*")):
+                if not path.is_file():
+                    continue
+                with open(path, "rb") as fh:
+                    mime_type = sniff_mime_type(fh.read(16))
+                uri = self.artifacts.put_file(path)
+                if mime_type.startswith("image/"):
+                    result.screenshots.append(uri)
+                else:
+                    result.artifacts.append(uri)
+
+            if self.artifacts.over_quota():
+                self.collect_artifact_garbage()
+        except OSError as e:
+            logger.warning(f"Could not store artifacts for {result.test_id}: {e}")
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
 
     async def _simulate_test_run(self, test_case: TestCase, result: TestResult) -> None:
         """Simulate test execution when Hercules not available."""
         
         start_time = time.time()
 
-        result.logs.append(f"Starting test: {test_case.name}")
-        result.logs.append(f"Description: {test_case.description}")
+        timer = StepTimer(result.step_timings)
+
+        def log(line: str) -> None:
+            timer.feed(line, time.time())
+            result.logs.append(line)
+
+        log(f"Starting test: {test_case.name}")
+        log(f"Description: {test_case.description}")
 
-        # Simulate step execution
+        # Simulate step execution, logging each step as it starts like
+        # generated files do
         for i, step in enumerate(test_case.steps, 1):
+            log(f"Step {i}: {step}")
             await asyncio.sleep(0.1)  # fake some work
-            result.logs.append(f"Step {i}: {step}")
 
+        log(f"Verifying: {test_case.expected_outcome}")
         await asyncio.sleep(0.2)
-        result.logs.append(f"Verifying: {test_case.expected_outcome}")
         
         # Always pass in simulation (makes testing easier)
         result.status = "passed"
@@ -0,0 +1,174 @@
+"""Machine-wide cap on concurrent Hercules runs.
+
+Claude Desktop, Cursor and the VSCode helper each start their own
+server, so an in-process semaphore can't stop three editors from
+launching a dozen browsers between them.  Instead every manager on the
+host competes for the same N slot files in a shared directory, each
+guarded by an exclusive `flock`.
+
+Because the lock belongs to the open file, the kernel drops it the
+moment the holding process exits - however it exits - so slots held by
+a crashed server are reclaimed without any cleanup pass.  Holders write
+their pid/test id into the slot file so `holders()` can show who has
+what.
+
+On platforms without `fcntl` (Windows) the limiter is a no-op.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def default_slot_count() -> int:
+    # A Hercules run is a whole browser; half the cores is plenty
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+class Slot:
+    """A held execution slot. Release it (or exit the process) to free it."""
+
+    def __init__(self, index: int, fd: Optional[int]):
+        self.index = index
+        self._fd = fd
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+
+class HostSlotLimiter:
+    """Counting semaphore shared by every process on the host."""
+
+    def __init__(
+        self,
+        slots: Optional[int] = None,
+        lock_dir: str | Path | None = None,
+        *,
+        poll_interval: float = 0.25,
+    ):
+        if slots is None:
+            env_slots = os.getenv("HERCULES_HOST_SLOTS")
+            slots = int(env_slots) if env_slots else default_slot_count()
+        if lock_dir is None:
+            lock_dir = os.getenv("HERCULES_SLOT_DIR") or (
+                Path(tempfile.gettempdir()) / "hercules_slots"
+            )
+
+        self.slots = slots
+        self.lock_dir = Path(lock_dir)
+        self.poll_interval = poll_interval
+
+    @property
+    def enabled(self) -> bool:
+        return fcntl is not None and self.slots > 0
+
+    def try_acquire(self, owner: str) -> Optional[Slot]:
+        """Grab any free slot without waiting, or return None."""
+        if not self.enabled:
+            return Slot(-1, None)
+
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        # Start at a random slot so waiters don't all hammer slot 0
+        start = random.randrange(self.slots)
+        for offset in range(self.slots):
+            index = (start + offset) % self.slots
+            try:
+                fd = os.open(self._slot_path(index), os.O_RDWR | os.O_CREAT, 0o666)
+            except PermissionError:
+                continue
+            try:
+                os.fchmod(fd, 0o666)  # other users' servers share the slots too
+            except OSError:
+                pass
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+
+            info = {
+                "pid": os.getpid(),
+                "host": socket.gethostname(),
+                "owner": owner,
+                "acquired_at": datetime.now().isoformat(),
+            }
+            os.ftruncate(fd, 0)
+            os.pwrite(fd, json.dumps(info).encode(), 0)
+            return Slot(index, fd)
+        return None
+
+    async def acquire(self, owner: str) -> Slot:
+        """Wait until a slot is free on this host."""
+        logged = False
+        while True:
+            slot = self.try_acquire(owner)
+            if slot is not None:
+                return slot
+            if not logged:
+                logger.info(f"All {self.slots} host execution slots busy - {owner} waiting")
+                logged = True
+            await asyncio.sleep(self.poll_interval * (0.5 + random.random()))
+
+    def release(self, slot: Slot) -> None:
+        if slot._fd is None:
+            return
+        fd, slot._fd = slot._fd, None
+        try:
+            os.ftruncate(fd, 0)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @asynccontextmanager
+    async def slot(self, owner: str) -> AsyncIterator[Slot]:
+        held = await self.acquire(owner)
+        try:
+            yield held
+        finally:
+            self.release(held)
+
+    def holders(self) -> List[Dict[str, Any]]:
+        """Who currently holds each busy slot, across all processes."""
+        if not self.enabled or not self.lock_dir.exists():
+            return []
+
+        busy = []
+        for index in range(self.slots):
+            path = self._slot_path(index)
+            if not path.exists():
+                continue
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raw = os.pread(fd, 4096, 0)
+                    try:
+                        info = json.loads(raw) if raw else {}
+                    except ValueError:
+                        info = {}  # caught mid-write
+                    busy.append({"slot": index, **info})
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        return busy
+
+    def _slot_path(self, index: int) -> Path:
+        return self.lock_dir / f"slot-{index}.lock"
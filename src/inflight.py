@@ -0,0 +1,152 @@
+"""Durable record of the Hercules processes a server has in flight.
+
+Runs are started in their own session so a run's browsers can be killed
+as one process group - which also means nothing takes them down if the
+server itself dies.  Their results die with the server, while the
+browsers keep burning CPU and memory unsupervised.
+
+So each run is recorded here when it is spawned (one small JSON file per
+run: pid, process group, kernel start time, and the same for the owning
+server) and the file is removed once the run is reaped.  A manager
+starting up calls `recover()`: any entry whose owner is gone is claimed,
+its surviving process group is killed and the entry is handed back so
+its results can be marked as errors.  Nothing can be reattached - the
+output pipes went with the old server - so orphans are always reaped.
+
+Kernel start times guard against pid reuse: a process is only killed if
+it is in the recorded group *and* started no earlier than the recorded
+run.  Entries from before a reboot are reported but nothing is killed.
+Files aren't fsynced; a server crash leaves them in the page cache, and
+an OS crash leaves no orphans to reap.
+"""
+
+import json
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .processes import boot_id, group_members, pid_alive, process_start_ticks
+
+logger = logging.getLogger(__name__)
+
+
+class InFlightJournal:
+    """One file per running Hercules process, removed once it is reaped."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._owner_pid = os.getpid()
+        self._owner_start = process_start_ticks(self._owner_pid)
+        self._boot_id = boot_id()
+
+    def add(self, run_id: str, pid: int, test_names: Dict[str, str]) -> None:
+        """Record a freshly spawned run; `test_names` maps test id -> name."""
+        try:
+            pgid = os.getpgid(pid)
+        except OSError:
+            pgid = pid  # already gone; it was its own session leader
+        entry = {
+            "run_id": run_id,
+            "pid": pid,
+            "pgid": pgid,
+            "start_ticks": process_start_ticks(pid),
+            "boot_id": self._boot_id,
+            "owner_pid": self._owner_pid,
+            "owner_start_ticks": self._owner_start,
+            "test_names": test_names,
+            "started_at": datetime.now().isoformat(),
+        }
+        path = self._path(run_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, path)
+
+    def remove(self, run_id: str) -> None:
+        try:
+            self._path(run_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def recover(self, grace: float = 0.5) -> List[Dict[str, Any]]:
+        """Reap runs whose server is gone and return their entries.
+
+        Each returned entry gains `reaped`, the number of processes killed.
+        """
+        # Entries claimed by a server that then died itself go back in the pool
+        for path in self.root.glob("*.recovering-*"):
+            claimer = path.suffix.rsplit("-", 1)[-1]
+            if claimer.isdigit() and not pid_alive(int(claimer)):
+                os.replace(path, path.with_suffix(".json"))
+
+        recovered = []
+        for path in sorted(self.root.glob("*.json")):
+            try:
+                entry = json.loads(path.read_text())
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                logger.warning(f"Dropping unreadable in-flight entry {path.name}")
+                path.unlink(missing_ok=True)
+                continue
+            if self._owner_alive(entry):
+                continue
+
+            # Claim it so two servers starting together don't both report it
+            claimed = path.with_suffix(f".recovering-{self._owner_pid}")
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            entry["reaped"] = self._reap(entry, grace)
+            claimed.unlink(missing_ok=True)
+            recovered.append(entry)
+        return recovered
+
+    def _owner_alive(self, entry: Dict[str, Any]) -> bool:
+        if entry.get("boot_id") != self._boot_id:
+            return False
+        owner = entry.get("owner_pid")
+        if owner == self._owner_pid:
+            # Either ours, or left by an earlier process that had our pid
+            return entry.get("owner_start_ticks") == self._owner_start
+        if not owner or not pid_alive(owner):
+            return False
+        recorded, current = entry.get("owner_start_ticks"), process_start_ticks(owner)
+        return recorded is None or current is None or current == recorded
+
+    def _reap(self, entry: Dict[str, Any], grace: float) -> int:
+        if entry.get("boot_id") != self._boot_id:
+            return 0  # rebooted since; those processes are long gone
+        pgid, since = entry["pgid"], entry.get("start_ticks")
+
+        members = group_members(pgid, since)
+        if members is None:
+            # No /proc: only trust a leader that is still in its own group
+            try:
+                members = [entry["pid"]] if os.getpgid(entry["pid"]) == pgid else []
+            except OSError:
+                members = []
+
+        killed = set()
+        # A couple of passes, in case something forked while we were killing
+        deadline = time.monotonic() + grace
+        while members:
+            for pid in members:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                    killed.add(pid)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+            members = [p for p in (group_members(pgid, since) or []) if p not in killed]
+        return len(killed)
+
+    def _path(self, run_id: str) -> Path:
+        return self.root / f"{run_id}.json"
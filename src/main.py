@@ -4,14 +4,17 @@ Exposes the HerculesManager functionality as MCP tools that can be used
 by AI assistants and other MCP clients.
 """
 
+import argparse
 import logging
 import os
 import sys
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional
 
 # Import FastMCP with fallback for environments that don't have it
 try:
     from fastmcp import FastMCP
+    from fastmcp.resources import ResourceContent, ResourceResult
     FASTMCP_AVAILABLE = True
 except ImportError:
     FASTMCP_AVAILABLE = False
@@ -20,6 +23,7 @@ except ImportError:
         def __init__(self, name: str):
             self.name = name
             self._tools = {}
+            self._resources = {}
 
         def tool(self, *args, **kwargs):
             def decorator(func):
@@ -27,6 +31,12 @@ except ImportError:
                 return func
             return decorator
 
+        def resource(self, uri: str, *args, **kwargs):
+            def decorator(func):
+                self._resources[uri] = func
+                return func
+            return decorator
+
         def run(self, *args, **kwargs):
             print(f"FastMCP stub - would run server with tools: {list(self._tools.keys())}")
             print("Note: FastMCP not available, running in stub mode")
@@ -35,8 +45,20 @@ from .hercules_manager import HerculesManager
 
 logger = logging.getLogger(__name__)
 
-# Global manager instance
-_manager = HerculesManager()
+# Global manager instance, built on first use so that importing this
+# module doesn't touch the state dir
+_manager: Optional[HerculesManager] = None
+_manager_lock = threading.Lock()
+
+
+def _get_manager() -> HerculesManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = HerculesManager()
+    return _manager
+
 
 # Initialize MCP server
 mcp = FastMCP("TestZeus Hercules MCP Server")
@@ -47,14 +69,24 @@ def create_test_case(
     description: str, 
     steps: List[str],
     expected_outcome: str,
+    parameters: Optional[List[Dict[str, str]]] = None,
+    depends_on: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
-    """Create a new Hercules test case."""
+    """Create a new Hercules test case.
+
+    For data-driven tests, use `{{name}}` placeholders in steps and
+    expected outcome and pass one `parameters` object per data row; a
+    run then executes every row concurrently and reports them together.
+    `depends_on` lists ids of tests that must pass first in a suite.
+    """
     try:
-        test_case = _manager.create_test_case(
+        test_case = _get_manager().create_test_case(
             name=name,
             description=description,
             steps=steps,
             expected_outcome=expected_outcome,
+            parameters=parameters,
+            depends_on=depends_on,
         )
         
         # Convert to dict (handle both pydantic v1 and v2)
@@ -73,10 +105,47 @@ def create_test_case(
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
-async def run_test(test_id: str) -> Dict[str, Any]:
-    """Execute a test case."""
+def create_test_cases(test_cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create several test cases at once.
+
+    Each item takes the same fields as `create_test_case`.  All of them
+    are validated first; if any is invalid nothing is created.
+    """
     try:
-        result = await _manager.run_test(test_id)
+        created = _get_manager().create_test_cases(test_cases)
+
+        test_data = []
+        for case in created:
+            if hasattr(case, "model_dump"):
+                test_data.append(case.model_dump())
+            else:
+                test_data.append(case.dict())
+
+        return {
+            "success": True,
+            "test_cases": test_data,
+            "message": f"Created {len(created)} tests",
+        }
+    except Exception as e:
+        logger.error(f"Failed to create test cases: {e}")
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+async def run_test(
+    test_id: str,
+    use_cache: bool = False,
+    env_fingerprint: str = "",
+) -> Dict[str, Any]:
+    """Execute a test case.
+
+    Set `use_cache` to skip the run when the test file, Hercules binary and
+    `env_fingerprint` (e.g. deployed commit or target URL) haven't changed
+    since the last pass; the cached result comes back with `cached: true`.
+    """
+    try:
+        result = await _get_manager().run_test(
+            test_id, use_cache=use_cache, env_fingerprint=env_fingerprint
+        )
         
         # Convert to dict
         if hasattr(result, "model_dump"):
@@ -92,7 +161,7 @@ async def run_test(test_id: str) -> Dict[str, Any]:
 @mcp.tool()
 def get_test_result(test_id: str) -> Dict[str, Any]:
     """Get test execution results."""
-    result = _manager.get_test_result(test_id)
+    result = _get_manager().get_test_result(test_id)
     if not result:
         return {"success": False, "message": "No result found"}
     
@@ -107,7 +176,7 @@ def get_test_result(test_id: str) -> Dict[str, Any]:
 @mcp.tool()
 def list_test_cases() -> Dict[str, Any]:
     """List all test cases."""
-    cases = _manager.list_test_cases()
+    cases = _get_manager().list_test_cases()
     
     test_data = []
     for case in cases:
@@ -122,10 +191,91 @@ def list_test_cases() -> Dict[str, Any]:
         "test_cases": test_data,
     }
 
+@mcp.tool()
+def search_test_cases(query: str, limit: int = 10) -> Dict[str, Any]:
+    """Search test cases by name, description, steps and expected outcome."""
+    cases = _get_manager().search_test_cases(query, limit)
+
+    test_data = []
+    for case in cases:
+        if hasattr(case, "model_dump"):
+            test_data.append(case.model_dump())
+        else:
+            test_data.append(case.dict())
+
+    return {
+        "success": True,
+        "count": len(cases),
+        "test_cases": test_data,
+    }
+
+@mcp.tool()
+def update_test_case(
+    test_id: str,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    steps: Optional[List[str]] = None,
+    expected_outcome: Optional[str] = None,
+    parameters: Optional[List[Dict[str, str]]] = None,
+    depends_on: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Edit a test case by publishing a new version of it.
+
+    Only the fields given are changed.  Earlier versions are kept, and
+    every result records the `test_version` it ran against.
+    """
+    try:
+        test_case = _get_manager().update_test_case(
+            test_id,
+            name=name,
+            description=description,
+            steps=steps,
+            expected_outcome=expected_outcome,
+            parameters=parameters,
+            depends_on=depends_on,
+        )
+
+        if hasattr(test_case, "model_dump"):
+            test_data = test_case.model_dump()
+        else:
+            test_data = test_case.dict()
+
+        return {
+            "success": True,
+            "test_case": test_data,
+            "message": f"Test {test_id} is at version {test_case.version}",
+        }
+    except Exception as e:
+        logger.error(f"Failed to update test case {test_id}: {e}")
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+def get_test_case_versions(test_id: str) -> Dict[str, Any]:
+    """Every version of a test case, oldest first."""
+    try:
+        versions = _get_manager().get_test_case_versions(test_id)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    version_data = []
+    for version in versions:
+        if hasattr(version, "model_dump"):
+            version_data.append(version.model_dump())
+        else:
+            version_data.append(version.dict())
+    return {"success": True, "count": len(versions), "versions": version_data}
+
+@mcp.tool()
+def delete_test_case(test_id: str) -> Dict[str, Any]:
+    """Delete a test case."""
+    if not _get_manager().delete_test_case(test_id):
+        return {"success": False, "message": "Test not found"}
+    return {"success": True, "message": f"Deleted test: {test_id}"}
+
 @mcp.tool()
 def list_test_results() -> Dict[str, Any]:
     """List all test results."""
-    results = _manager.list_test_results()
+    results = _get_manager().list_test_results()
     
     result_data = []
     for result in results:
@@ -140,10 +290,138 @@ def list_test_results() -> Dict[str, Any]:
         "results": result_data,
     }
 
+def _suite_response(suite) -> Dict[str, Any]:
+    if hasattr(suite, "model_dump"):
+        suite_data = suite.model_dump()
+    else:
+        suite_data = suite.dict()
+    return {"success": True, "suite_run": suite_data}
+
+@mcp.tool()
+async def run_suite(
+    test_ids: List[str],
+    max_parallel: int = 4,
+    use_cache: bool = False,
+    env_fingerprint: str = "",
+    batch: bool = False,
+) -> Dict[str, Any]:
+    """Run several test cases as one suite, checkpointing each outcome.
+
+    With `batch`, tests share at most `max_parallel` Hercules processes
+    instead of launching one per test.  Prerequisites (`depends_on`) are
+    added and run first; tests whose prerequisite fails are skipped.
+    """
+    try:
+        suite = await _get_manager().run_suite(
+            test_ids,
+            max_parallel=max_parallel,
+            use_cache=use_cache,
+            env_fingerprint=env_fingerprint,
+            batch=batch,
+        )
+        return _suite_response(suite)
+    except Exception as e:
+        logger.error(f"Failed to run suite: {e}")
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+async def rerun_failed(
+    suite_run_id: str,
+    max_parallel: int = 4,
+    use_cache: bool = False,
+    env_fingerprint: str = "",
+    batch: bool = False,
+) -> Dict[str, Any]:
+    """Re-run only the failed, errored or unfinished tests of a suite run."""
+    try:
+        suite = await _get_manager().rerun_failed(
+            suite_run_id,
+            max_parallel=max_parallel,
+            use_cache=use_cache,
+            env_fingerprint=env_fingerprint,
+            batch=batch,
+        )
+        return _suite_response(suite)
+    except Exception as e:
+        logger.error(f"Failed to rerun suite {suite_run_id}: {e}")
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+async def resume_suite(
+    suite_run_id: str,
+    max_parallel: int = 4,
+    use_cache: bool = False,
+    env_fingerprint: str = "",
+    batch: bool = False,
+) -> Dict[str, Any]:
+    """Finish an interrupted suite run without repeating completed tests."""
+    try:
+        suite = await _get_manager().resume_suite(
+            suite_run_id,
+            max_parallel=max_parallel,
+            use_cache=use_cache,
+            env_fingerprint=env_fingerprint,
+            batch=batch,
+        )
+        return _suite_response(suite)
+    except Exception as e:
+        logger.error(f"Failed to resume suite {suite_run_id}: {e}")
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+def get_suite_run(suite_run_id: str) -> Dict[str, Any]:
+    """Get a suite run's status and per-test outcomes."""
+    suite = _get_manager().get_suite_run(suite_run_id)
+    if not suite:
+        return {"success": False, "message": "Suite run not found"}
+    return _suite_response(suite)
+
+@mcp.tool()
+def invalidate_result_cache(test_id: Optional[str] = None) -> Dict[str, Any]:
+    """Drop cached results for a test, or for every test if no id is given."""
+    removed = _get_manager().invalidate_result_cache(test_id)
+    return {"success": True, "invalidated": removed}
+
+@mcp.tool()
+def get_execution_slots() -> Dict[str, Any]:
+    """Show the machine-wide Hercules execution slots and their holders."""
+    return {"success": True, **_get_manager().get_execution_slots()}
+
+@mcp.tool()
+def get_concurrency_status(decisions: int = 20) -> Dict[str, Any]:
+    """Show the adaptive concurrency limit and its recent decisions (for tuning)."""
+    return {"success": True, **_get_manager().get_concurrency_status(decisions)}
+
+@mcp.tool()
+def get_resource_usage(test_id: Optional[str] = None) -> Dict[str, Any]:
+    """Per-test CPU time, peak memory and context switches across all runs."""
+    usage = _get_manager().get_resource_usage(test_id)
+    if test_id is not None and usage.get(test_id) is None:
+        return {"success": False, "message": f"No resource usage recorded for {test_id}"}
+    return {"success": True, "usage": usage}
+
+@mcp.tool()
+def get_step_timings(test_id: str) -> Dict[str, Any]:
+    """Per-step start, end and duration of a test's latest run, plus
+    per-step latency (mean/p50/p95/max) over its recent runs."""
+    try:
+        return {"success": True, **_get_manager().get_step_timings(test_id)}
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+def get_slowest_steps(limit: int = 10, suite_run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Slowest steps by mean duration over recent runs, across all tests
+    or only those of one suite run."""
+    try:
+        return {"success": True, "steps": _get_manager().get_slowest_steps(limit, suite_run_id)}
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
 @mcp.tool()
 def get_test_status(test_id: str) -> Dict[str, Any]:
     """Get current test status."""
-    result = _manager.get_test_result(test_id)
+    result = _get_manager().get_test_result(test_id)
     if not result:
         return {"success": False, "message": "Test not found"}
 
@@ -155,29 +433,99 @@ def get_test_status(test_id: str) -> Dict[str, Any]:
         "execution_time": result.execution_time,
     }
 
-if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO)
+@mcp.resource("hercules://artifacts/{digest}", mime_type="application/octet-stream")
+def read_artifact(digest: str) -> "ResourceResult":
+    """Screenshot or other run output referenced from a test result."""
+    data, mime_type = _get_manager().read_artifact_with_type(digest)
+    return ResourceResult([ResourceContent(data, mime_type=mime_type)])
+
+def _transport_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    """Translate CLI/env settings into `mcp.run()` keyword arguments."""
+    if args.transport == "stdio":
+        return {}
+
+    return {
+        "transport": args.transport,
+        "host": args.host,
+        "port": args.port,
+        "uvicorn_config": {
+            # Beyond this many concurrent connections/requests uvicorn
+            # answers 503 instead of queueing unboundedly
+            "limit_concurrency": args.max_connections,
+            # Idle keep-alive connections are closed after this many seconds
+            "timeout_keep_alive": args.keep_alive,
+            "timeout_graceful_shutdown": args.keep_alive,
+        },
+    }
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="TestZeus Hercules MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "http", "sse"],
+        default=os.getenv("MCP_TRANSPORT", "stdio"),
+        help="stdio (one process per client) or http/sse (many clients, one manager)",
+    )
+    parser.add_argument("--host", default=os.getenv("MCP_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_SERVER_PORT", "8000")))
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=int(os.getenv("MCP_MAX_CONNECTIONS", "64")),
+        help="concurrent connection limit for http/sse",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        type=int,
+        default=int(os.getenv("MCP_KEEP_ALIVE", "30")),
+        help="seconds an idle keep-alive connection is held open",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+    # Status output goes to stderr - under stdio, stdout *is* the protocol
+    out = sys.stderr
     
     # Check if this is a CI environment or if FastMCP is not available
     is_ci = os.getenv('CI') == 'true' or os.getenv('GITHUB_ACTIONS') == 'true'
     
     if is_ci:
-        print("🧪 Running in CI mode - FastMCP server simulation")
-        print("✅ MCP tools registered:")
-        for tool_name in ['create_test_case', 'run_test', 'get_test_result', 
-                         'list_test_cases', 'list_test_results', 'get_test_status']:
-            print(f"   - {tool_name}")
-        print("✅ HerculesManager initialized")
-        print("✅ Server would be ready for MCP connections")
+        print("🧪 Running in CI mode - FastMCP server simulation", file=out)
+        print("✅ MCP tools registered:", file=out)
+        for tool_name in ['create_test_case', 'create_test_cases', 'run_test', 'get_test_result', 
+                         'list_test_cases', 'search_test_cases', 'update_test_case',
+                         'get_test_case_versions', 'delete_test_case',
+                         'list_test_results', 'invalidate_result_cache', 'get_test_status',
+                         'run_suite', 'rerun_failed', 'resume_suite', 'get_suite_run',
+                         'get_execution_slots', 'get_concurrency_status',
+                         'get_resource_usage', 'get_step_timings', 'get_slowest_steps']:
+            print(f"   - {tool_name}", file=out)
+        _get_manager()
+        print("✅ HerculesManager initialized", file=out)
+        print("✅ Server would be ready for MCP connections", file=out)
         # Exit successfully in CI mode
         sys.exit(0)
     elif not FASTMCP_AVAILABLE:
-        print("⚠️  FastMCP not available - running in stub mode")
-        print("   Install FastMCP for full server functionality")
-        print("   For now, you can use the HerculesManager directly")
+        print("⚠️  FastMCP not available - running in stub mode", file=out)
+        print("   Install FastMCP for full server functionality", file=out)
+        print("   For now, you can use the HerculesManager directly", file=out)
         sys.exit(0)
     else:
-        print("🚀 Starting Hercules MCP server...")
-        print(f"   FastMCP available: {FASTMCP_AVAILABLE}")
-        print(f"   Tools registered: {len(mcp._tools) if hasattr(mcp, '_tools') else 'unknown'}")
-        mcp.run()
\ No newline at end of file
+        print("🚀 Starting Hercules MCP server...", file=out)
+        # Reap runs and pick up suites of a server that died before us
+        _get_manager().recover()
+        print(f"   FastMCP available: {FASTMCP_AVAILABLE}", file=out)
+        print(f"   Tools registered: {len(mcp._tools) if hasattr(mcp, '_tools') else 'unknown'}", file=out)
+        if args.transport != "stdio":
+            print(f"   Serving {args.transport} on http://{args.host}:{args.port} "
+                  f"(max {args.max_connections} connections, one shared manager)", file=out)
+        mcp.run(**_transport_kwargs(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 try:
     from pydantic import BaseModel, Field, ConfigDict
@@ -47,28 +47,92 @@ class MCPTestCase(BaseModel):
     expected_outcome: str
     created_at: datetime = Field(default_factory=datetime.now)
     file_path: Optional[str] = None
+    # Data rows for `{{name}}` placeholders in steps/expected_outcome;
+    # each set is one run of the case
+    parameters: List[Dict[str, str]] = Field(default_factory=list)
+    # Ids of cases that must pass before this one runs in a suite
+    depends_on: List[str] = Field(default_factory=list)
+    # Bumped by each update; a version is never modified once published
+    version: int = 1
 
     # Use ConfigDict for Pydantic v2 compatibility
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+class ResourceUsage(BaseModel):
+    """Kernel rusage of one run's process tree, taken when it was reaped."""
+
+    user_cpu: float = 0.0  # seconds
+    system_cpu: float = 0.0  # seconds
+    max_rss_kb: int = 0  # peak resident set of the largest process
+    voluntary_ctx_switches: int = 0
+    involuntary_ctx_switches: int = 0
+
+
+class StepTiming(BaseModel):
+    """When one step of a run started and ended, from its `Step N:` marker."""
+
+    index: int  # 1-based, as in the marker
+    description: str
+    started_at: datetime
+    completed_at: Optional[datetime] = None  # None while the step is running
+    duration: Optional[float] = None  # seconds
+
+
 class MCPTestResult(BaseModel):
     """Test result model - renamed to avoid pytest collection."""
     
+    run_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     test_id: str
     test_name: str
-    status: str = "pending"  # running, passed, failed, error
+    test_version: Optional[int] = None  # version of the case this ran against
+    status: str = "pending"  # queued, running, passed, failed, error, skipped
     logs: List[str] = Field(default_factory=list)
-    screenshots: List[str] = Field(default_factory=list)
+    screenshots: List[str] = Field(default_factory=list)  # artifact URIs
+    artifacts: List[str] = Field(default_factory=list)  # other run outputs, as URIs
     error_message: Optional[str] = None
     execution_time: Optional[float] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    cached: bool = False  # served from the result cache, not a fresh run
+    resource_usage: Optional[ResourceUsage] = None  # real Hercules runs only
+    parameters: Optional[Dict[str, str]] = None  # the set this instance ran with
+    instances: List["MCPTestResult"] = Field(default_factory=list)  # per parameter set
+    step_timings: List[StepTiming] = Field(default_factory=list)
 
     # Use ConfigDict for Pydantic v2 compatibility
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+if hasattr(MCPTestResult, "model_rebuild"):
+    MCPTestResult.model_rebuild()  # resolve the self-reference in `instances`
+
+
+class SuiteRun(BaseModel):
+    """A batch of tests run together, with per-test outcomes checkpointed."""
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    test_ids: List[str]
+    outcomes: Dict[str, str] = Field(default_factory=dict)  # test_id -> status
+    status: str = "running"  # running, completed, interrupted
+    attempts: int = 1
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+    # Chain of prerequisite runs that bounded the last attempt's duration
+    critical_path: List[str] = Field(default_factory=list)
+    critical_path_seconds: Optional[float] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+def to_json_dict(model: Any) -> Dict[str, Any]:
+    """Model -> JSON-safe dict under pydantic v2 or the fallback BaseModel."""
+    try:
+        return model.model_dump(mode="json")
+    except TypeError:
+        return model.dict()
+
+
 # Export with the expected names for backward compatibility
 TestCase = MCPTestCase
 TestResult = MCPTestResult
\ No newline at end of file
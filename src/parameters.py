@@ -0,0 +1,48 @@
+"""Placeholders for parametrized (data-driven) test cases.
+
+Steps and the expected outcome of a case may contain `{{name}}`
+placeholders, and the case carries a list of parameter sets.  The test
+file is generated once with the placeholders intact and filled in by the
+file itself at run time from `$HERCULES_PARAMS`, so N data rows share one
+definition and one file but still produce N runs.
+"""
+
+import re
+from typing import Dict, Iterable, List, Set
+
+PARAMS_ENV = "HERCULES_PARAMS"
+
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def placeholders(texts: Iterable[str]) -> Set[str]:
+    """Names of every `{{name}}` used in `texts`."""
+    names: Set[str] = set()
+    for text in texts:
+        names.update(PLACEHOLDER.findall(text))
+    return names
+
+
+def substitute(text: str, params: Dict[str, str]) -> str:
+    """Fill in placeholders; unknown names are left as they are."""
+    return PLACEHOLDER.sub(lambda m: str(params.get(m.group(1), m.group(0))), text)
+
+
+def validate_parameters(
+    steps: List[str], expected_outcome: str, parameters: List[Dict[str, str]]
+) -> None:
+    """Raise ValueError unless every parameter set defines every placeholder."""
+    needed = placeholders([*steps, expected_outcome])
+    for i, params in enumerate(parameters):
+        if not isinstance(params, dict):
+            raise ValueError(f"Parameter set {i} must be an object of name -> value")
+        missing = needed - set(params)
+        if missing:
+            raise ValueError(
+                f"Parameter set {i} is missing {', '.join(sorted(missing))}"
+            )
+
+
+def describe(params: Dict[str, str]) -> str:
+    """Short label for one parameter set, e.g. `user=alice, plan=pro`."""
+    return ", ".join(f"{key}={value}" for key, value in params.items())
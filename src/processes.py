@@ -0,0 +1,77 @@
+"""Process liveness and /proc helpers shared by everything that has to
+decide whether a pid recorded on disk (a workspace, a cold result
+store, a suite checkpoint, an in-flight run) still belongs to a live
+process.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists.
+
+    Errors other than "no such process" count as alive: callers use a
+    False to delete or take over what the pid owned, so when in doubt
+    leave it be.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (OverflowError, ValueError):
+        return False  # not a pid at all
+    except OSError:
+        return True  # e.g. EPERM - exists, just not ours
+    return True
+
+
+_PROC = Path("/proc")
+
+
+def _read_stat(pid: int) -> Optional[Tuple[str, int, int]]:
+    """(state, process group, start time in clock ticks) from /proc."""
+    try:
+        stat = (_PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # The command name is parenthesised and may itself contain spaces
+    fields = stat[stat.rindex(")") + 2:].split()
+    return fields[0], int(fields[2]), int(fields[19])
+
+
+def process_start_ticks(pid: int) -> Optional[int]:
+    """When `pid` started, in clock ticks since boot; None if unknown."""
+    stat = _read_stat(pid)
+    return stat[2] if stat else None
+
+
+def boot_id() -> Optional[str]:
+    try:
+        return (_PROC / "sys/kernel/random/boot_id").read_text().strip()
+    except OSError:
+        return None
+
+
+def group_members(pgid: int, started_since: Optional[int]) -> Optional[List[int]]:
+    """Live processes in group `pgid` started at or after `started_since`.
+
+    None where /proc isn't available to tell.
+    """
+    if not _PROC.is_dir():
+        return None
+    members = []
+    for entry in os.scandir(_PROC):
+        if not entry.name.isdigit():
+            continue
+        stat = _read_stat(int(entry.name))
+        if stat is None:
+            continue
+        state, group, started = stat
+        if group != pgid or state == "Z":
+            continue
+        if started_since is not None and started < started_since:
+            continue  # an older process that got the same group id
+        members.append(int(entry.name))
+    return members
@@ -0,0 +1,135 @@
+"""Skip-if-unchanged cache for test results.
+
+A passing run is reusable as long as nothing that could change its
+outcome has changed: the generated test file, the Hercules executable,
+and whatever the caller says describes the target environment (a deploy
+SHA, a base URL, ...).  Those three are hashed into a key; a rerun with
+the same key returns the stored result instead of launching a browser.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .models import TestResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU of passing results keyed on everything that affects a run."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, TestResult]]" = OrderedDict()
+        self._versions: Dict[Tuple[str, Optional[float]], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hercules_identity(self, hercules_path: str) -> Dict[str, object]:
+        """Path, mtime and reported version of the Hercules executable.
+
+        `--version` is only asked once per (path, mtime) since it means
+        spawning the binary.
+        """
+        path = os.path.realpath(hercules_path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+
+        key = (path, mtime)
+        if key not in self._versions:
+            self._versions[key] = self._query_version(path) if mtime is not None else None
+        return {"path": path, "mtime": mtime, "version": self._versions[key]}
+
+    @staticmethod
+    def make_key(file_hash: str, identity: Dict[str, object], env_fingerprint: str = "") -> str:
+        payload = json.dumps(
+            {"file": file_hash, "hercules": identity, "env": env_fingerprint},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[TestResult]:
+        """Return a copy of the cached result (marked cached), if any.
+
+        The copy is a run of its own as far as history goes: it gets a
+        fresh run id and is stamped now, taking no time, so journaling
+        it doesn't duplicate the original run.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = copy.deepcopy(entry[1])
+
+        now = datetime.now()
+        result.cached = True
+        result.run_id = str(uuid.uuid4())
+        result.started_at = result.completed_at = now
+        result.execution_time = 0.0
+        return result
+
+    def put(self, key: str, result: TestResult) -> None:
+        """Remember a result; only passing runs are worth skipping."""
+        if result.status != "passed":
+            return
+        with self._lock:
+            self._entries[key] = (result.test_id, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, test_id: Optional[str] = None) -> int:
+        """Drop entries for one test, or everything when `test_id` is None."""
+        with self._lock:
+            if test_id is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self._versions.clear()
+                return count
+
+            stale = [key for key, (tid, _) in self._entries.items() if tid == test_id]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _query_version(path: str) -> Optional[str]:
+        try:
+            proc = subprocess.run(
+                [path, "--version"], capture_output=True, text=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Could not get Hercules version from {path}: {e}")
+            return None
+        return proc.stdout.strip() or None
@@ -0,0 +1,118 @@
+"""Append-only log of completed test runs.
+
+`_test_results` only remembers the latest result per test and dies with
+the process.  Every finished run is also appended here as one JSON line,
+in one file per day (`results-YYYYMMDD.jsonl`), which gives exports a
+durable, streamable source that never has to be loaded whole.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional
+
+from .models import TestResult, to_json_dict
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+class ResultJournal:
+    """Day-partitioned JSONL journal of finished `TestResult`s."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._fh: Optional[IO[str]] = None
+        self._day: Optional[str] = None
+
+    def append(self, result: TestResult) -> None:
+        record = to_json_dict(result)
+        completed = _parse_time(record.get("completed_at")) or datetime.now()
+        day = completed.strftime("%Y%m%d")
+        line = json.dumps(record) + "\n"
+
+        with self._lock:
+            if self._day != day:
+                self._rotate(day)
+            self._fh.write(line)
+            self._fh.flush()
+
+    def iter_records(
+        self,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        statuses: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching records oldest file first, one line at a time."""
+        return iter_journal(self.root, since=since, until=until, statuses=statuses)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+                self._day = None
+
+    def _rotate(self, day: str) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.root / f"results-{day}.jsonl", "a")
+        self._day = day
+
+
+def iter_journal(
+    root: str | Path,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    statuses: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream journal records filtered by completion time and status.
+
+    Whole day files outside [since, until] are skipped by name, so a
+    nightly export only opens the files it needs.
+    """
+    root = Path(root)
+    if not root.exists():
+        return
+    wanted = set(statuses) if statuses else None
+    first_day = since.strftime("%Y%m%d") if since else None
+    last_day = until.strftime("%Y%m%d") if until else None
+
+    for path in sorted(root.glob("results-*.jsonl")):
+        day = path.stem.split("-", 1)[1]
+        if (first_day and day < first_day) or (last_day and day > last_day):
+            continue
+        with open(path) as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn line from a crash
+                if wanted is not None and record.get("status") not in wanted:
+                    continue
+                completed = _parse_time(record.get("completed_at"))
+                if since and (completed is None or completed < since):
+                    continue
+                if until and (completed is None or completed > until):
+                    continue
+                yield record
+
+
+def default_journal_dir(state_dir: str | Path | None = None) -> Path:
+    state_dir = state_dir or os.getenv("HERCULES_STATE_DIR") or (
+        Path(tempfile.gettempdir()) / "hercules_state"
+    )
+    return Path(state_dir) / "results"
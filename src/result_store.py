@@ -0,0 +1,227 @@
+"""Hot/cold tiered storage for the latest result of each test.
+
+Results are mostly read while a test is running and for a few minutes
+afterwards, but used to sit in a plain dict - logs and all - for the
+life of the server.  `TieredResultStore` keeps running and recent results
+as live objects (the hot tier) and moves settled ones into a
+zlib-compressed SQLite table (the cold tier).  Cold reads decode
+transparently and go through a small LRU, so a result being polled
+isn't decompressed on every call.
+
+It is a `MutableMapping[test_id, TestResult]`, a drop-in for the dict it
+replaces.  Only finished results are demoted: running ones are still
+being mutated in place by their run task.
+
+The cold file is private to this process (like the workspace) and
+removed on exit; the result journal is the durable history.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from .models import TestResult, to_json_dict
+from .processes import pid_alive
+from .suites import FINISHED_OUTCOMES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOT_TTL = 300.0  # seconds a settled result stays in memory
+DEFAULT_HOT_MAX = 1000
+DEFAULT_READ_CACHE = 64
+
+
+def _settled(result: TestResult) -> bool:
+    return result.completed_at is not None and result.status in FINISHED_OUTCOMES
+
+
+class TieredResultStore(MutableMapping):
+    """test_id -> latest `TestResult`, hot in memory or compressed on disk."""
+
+    def __init__(
+        self,
+        cold_dir: str | Path,
+        *,
+        hot_ttl: Optional[float] = None,
+        hot_max: Optional[int] = None,
+        read_cache_size: int = DEFAULT_READ_CACHE,
+        compress_level: int = 6,
+    ):
+        if hot_ttl is None:
+            env_ttl = os.getenv("HERCULES_RESULTS_HOT_TTL")
+            hot_ttl = float(env_ttl) if env_ttl else DEFAULT_HOT_TTL
+        if hot_max is None:
+            env_max = os.getenv("HERCULES_RESULTS_HOT_MAX")
+            hot_max = int(env_max) if env_max else DEFAULT_HOT_MAX
+
+        self.hot_ttl = hot_ttl
+        self.hot_max = hot_max
+        self.read_cache_size = read_cache_size
+        self.compress_level = compress_level
+
+        self._lock = threading.RLock()
+        # Oldest write first; value is (result, monotonic time of the write)
+        self._hot: "OrderedDict[str, Tuple[TestResult, float]]" = OrderedDict()
+        self._read_cache: "OrderedDict[str, TestResult]" = OrderedDict()
+        self._stats = {"demoted": 0, "cold_reads": 0, "cache_hits": 0}
+
+        self.cold_dir = Path(cold_dir)
+        self.cold_dir.mkdir(parents=True, exist_ok=True)
+        self._sweep_dead_instances()
+        self.path = self.cold_dir / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.db"
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")  # scratch data, journal has the history
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (test_id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+        )
+        self._closed = False
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # MutableMapping
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, test_id: str) -> TestResult:
+        with self._lock:
+            entry = self._hot.get(test_id)
+            if entry is not None:
+                return entry[0]
+            cached = self._read_cache.get(test_id)
+            if cached is not None:
+                self._read_cache.move_to_end(test_id)
+                self._stats["cache_hits"] += 1
+                return cached
+
+            row = self._db.execute(
+                "SELECT data FROM results WHERE test_id = ?", (test_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(test_id)
+            result = TestResult(**json.loads(zlib.decompress(row[0])))
+            self._stats["cold_reads"] += 1
+            self._read_cache[test_id] = result
+            while len(self._read_cache) > self.read_cache_size:
+                self._read_cache.popitem(last=False)
+            return result
+
+    def __setitem__(self, test_id: str, result: TestResult) -> None:
+        with self._lock:
+            self._hot.pop(test_id, None)
+            self._hot[test_id] = (result, time.monotonic())
+            self._read_cache.pop(test_id, None)
+            self._db.execute("DELETE FROM results WHERE test_id = ?", (test_id,))
+            self.demote()
+
+    def __delitem__(self, test_id: str) -> None:
+        with self._lock:
+            in_hot = self._hot.pop(test_id, None) is not None
+            self._read_cache.pop(test_id, None)
+            deleted = self._db.execute(
+                "DELETE FROM results WHERE test_id = ?", (test_id,)
+            ).rowcount
+            if not in_hot and not deleted:
+                raise KeyError(test_id)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            hot_keys = list(self._hot)
+            cold_keys = [row[0] for row in self._db.execute("SELECT test_id FROM results")]
+        yield from hot_keys
+        yield from cold_keys
+
+    def __len__(self) -> int:
+        with self._lock:
+            (cold,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            return len(self._hot) + cold
+
+    def __contains__(self, test_id: object) -> bool:
+        with self._lock:
+            if test_id in self._hot:
+                return True
+            return self._db.execute(
+                "SELECT 1 FROM results WHERE test_id = ?", (test_id,)
+            ).fetchone() is not None
+
+    # ------------------------------------------------------------------
+    # Tiering
+    # ------------------------------------------------------------------
+
+    def demote(self) -> int:
+        """Move results settled longer than the TTL (or over `hot_max`) to disk."""
+        now = time.monotonic()
+        wall_now = time.time()
+        with self._lock:
+            over = len(self._hot) - self.hot_max
+            batch = []
+            # Oldest writes first.  Nothing written within the TTL can have
+            # finished longer ago than that, so stop there unless still over.
+            for test_id, (result, written) in self._hot.items():
+                if now - written < self.hot_ttl and over <= len(batch):
+                    break
+                if not _settled(result):
+                    continue
+                if over > len(batch) or wall_now - result.completed_at.timestamp() >= self.hot_ttl:
+                    batch.append((test_id, result))
+            if not batch:
+                return 0
+
+            rows = [(test_id, self._encode(result)) for test_id, result in batch]
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results (test_id, data) VALUES (?, ?)", rows
+            )
+            self._db.execute("COMMIT")
+            for test_id, _ in batch:
+                del self._hot[test_id]
+            self._stats["demoted"] += len(batch)
+            return len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (cold,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            (cold_bytes,) = self._db.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM results"
+            ).fetchone()
+            return {
+                "hot": len(self._hot),
+                "cold": cold,
+                "cold_bytes": cold_bytes,
+                "read_cache": len(self._read_cache),
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._db.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.unlink(f"{self.path}{suffix}")
+            except FileNotFoundError:
+                pass
+
+    def _encode(self, result: TestResult) -> bytes:
+        raw = json.dumps(to_json_dict(result), separators=(",", ":")).encode()
+        return zlib.compress(raw, self.compress_level)
+
+    def _sweep_dead_instances(self) -> None:
+        for entry in os.scandir(self.cold_dir):
+            pid_part = entry.name.split("-", 1)[0]
+            if pid_part.isdigit() and not pid_alive(int(pid_part)):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
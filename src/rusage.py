@@ -0,0 +1,167 @@
+"""Resource accounting for Hercules runs.
+
+asyncio reaps its children itself and throws the kernel's rusage away,
+and `getrusage(RUSAGE_CHILDREN)` in the server lumps every concurrent
+run together.  So each run is started through this file as a tiny
+wrapper: it spawns Hercules, reaps it with `wait4` and writes the
+child's usage (which includes every descendant Hercules waited for, i.e.
+the browsers) to a JSON file before exiting with the child's status.
+
+    python src/rusage.py <usage.json> hercules run test_file.py
+
+The wrapper is run by path, not as `-m src.rusage`, so it only pays for
+the stdlib imports below - keep it free of package imports.
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+WRAPPER_PATH = os.path.abspath(__file__)
+
+USAGE_FIELDS = (
+    "user_cpu",
+    "system_cpu",
+    "max_rss_kb",
+    "voluntary_ctx_switches",
+    "involuntary_ctx_switches",
+)
+
+
+def available() -> bool:
+    return resource is not None and hasattr(os, "wait4")
+
+
+def usage_from_rusage(ru: Any) -> Dict[str, Any]:
+    max_rss = ru.ru_maxrss
+    if sys.platform == "darwin":
+        max_rss //= 1024  # bytes there, KiB on Linux
+    return {
+        "user_cpu": round(ru.ru_utime, 6),
+        "system_cpu": round(ru.ru_stime, 6),
+        "max_rss_kb": int(max_rss),
+        "voluntary_ctx_switches": int(ru.ru_nvcsw),
+        "involuntary_ctx_switches": int(ru.ru_nivcsw),
+    }
+
+
+def read_usage_file(path: str) -> Optional[Dict[str, Any]]:
+    """Usage written by the wrapper, or None if it never got that far."""
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+class UsageAggregator:
+    """Running per-test totals of recorded usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, test_id: str, usage: Dict[str, Any]) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(test_id, {
+                "runs": 0,
+                "total_user_cpu": 0.0,
+                "total_system_cpu": 0.0,
+                "peak_max_rss_kb": 0,
+                "total_max_rss_kb": 0,
+                "total_voluntary_ctx_switches": 0,
+                "total_involuntary_ctx_switches": 0,
+            })
+            stats["runs"] += 1
+            stats["total_user_cpu"] += usage.get("user_cpu") or 0.0
+            stats["total_system_cpu"] += usage.get("system_cpu") or 0.0
+            rss = usage.get("max_rss_kb") or 0
+            stats["peak_max_rss_kb"] = max(stats["peak_max_rss_kb"], rss)
+            stats["total_max_rss_kb"] += rss
+            stats["total_voluntary_ctx_switches"] += usage.get("voluntary_ctx_switches") or 0
+            stats["total_involuntary_ctx_switches"] += usage.get("involuntary_ctx_switches") or 0
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            if record.get("resource_usage") and not record.get("cached"):
+                self.add(record["test_id"], record["resource_usage"])
+
+    def summary(self, test_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stats = self._stats.get(test_id)
+            return self._summarize(test_id, stats) if stats else None
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {t: self._summarize(t, s) for t, s in self._stats.items()}
+
+    @staticmethod
+    def _summarize(test_id: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+        runs = stats["runs"]
+        cpu = stats["total_user_cpu"] + stats["total_system_cpu"]
+        return {
+            "test_id": test_id,
+            "runs": runs,
+            "total_user_cpu": round(stats["total_user_cpu"], 6),
+            "total_system_cpu": round(stats["total_system_cpu"], 6),
+            "mean_cpu": round(cpu / runs, 6),
+            "peak_max_rss_kb": stats["peak_max_rss_kb"],
+            "mean_max_rss_kb": stats["total_max_rss_kb"] // runs,
+            "mean_voluntary_ctx_switches": stats["total_voluntary_ctx_switches"] / runs,
+            "mean_involuntary_ctx_switches": stats["total_involuntary_ctx_switches"] / runs,
+        }
+
+
+def run_and_reap(usage_path: str, argv: list) -> int:
+    """Run `argv`, write its rusage to `usage_path`, return a shell-style status."""
+    pid = os.fork()
+    if pid == 0:  # child
+        try:
+            os.execvp(argv[0], argv)
+        except OSError as e:
+            print(f"rusage: cannot execute {argv[0]}: {e}", file=sys.stderr)
+        os._exit(127)
+
+    # Pass polite stop requests on; SIGKILL of the group needs no help
+    def forward(signum, _frame):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    while True:
+        try:
+            _, status, ru = os.wait4(pid, 0)
+            break
+        except InterruptedError:
+            continue
+
+    tmp = f"{usage_path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(usage_from_rusage(ru), fh)
+    os.replace(tmp, usage_path)
+
+    if os.WIFSIGNALED(status):
+        # Die the same way so the caller sees the signal, not an exit code
+        sig = os.WTERMSIG(status)
+        signal.signal(sig, signal.SIG_DFL)
+        os.kill(os.getpid(), sig)
+    return os.waitstatus_to_exitcode(status)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: rusage.py <usage.json> <command> [args...]", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(run_and_reap(sys.argv[1], sys.argv[2:]))
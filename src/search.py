@@ -0,0 +1,194 @@
+"""In-memory inverted index for searching test cases.
+
+Each test case is tokenised once when it is created and its postings are
+added to the index; deleting a case removes just its own postings, so
+keeping the index current costs O(terms in that case) rather than a
+rebuild.  Queries are ranked with BM25, with hits in the name weighted
+above hits buried in the steps.
+
+Every posting list is also kept sorted by impact (the BM25 term-frequency
+component), which lets a query stop early with the Threshold Algorithm
+instead of scoring every document that contains a common word like
+"click".  Impacts are computed against the average document length at
+insertion time and a list is re-scored lazily once that average has
+drifted far enough to matter.
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# How much a single occurrence in each field counts towards term frequency
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "expected_outcome": 1.5,
+    "description": 1.0,
+    "steps": 1.0,
+}
+
+# Standard BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+# Re-score a posting list once the average doc length moved this much
+_AVG_DRIFT = 0.1
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _Postings:
+    """Postings for one term: random access plus impact-sorted order."""
+
+    __slots__ = ("impacts", "ranked", "avg_len")
+
+    def __init__(self, avg_len: float):
+        self.impacts: Dict[str, float] = {}  # doc_id -> impact
+        self.ranked: List[Tuple[float, str]] = []  # (-impact, doc_id), best first
+        self.avg_len = avg_len
+
+
+class SearchIndex:
+    """Incrementally maintained BM25 index keyed by document id."""
+
+    def __init__(self):
+        self._postings: Dict[str, _Postings] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}  # doc_id -> {term: tf}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: str, fields: Dict[str, str | Iterable[str]]) -> None:
+        """Index (or re-index) a document from its named text fields."""
+        term_freqs: Counter = Counter()
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            text = value if isinstance(value, str) else " ".join(value)
+            for token in tokenize(text):
+                term_freqs[token] += weight
+
+        with self._lock:
+            self._remove_locked(doc_id)
+
+            length = sum(term_freqs.values())
+            self._doc_terms[doc_id] = dict(term_freqs)
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+            avg_len = self._avg_len()
+
+            for term, tf in term_freqs.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings(avg_len)
+                impact = _impact(tf, length, postings.avg_len)
+                postings.impacts[doc_id] = impact
+                bisect.insort(postings.ranked, (-impact, doc_id))
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(doc_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to `limit` (doc_id, score) pairs, best first."""
+        terms = set(tokenize(query))
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if n_docs == 0:
+                return []
+
+            lists: List[Tuple[float, _Postings]] = []
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                self._refresh_if_drifted(term, postings)
+                df = len(postings.impacts)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                lists.append((idf, postings))
+
+            return self._top_k(lists, limit)
+
+    @staticmethod
+    def _top_k(lists: List[Tuple[float, "_Postings"]], limit: int) -> List[Tuple[str, float]]:
+        # Threshold Algorithm: walk all lists in impact order in lockstep,
+        # fully scoring each new doc, and stop once nothing unseen can beat
+        # the current k-th best.
+        heap: List[Tuple[float, str]] = []
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            progressed = False
+            for idf, postings in lists:
+                if depth >= len(postings.ranked):
+                    continue
+                progressed = True
+                neg_impact, doc_id = postings.ranked[depth]
+                threshold -= idf * neg_impact
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                score = sum(i * p.impacts.get(doc_id, 0.0) for i, p in lists)
+                if len(heap) < limit:
+                    heapq.heappush(heap, (score, doc_id))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, doc_id))
+
+            if not progressed or (len(heap) >= limit and heap[0][0] >= threshold):
+                break
+            depth += 1
+
+        return [(doc_id, score) for score, doc_id in sorted(heap, reverse=True)]
+
+    def _refresh_if_drifted(self, term: str, postings: _Postings) -> None:
+        avg_len = self._avg_len()
+        if abs(avg_len - postings.avg_len) <= _AVG_DRIFT * postings.avg_len:
+            return
+        postings.avg_len = avg_len
+        postings.impacts = {
+            doc_id: _impact(self._doc_terms[doc_id][term], self._doc_lengths[doc_id], avg_len)
+            for doc_id in postings.impacts
+        }
+        postings.ranked = sorted((-impact, doc_id) for doc_id, impact in postings.impacts.items())
+
+    def _avg_len(self) -> float:
+        return self._total_length / len(self._doc_terms) if self._doc_terms else 1.0
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            impact = postings.impacts.pop(doc_id, None)
+            if impact is not None:
+                idx = bisect.bisect_left(postings.ranked, (-impact, doc_id))
+                if idx < len(postings.ranked) and postings.ranked[idx][1] == doc_id:
+                    del postings.ranked[idx]
+            if not postings.impacts:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id, 0.0)
+        return True
+
+
+def _impact(tf: float, doc_length: float, avg_len: float) -> float:
+    norm = _K1 * (1 - _B + _B * doc_length / (avg_len or 1.0))
+    return tf * (_K1 + 1) / (tf + norm)
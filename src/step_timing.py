@@ -0,0 +1,129 @@
+"""Per-step timings parsed from a run's output as it streams in.
+
+Generated files log `Step N: <step>` right before executing each step
+(the simulation engine does the same), then `Verifying ...` before the
+outcome check.  `StepTimer` turns those markers into `StepTiming`s on
+the result while the run is still going: a step starts at its marker
+and ends at the next step's marker, the verification marker, or the end
+of the run, whichever comes first.
+
+`StepLatencyStats` keeps the durations of each test's recent runs per
+step, so the slowest steps of a suite can be found without scraping
+logs.
+"""
+
+import re
+import statistics
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .models import StepTiming
+
+STEP_MARKER = re.compile(r"\bStep (\d+): (.*)")
+VERIFY_MARKER = re.compile(r"\bVerifying\b")
+
+DEFAULT_WINDOW = 50  # recent runs kept per step
+
+
+class StepTimer:
+    """Feeds output lines in; keeps `timings` (a result's list) up to date."""
+
+    def __init__(self, timings: List[StepTiming]):
+        self.timings = timings
+        self._open: Optional[StepTiming] = None
+
+    def feed(self, line: str, at: float) -> None:
+        """Account for one output line that arrived at `at` (epoch seconds)."""
+        match = STEP_MARKER.search(line)
+        if match:
+            self._close(at)
+            self._open = StepTiming(
+                index=int(match.group(1)),
+                description=match.group(2).strip(),
+                started_at=datetime.fromtimestamp(at),
+            )
+            self.timings.append(self._open)
+        elif self._open is not None and VERIFY_MARKER.search(line):
+            self._close(at)
+
+    def finish(self, at: float) -> None:
+        """The run ended; whatever step was in progress ends here too."""
+        self._close(at)
+
+    def _close(self, at: float) -> None:
+        step, self._open = self._open, None
+        if step is None:
+            return
+        step.completed_at = datetime.fromtimestamp(at)
+        step.duration = round(max(0.0, at - step.started_at.timestamp()), 6)
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class StepLatencyStats:
+    """Durations of each test's recent runs, per step."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        # test_id -> (index, description) -> recent durations, oldest first
+        self._durations: Dict[str, Dict[Tuple[int, str], Deque[float]]] = {}
+
+    def add(self, test_id: str, timings: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            steps = self._durations.setdefault(test_id, {})
+            for timing in timings:
+                if timing.get("duration") is None:
+                    continue
+                key = (timing["index"], timing["description"])
+                steps.setdefault(key, deque(maxlen=self.window)).append(timing["duration"])
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            if record.get("cached"):
+                continue
+            if record.get("step_timings"):
+                self.add(record["test_id"], record["step_timings"])
+            # Parameter sets time their steps on the instances
+            self.add_records(record.get("instances") or ())
+
+    def summary(self, test_id: str) -> List[Dict[str, Any]]:
+        """Per-step latency of a test over its recent runs, in step order."""
+        with self._lock:
+            steps = {key: list(d) for key, d in self._durations.get(test_id, {}).items()}
+        return [self._summarize(test_id, key, durations) for key, durations in sorted(steps.items())]
+
+    def slowest(
+        self, limit: int = 10, test_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Steps with the highest mean duration across tests."""
+        wanted = set(test_ids) if test_ids is not None else None
+        with self._lock:
+            rows = [
+                (test_id, key, list(durations))
+                for test_id, steps in self._durations.items()
+                if wanted is None or test_id in wanted
+                for key, durations in steps.items()
+            ]
+        summaries = [self._summarize(*row) for row in rows]
+        summaries.sort(key=lambda s: s["mean"], reverse=True)
+        return summaries[:limit]
+
+    @staticmethod
+    def _summarize(test_id: str, key: Tuple[int, str], durations: List[float]) -> Dict[str, Any]:
+        ordered = sorted(durations)
+        return {
+            "test_id": test_id,
+            "index": key[0],
+            "description": key[1],
+            "runs": len(durations),
+            "mean": round(statistics.fmean(durations), 6),
+            "p50": _quantile(ordered, 0.5),
+            "p95": _quantile(ordered, 0.95),
+            "max": ordered[-1],
+            "last": durations[-1],
+        }
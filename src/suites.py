@@ -0,0 +1,210 @@
+"""Checkpointing for suite runs.
+
+Every suite run gets an append-only JSONL journal under
+`<state_dir>/suites/`.  The first record snapshots the suite and the
+definitions of the test cases in it (so they can be restored after a
+restart, since cases otherwise only live in memory); after that one line
+is appended as each test finishes.  Appending keeps the cost of a
+checkpoint constant no matter how large the suite is, and replaying the
+journal reconstructs the latest state.
+
+On startup only *interrupted* suites are loaded: ones whose owning
+server is gone (or, within one process, whose manager was closed).  Suites another live server is running are left alone,
+and a loaded suite is re-owned by the new server so the next one to
+start doesn't take it too.  Deleting a test case tombstones it in the
+journals of unfinished suites, so it isn't restored.  Journals nobody
+has touched for `max_age` seconds - finished suites, and interrupted
+ones that were never resumed - are removed while loading.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .models import SuiteRun, TestCase, to_json_dict
+from .processes import pid_alive, process_start_ticks
+
+logger = logging.getLogger(__name__)
+
+# Outcomes that don't need another attempt
+PASSED_OUTCOMES = {"passed"}
+FINISHED_OUTCOMES = {"passed", "failed", "error", "skipped"}
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600.0  # seconds a journal is kept after its last write
+
+# Tokens of the stores in this process that haven't been closed
+_open_tokens: Set[str] = set()
+_open_lock = threading.Lock()
+
+
+class SuiteCheckpointStore:
+    """Append-only per-suite journals of test outcomes."""
+
+    def __init__(self, root: str | Path, *, max_age: Optional[float] = None):
+        if max_age is None:
+            env_age = os.getenv("HERCULES_SUITE_MAX_AGE")
+            max_age = float(env_age) if env_age else DEFAULT_MAX_AGE
+        self.root = Path(root)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._pid_start = process_start_ticks(self._pid)
+        # Tells this store's suites from those of other managers in this process
+        self._token = uuid.uuid4().hex
+        with _open_lock:
+            _open_tokens.add(self._token)
+
+    def close(self) -> None:
+        """Give up this store's suites; another manager may now take them over."""
+        with _open_lock:
+            _open_tokens.discard(self._token)
+
+    def start(self, suite: SuiteRun, test_cases: List[TestCase]) -> None:
+        self._append(suite.id, {
+            "type": "suite",
+            "suite": to_json_dict(suite),
+            "cases": [to_json_dict(case) for case in test_cases],
+            **self._owner(),
+        })
+
+    def record_attempt(self, suite: SuiteRun) -> None:
+        self._append(suite.id, {
+            "type": "attempt",
+            "attempt": suite.attempts,
+            "at": datetime.now().isoformat(),
+            **self._owner(),
+        })
+
+    def record_adopted(self, suite_id: str) -> None:
+        """This server took over an interrupted suite."""
+        self._append(suite_id, {"type": "adopted", **self._owner()})
+
+    def record_deleted(self, suite_id: str, test_id: str) -> None:
+        """Tombstone a test case so it isn't restored with the suite."""
+        if (self.root / f"{suite_id}.jsonl").exists():  # unless already pruned
+            self._append(suite_id, {"type": "deleted", "test_id": test_id})
+
+    def record_outcome(self, suite_id: str, test_id: str, status: str) -> None:
+        self._append(suite_id, {
+            "type": "outcome",
+            "test_id": test_id,
+            "status": status,
+            "at": datetime.now().isoformat(),
+        })
+
+    def record_finished(self, suite: SuiteRun) -> None:
+        self._append(suite.id, {
+            "type": "finished",
+            "status": suite.status,
+            "at": (suite.completed_at or datetime.now()).isoformat(),
+            "critical_path": suite.critical_path,
+            "critical_path_seconds": suite.critical_path_seconds,
+        })
+
+    def load_all(self) -> List[Tuple[SuiteRun, List[Dict[str, Any]]]]:
+        """Replay interrupted suites' journals into (suite, case definitions).
+
+        Finished suites and ones whose owner is still running are skipped;
+        journals older than `max_age` are removed.
+        """
+        loaded = []
+        if not self.root.exists():
+            return loaded
+        cutoff = time.time() - self.max_age
+        for path in sorted(self.root.glob("*.jsonl")):
+            try:
+                replayed = self._replay(path)
+                stale = path.stat().st_mtime < cutoff
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable suite checkpoint {path}: {e}")
+                continue
+            suite, cases, owner = replayed or (None, [], {})
+            if self._owner_alive(owner):
+                continue  # another server is still on it
+            if stale:
+                logger.info(f"Removing suite checkpoint {path.name}, unused for over {self.max_age:.0f}s")
+                path.unlink(missing_ok=True)
+            elif suite is not None and suite.status == "running":  # never finished
+                suite.status = "interrupted"
+                loaded.append((suite, cases))
+        return loaded
+
+    def _replay(
+        self, path: Path
+    ) -> Optional[Tuple[SuiteRun, List[Dict[str, Any]], Dict[str, Any]]]:
+        suite: Optional[SuiteRun] = None
+        cases: Dict[str, Dict[str, Any]] = {}
+        owner: Dict[str, Any] = {}
+
+        with open(path) as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write - ignore it
+                    continue
+
+                kind = record.get("type")
+                if kind == "suite":
+                    suite = SuiteRun(**record["suite"])
+                    cases = {case.get("id"): case for case in record.get("cases", [])}
+                    owner = record
+                elif suite is None:
+                    continue
+                elif kind == "attempt":
+                    suite.attempts = record["attempt"]
+                    suite.status = "running"
+                    suite.completed_at = None
+                    owner = record
+                elif kind == "adopted":
+                    owner = record
+                elif kind == "deleted":
+                    cases.pop(record["test_id"], None)
+                elif kind == "outcome":
+                    suite.outcomes[record["test_id"]] = record["status"]
+                elif kind == "finished":
+                    suite.status = record["status"]
+                    suite.completed_at = datetime.fromisoformat(record["at"])
+                    suite.critical_path = record.get("critical_path", [])
+                    suite.critical_path_seconds = record.get("critical_path_seconds")
+
+        if suite is None:
+            return None
+        return suite, list(cases.values()), owner
+
+    def _owner(self) -> Dict[str, Any]:
+        return {"pid": self._pid, "pid_start": self._pid_start, "token": self._token}
+
+    def _owner_alive(self, record: Dict[str, Any]) -> bool:
+        pid = record.get("pid")
+        if not pid:
+            return False
+        if pid == self._pid:
+            if record.get("pid_start") != self._pid_start:
+                return False  # an earlier process that had our pid
+            # This process: alive as long as the owning store is open
+            with _open_lock:
+                return record.get("token") in _open_tokens
+        if not pid_alive(pid):
+            return False
+        # A live pid that started at a different time is a reused one
+        recorded, current = record.get("pid_start"), process_start_ticks(pid)
+        return recorded is None or current is None or current == recorded
+
+    def _append(self, suite_id: str, record: Dict[str, Any]) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / f"{suite_id}.jsonl", "a") as fh:
+                fh.write(line)
+                fh.flush()
+                os.fsync(fh.fileno())
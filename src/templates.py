@@ -0,0 +1,349 @@
+"""Renderer for generated Hercules test files.
+
+Test files used to be built with one big f-string per case, with step
+text pasted straight into Python string literals - a step containing a
+quote or a backslash gave a file that only blew up once Hercules ran it.
+`TemplateRenderer` fills fixed templates instead:
+
+- templates are parsed into literal chunks and slots once, when the
+  module is imported, so rendering is a single `join`
+- every user-supplied value goes through an escaper for the context it
+  lands in (string literal, docstring, identifier)
+- `render_many` renders a whole batch in one call
+- with `check_syntax`, output is run through `compile()` and a
+  `ValueError` is raised before anything is written, so bad definitions
+  fail at create time instead of a Hercules launch later
+
+`stats()` reports how many files were rendered and how long it took.
+"""
+
+import json
+import keyword
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from .models import TestCase
+
+_SLOT = re.compile(r"\$\{(\w+)\}")
+
+
+class Template:
+    """A text template with `${name}` slots, parsed once."""
+
+    def __init__(self, text: str):
+        self._chunks: List[str] = []
+        self._slots: List[str] = []
+        pos = 0
+        for match in _SLOT.finditer(text):
+            self._chunks.append(text[pos:match.start()])
+            self._slots.append(match.group(1))
+            pos = match.end()
+        self._tail = text[pos:]
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = []
+        for chunk, slot in zip(self._chunks, self._slots):
+            parts.append(chunk)
+            parts.append(values[slot])
+        parts.append(self._tail)
+        return "".join(parts)
+
+
+def py_string(value: str) -> str:
+    """A double-quoted Python string literal for any text."""
+    # JSON string escapes are a subset of Python's
+    return json.dumps(value, ensure_ascii=False)
+
+
+def doc_text(value: str) -> str:
+    """Text that can sit inside a triple-quoted docstring."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def class_name_for(name: str) -> str:
+    """A valid Python class name derived from a test name."""
+    # `\w` would keep characters like "²" that can't appear in identifiers
+    ident = "".join(ch if ("_" + ch).isidentifier() else "_" for ch in name)
+    if ident and not ident[0].isidentifier():  # digits, combining marks, ...
+        ident = "_" + ident
+    ident += "Test"
+    return ident + "_" if keyword.iskeyword(ident) else ident
+
+
+# Prepended to files of parametrized cases: placeholders are filled in by
+# the file itself from the parameter set of the current run
+PARAMS_PRELUDE = r'''import json
+import os
+import re
+
+PARAMS = json.loads(os.environ.get("HERCULES_PARAMS") or "{}")
+
+
+def _p(text):
+    return re.sub(r"\{\{\s*(\w+)\s*\}\}", lambda m: str(PARAMS.get(m.group(1), m.group(0))), text)
+
+
+'''
+
+CLASS_TEMPLATE = Template('''class ${class_name}(${base_class}):
+    def __init__(self):
+        super().__init__()
+        self.test_name = ${name}
+        self.test_id = ${test_id}
+${setup}
+    def execute(self):
+        self.log("Starting test execution")
+
+${steps}
+
+        self.log("Verifying expected outcome")
+        self.verify_outcome(${expected})${teardown}''')
+
+_OWN_SETUP = '''
+    def setup(self):
+        self.log("Setting up test environment")
+'''
+
+_OWN_TEARDOWN = '''
+
+    def teardown(self):
+        self.log("Cleaning up")'''
+
+FILE_TEMPLATE = Template('''"""
+Test: ${name}
+Description: ${description}
+Generated: ${generated}
+"""
+
+${prelude}from hercules import HerculesTest
+
+
+${test_class}
+
+
+if __name__ == "__main__":
+    ${class_name}().run()
+''')
+
+SUITE_TEMPLATE = Template('''"""
+Suite: ${count} tests
+Generated: ${generated}
+"""
+
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from hercules import HerculesTest
+
+MARKER = ${marker}
+OUTPUT_ROOT = os.environ.get("HERCULES_OUTPUT_DIR")
+
+
+class _SharedSetupTest(HerculesTest):
+    """Environment setup runs for the first test only; teardown once at the end."""
+
+    _environment_ready = False
+
+    def setup(self):
+        if not _SharedSetupTest._environment_ready:
+            self.log("Setting up test environment")
+            _SharedSetupTest._environment_ready = True
+
+    def teardown(self):
+        pass
+
+
+${classes}
+
+
+SUITE = [
+${entries}
+]
+
+
+def _usage():
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    max_rss = max(own.ru_maxrss, kids.ru_maxrss)
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    return (
+        own.ru_utime + kids.ru_utime,
+        own.ru_stime + kids.ru_stime,
+        max_rss,
+        own.ru_nvcsw + kids.ru_nvcsw,
+        own.ru_nivcsw + kids.ru_nivcsw,
+    )
+
+
+def _usage_since(before):
+    after = _usage()
+    if before is None or after is None:
+        return "null"
+    return json.dumps({
+        "user_cpu": round(after[0] - before[0], 6),
+        "system_cpu": round(after[1] - before[1], 6),
+        "max_rss_kb": after[2],
+        "voluntary_ctx_switches": after[3] - before[3],
+        "involuntary_ctx_switches": after[4] - before[4],
+    })
+
+
+def _run_suite():
+    any_failed = False
+    for test_id, test_class in SUITE:
+        if OUTPUT_ROOT:
+            # Per-test output dir so artifacts can be attributed
+            os.environ["HERCULES_OUTPUT_DIR"] = os.path.join(OUTPUT_ROOT, test_id)
+            os.makedirs(os.environ["HERCULES_OUTPUT_DIR"], exist_ok=True)
+        print(f"{MARKER} START {test_id} {time.time()}", flush=True)
+        before = _usage()
+        status = "passed"
+        try:
+            test_class().run()
+        except Exception as e:  # keep going - one failure shouldn't sink the batch
+            status = "failed"
+            any_failed = True
+            print(f"{MARKER} ERROR {test_id} {json.dumps(str(e) or type(e).__name__)}", flush=True)
+        print(f"{MARKER} END {test_id} {time.time()} {status} {_usage_since(before)}", flush=True)
+
+    print("Cleaning up", flush=True)
+    return 1 if any_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_run_suite())
+''')
+
+
+class TemplateRenderer:
+    """Renders test and suite modules from `TestCase`s."""
+
+    def __init__(self, *, check_syntax: Optional[bool] = None):
+        if check_syntax is None:
+            check_syntax = os.getenv("HERCULES_CHECK_SYNTAX", "1").lower() not in ("0", "false", "no")
+        self.check_syntax = check_syntax
+        self._lock = threading.Lock()
+        self._rendered = 0
+        self._seconds = 0.0
+
+    def render(self, test_case: TestCase) -> str:
+        """Standalone module for one case."""
+        return self.render_many([test_case])[0]
+
+    def render_many(self, test_cases: Sequence[TestCase]) -> List[str]:
+        """Standalone modules for a batch of cases, in order.
+
+        Raises ValueError naming the case if any output doesn't compile.
+        """
+        started = time.perf_counter()
+        sources = []
+        for test_case in test_cases:
+            class_name = class_name_for(test_case.name)
+            source = FILE_TEMPLATE.render({
+                "name": doc_text(test_case.name),
+                "description": doc_text(test_case.description),
+                "generated": test_case.created_at.isoformat(),
+                "prelude": PARAMS_PRELUDE if test_case.parameters else "",
+                "test_class": self.render_class(test_case, class_name, "HerculesTest"),
+                "class_name": class_name,
+            })
+            if self.check_syntax:
+                self.check(source, f"<test {test_case.name!r}>")
+            sources.append(source)
+        self._account(len(sources), started)
+        return sources
+
+    def render_suite(self, test_cases: Sequence[TestCase], marker: str) -> str:
+        """One module that runs every case in a single process (see
+        `HerculesManager.run_batch`)."""
+        started = time.perf_counter()
+        classes = []
+        entries = []
+        used_names = set()
+        for test_case in test_cases:
+            class_name = class_name_for(test_case.name)
+            # Two cases with the same name must not shadow each other
+            if class_name in used_names:
+                class_name = f"{class_name}_{len(used_names)}"
+            used_names.add(class_name)
+
+            classes.append(self.render_class(test_case, class_name, "_SharedSetupTest"))
+            entries.append(f"    ({py_string(test_case.id)}, {class_name}),")
+
+        source = SUITE_TEMPLATE.render({
+            "count": str(len(test_cases)),
+            "generated": datetime.now().isoformat(),
+            "marker": py_string(marker),
+            "classes": "\n\n\n".join(classes),
+            "entries": "\n".join(entries),
+        })
+        if self.check_syntax:
+            self.check(source, "<suite>")
+        self._account(1, started)
+        return source
+
+    @staticmethod
+    def render_class(test_case: TestCase, class_name: str, base_class: str) -> str:
+        # Suite classes inherit the shared setup/teardown from their base
+        own_setup = base_class == "HerculesTest"
+
+        # Parametrized cases resolve their placeholders at run time
+        if test_case.parameters:
+            def lit(text: str) -> str:
+                return f"_p({py_string(text)})"
+        else:
+            lit = py_string
+
+        step_code = []
+        for i, step in enumerate(test_case.steps, 1):
+            step_code.append(f"        self.log({lit(f'Step {i}: {step}')})")
+            step_code.append(f"        self.execute_step({lit(step)})")
+
+        return CLASS_TEMPLATE.render({
+            "class_name": class_name,
+            "base_class": base_class,
+            "name": py_string(test_case.name),
+            "test_id": py_string(test_case.id),
+            "setup": _OWN_SETUP if own_setup else "",
+            "steps": "\n".join(step_code),
+            "expected": lit(test_case.expected_outcome),
+            "teardown": _OWN_TEARDOWN if own_setup else "",
+        })
+
+    @staticmethod
+    def check(source: str, label: str) -> None:
+        """Raise ValueError if `source` isn't valid Python."""
+        try:
+            compile(source, label, "exec")
+        except (SyntaxError, ValueError) as e:
+            line = getattr(e, "lineno", None)
+            where = f" (line {line})" if line else ""
+            raise ValueError(f"Generated file for {label} is not valid Python{where}: {e}") from None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            rendered, seconds = self._rendered, self._seconds
+        return {
+            "rendered": rendered,
+            "seconds": round(seconds, 6),
+            "per_second": round(rendered / seconds, 1) if seconds else 0.0,
+        }
+
+    def _account(self, count: int, started: float) -> None:
+        with self._lock:
+            self._rendered += count
+            self._seconds += time.perf_counter() - started
@@ -0,0 +1,291 @@
+"""Per-instance workspace for generated test files.
+
+Generated files used to be written synchronously into one shared
+`$TMPDIR/hercules_tests` folder and never removed.  Now each manager
+gets its own directory, writes are handed to a background writer thread
+(so `create_test_case` never blocks the event loop on disk I/O), and a
+collector thread keeps the directory within a disk budget.
+
+Writes are coalesced by path: if a file is queued twice before the
+writer gets to it, only the latest content hits the disk.  Anything that
+is about to *read* a file calls `flush(path)` first.
+
+Generated files are only a cache of what the renderer produces, so the
+collector is free to drop files of live cases when they are old or the
+budget is tight; the manager re-renders them on demand.  Files a queued
+or running process is about to read are `pin`ned so that doesn't happen
+under its feet.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from .processes import pid_alive
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # seconds
+DEFAULT_GC_INTERVAL = 60.0
+
+
+class Workspace:
+    """A manager's private directory with write-behind I/O and GC."""
+
+    def __init__(
+        self,
+        base_dir: str | Path | None = None,
+        *,
+        disk_budget_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        gc_interval: float = DEFAULT_GC_INTERVAL,
+        batch_size: int = 64,
+    ):
+        if base_dir is None:
+            base_dir = os.getenv("HERCULES_WORKSPACE_DIR") or (
+                Path(tempfile.gettempdir()) / "hercules_tests"
+            )
+        if disk_budget_bytes is None:
+            budget_mb = os.getenv("HERCULES_WORKSPACE_BUDGET_MB")
+            disk_budget_bytes = (
+                int(float(budget_mb) * 1024 * 1024) if budget_mb else DEFAULT_BUDGET_BYTES
+            )
+        if max_age is None:
+            env_age = os.getenv("HERCULES_WORKSPACE_MAX_AGE")
+            max_age = float(env_age) if env_age else DEFAULT_MAX_AGE
+
+        self.base_dir = Path(base_dir)
+        # pid in the name lets later instances spot leftovers of dead ones
+        self.root = self.base_dir / f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.disk_budget_bytes = disk_budget_bytes
+        self.max_age = max_age
+        self.gc_interval = gc_interval
+        self.batch_size = batch_size
+
+        self._cond = threading.Condition()
+        self._pending: Dict[str, str] = {}  # path -> latest content
+        self._in_flight: Set[str] = set()
+        self._pinned: Dict[str, int] = {}  # path -> number of runs needing it
+        self._writer: Optional[threading.Thread] = None
+        self._collector: Optional[threading.Thread] = None
+        self._live_paths: Optional[Callable[[], Iterable[str]]] = None
+        self._closed = False
+        self._stop = threading.Event()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._sweep_dead_instances()
+        atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+
+    def path_for(self, name: str) -> Path:
+        return self.root / name
+
+    def write(self, path: str | Path, content: str) -> None:
+        """Queue a file write and return immediately."""
+        with self._cond:
+            self._pending[str(path)] = content
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="hercules-workspace-writer", daemon=True
+                )
+                self._writer.start()
+            self._cond.notify_all()
+
+    def flush(self, path: str | Path | None = None, timeout: Optional[float] = None) -> bool:
+        """Block until `path` (or every queued file) is on disk."""
+        key = str(path) if path is not None else None
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def done() -> bool:
+            if key is None:
+                return not self._pending and not self._in_flight
+            return key not in self._pending and key not in self._in_flight
+
+        with self._cond:
+            while not done():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    async def aflush(self, path: str | Path | None = None) -> None:
+        """`flush` without blocking the event loop."""
+        if path is not None:
+            with self._cond:
+                if str(path) not in self._pending and str(path) not in self._in_flight:
+                    return  # common case, skip the thread hop
+        await asyncio.to_thread(self.flush, path)
+
+    def discard(self, path: str | Path) -> None:
+        """Drop a queued write and delete the file (case was deleted)."""
+        key = str(path)
+        with self._cond:
+            self._pending.pop(key, None)
+        self.flush(key)
+        try:
+            os.unlink(key)
+        except FileNotFoundError:
+            pass
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop.is_set():
+                    self._cond.wait()
+                if not self._pending and self._stop.is_set():
+                    return
+                # Take up to batch_size files in one go
+                batch = []
+                for key in list(self._pending)[: self.batch_size]:
+                    batch.append((key, self._pending.pop(key)))
+                    self._in_flight.add(key)
+
+            for key, content in batch:
+                try:
+                    self._write_atomic(Path(key), content)
+                except OSError as e:
+                    logger.error(f"Failed to write {key}: {e}")
+
+            with self._cond:
+                self._in_flight.difference_update(key for key, _ in batch)
+                self._cond.notify_all()
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(content)
+        os.replace(tmp, path)
+
+    def pin(self, path: str | Path) -> None:
+        """Keep `path` from being collected until a matching `unpin`."""
+        key = str(path)
+        with self._cond:
+            self._pinned[key] = self._pinned.get(key, 0) + 1
+
+    def unpin(self, path: str | Path) -> None:
+        key = str(path)
+        with self._cond:
+            count = self._pinned.pop(key, 0) - 1
+            if count > 0:
+                self._pinned[key] = count
+
+    @contextmanager
+    def pinned(self, path: str | Path | None) -> Iterator[None]:
+        """`pin` for the duration of a block; a None path pins nothing."""
+        if path is None:
+            yield
+            return
+        self.pin(path)
+        try:
+            yield
+        finally:
+            self.unpin(path)
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def start_collector(self, live_paths: Callable[[], Iterable[str]]) -> None:
+        """Run `collect` every `gc_interval` seconds in the background."""
+        self._live_paths = live_paths
+        if self._collector is not None or self.gc_interval <= 0:
+            return
+        self._collector = threading.Thread(
+            target=self._collect_loop, name="hercules-workspace-gc", daemon=True
+        )
+        self._collector.start()
+
+    def collect(self, live_paths: Optional[Iterable[str]] = None) -> List[str]:
+        """Remove orphaned and expired files, then trim to the disk budget.
+
+        Files not in `live_paths` belong to deleted cases and go first;
+        then anything older than `max_age`; then oldest-first until the
+        directory fits the budget.  Queued writes and pinned files are
+        never touched.
+        """
+        if live_paths is None:
+            live_paths = self._live_paths() if self._live_paths else ()
+        live = {str(p) for p in live_paths}
+
+        with self._cond:
+            busy = set(self._pending) | self._in_flight | set(self._pinned)
+
+        files = []
+        for entry in os.scandir(self.root):
+            if not entry.is_file() or entry.path in busy:
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((entry.path, st.st_size, st.st_mtime))
+
+        now = time.time()
+        removed = []
+        kept = []
+        for path, size, mtime in files:
+            if path not in live or now - mtime > self.max_age:
+                removed.append(path)
+            else:
+                kept.append((path, size, mtime))
+
+        usage = sum(size for _, size, _ in kept)
+        if usage > self.disk_budget_bytes:
+            kept.sort(key=lambda f: f[2])
+            for path, size, _ in kept:
+                if usage <= self.disk_budget_bytes:
+                    break
+                removed.append(path)
+                usage -= size
+
+        for path in removed:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        if removed:
+            logger.info(f"Workspace GC removed {len(removed)} file(s)")
+        return removed
+
+    def _collect_loop(self) -> None:
+        while not self._stop.wait(self.gc_interval):
+            try:
+                self.collect()
+            except Exception as e:  # never let GC kill the thread
+                logger.warning(f"Workspace GC failed: {e}")
+
+    def _sweep_dead_instances(self) -> None:
+        """Remove workspaces left behind by server processes that are gone."""
+        for entry in os.scandir(self.base_dir):
+            if not entry.is_dir() or entry.path == str(self.root):
+                continue
+            pid_part = entry.name.split("-", 1)[0]
+            if pid_part.isdigit() and not pid_alive(int(pid_part)):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def close(self, remove: bool = True) -> None:
+        """Flush pending writes, stop the threads and optionally delete the dir."""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if remove:
+            shutil.rmtree(self.root, ignore_errors=True)
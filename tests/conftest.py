@@ -4,8 +4,13 @@
 import pytest
 import tempfile
 import shutil
+import stat
+import textwrap
 from pathlib import Path
 
+from src.artifacts import ArtifactStore
+from src.hercules_manager import HerculesManager
+
 
 @pytest.fixture(scope="session")
 def temp_test_dir():
@@ -44,5 +49,90 @@ def sample_test_steps():
     ]
 
 
+@pytest.fixture(autouse=True)
+def isolated_state_dir(tmp_path, monkeypatch):
+    """Keep suite checkpoints, host slots etc. out of the shared temp dir."""
+    state_dir = tmp_path / "state"
+    monkeypatch.setenv("HERCULES_STATE_DIR", str(state_dir))
+    monkeypatch.setenv("HERCULES_SLOT_DIR", str(tmp_path / "slots"))
+    monkeypatch.setenv("HERCULES_WORKSPACE_DIR", str(tmp_path / "workspace"))
+    return state_dir
+
+
+@pytest.fixture
+def fake_hercules(tmp_path):
+    """A stand-in `hercules` executable for exercising the real run path.
+
+    It prints the step lines from the generated file, drops a PNG
+    "screenshot" into $HERCULES_OUTPUT_DIR and exits 0.  Tests can
+    override its behaviour by rewriting the script.
+    """
+    script = tmp_path / "hercules"
+    script.write_text(textwrap.dedent('''\
+        #!/bin/sh
+        grep -o 'Step [0-9]*: [^"]*' "$2"
+        if [ -n "$HERCULES_OUTPUT_DIR" ]; then
+            printf '\\211PNG\\r\\n\\032\\nfake' > "$HERCULES_OUTPUT_DIR/final.png"
+        fi
+        echo "done"
+    '''))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+@pytest.fixture
+def failing_hercules(tmp_path, fake_hercules):
+    """`fake_hercules` rewritten to fail or hang on demand.
+
+    Any test whose generated file mentions FAIL exits 1, one mentioning
+    HANG sleeps for 30s first, and every invocation's file path is
+    appended to `calls.log` so tests can see what actually ran.
+    Returns the script path and the call log.
+    """
+    calls = tmp_path / "calls.log"
+    calls.touch()
+    Path(fake_hercules).write_text(textwrap.dedent(f'''\
+        #!/bin/sh
+        echo "$2" >> {calls}
+        if grep -q HANG "$2"; then sleep 30; fi
+        if grep -q FAIL "$2"; then echo failing >&2; exit 1; fi
+        echo ok
+    '''))
+    return fake_hercules, calls
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    """Build `HerculesManager`s on this test's state and artifact dirs.
+
+    `make_manager(hercules_path)` runs that executable (say `fake_hercules`)
+    instead of simulating; other keyword arguments go to the manager.  A
+    second call with the same arguments is how tests "restart" a server.
+    """
+    def make(hercules_path=None, **kwargs):
+        kwargs.setdefault("artifact_store", ArtifactStore(tmp_path / "artifacts"))
+        return HerculesManager(hercules_path=hercules_path, **kwargs)
+    return make
+
+
+@pytest.fixture
+def create_case():
+    """Create a test case on a manager; every field has a default."""
+    def create(manager, name="Test case", **fields):
+        fields.setdefault("description", "Created by a test")
+        fields.setdefault("steps", ["Step 1"])
+        fields.setdefault("expected_outcome", "Works")
+        return manager.create_test_case(name=name, **fields)
+    return create
+
+
+@pytest.fixture
+def artifact_dir(tmp_path):
+    """Isolated artifact store root."""
+    path = tmp_path / "artifacts"
+    path.mkdir()
+    return path
+
+
 # Configure pytest for async tests
 pytest_plugins = ('pytest_asyncio',)
\ No newline at end of file
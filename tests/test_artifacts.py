@@ -0,0 +1,106 @@
+"""Tests for the content-addressed artifact store."""
+
+import os
+
+import pytest
+
+from src.artifacts import ARTIFACT_URI_PREFIX, ArtifactStore, digest_from_uri
+from src.hercules_manager import HerculesManager
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"x" * 100
+
+
+class TestArtifactStore:
+    """Test storing, reading and collecting blobs."""
+
+    def test_put_bytes_deduplicates(self, artifact_dir):
+        """Same content stored twice ends up as one blob."""
+        store = ArtifactStore(artifact_dir)
+
+        uri1 = store.put_bytes(PNG)
+        uri2 = store.put_bytes(PNG)
+
+        assert uri1 == uri2
+        assert uri1.startswith(ARTIFACT_URI_PREFIX)
+        assert store.usage() == len(PNG)
+        assert store.read(uri1) == PNG
+
+    def test_put_file_matches_put_bytes(self, artifact_dir, tmp_path):
+        """Files and raw bytes hash to the same address."""
+        store = ArtifactStore(artifact_dir)
+        path = tmp_path / "shot.png"
+        path.write_bytes(PNG)
+
+        assert store.put_file(path) == store.put_bytes(PNG)
+        assert store.stat(store.put_file(path))["mime_type"] == "image/png"
+
+    def test_large_blobs_are_memory_mapped(self, artifact_dir):
+        """Reads above the threshold come back through mmap intact."""
+        store = ArtifactStore(artifact_dir, mmap_threshold=64)
+        data = os.urandom(4096)
+        uri = store.put_bytes(data)
+
+        with store.open(uri) as view:
+            assert view.readonly
+            assert view[:16].tobytes() == data[:16]
+        assert store.read(uri) == data
+
+    def test_invalid_and_missing_uris(self, artifact_dir):
+        """Bad references raise instead of touching arbitrary paths."""
+        store = ArtifactStore(artifact_dir)
+
+        with pytest.raises(ValueError):
+            digest_from_uri("hercules://artifacts/../../etc/passwd")
+        with pytest.raises(FileNotFoundError):
+            store.read(ARTIFACT_URI_PREFIX + "0" * 64)
+
+    def test_gc_prefers_unreferenced_blobs(self, artifact_dir):
+        """GC evicts unreferenced blobs before referenced ones."""
+        store = ArtifactStore(artifact_dir, quota_bytes=250)
+        keep = store.put_bytes(b"k" * 100)
+        store.put_bytes(b"d" * 100)
+        store.put_bytes(b"n" * 100)
+
+        removed = store.collect_garbage(referenced=[keep])
+
+        assert len(removed) == 1
+        assert keep not in removed
+        assert store.exists(keep)
+        assert store.usage() <= 250
+
+
+@pytest.mark.asyncio
+async def test_run_stores_screenshots_as_uris(fake_hercules, artifact_dir):
+    """Real runs put screenshots in the store and only keep URIs."""
+    manager = HerculesManager(
+        hercules_path=fake_hercules,
+        artifact_store=ArtifactStore(artifact_dir),
+    )
+    test_case = manager.create_test_case(
+        name="Shot Test", description="Takes a screenshot",
+        steps=["Open page"], expected_outcome="Page shown",
+    )
+
+    result = await manager.run_test(test_case.id)
+
+    assert result.status == "passed"
+    assert len(result.screenshots) == 1
+    assert result.screenshots[0].startswith(ARTIFACT_URI_PREFIX)
+    assert manager.read_artifact(result.screenshots[0]).startswith(b"\x89PNG")
+
+
+@pytest.mark.asyncio
+async def test_resource_carries_sniffed_mime_type(monkeypatch, make_manager):
+    """The artifact resource labels each blob with its own type."""
+    main = pytest.importorskip("src.main")
+    if not main.FASTMCP_AVAILABLE:
+        pytest.skip("FastMCP not available")
+    manager = make_manager()
+    monkeypatch.setattr(main, "_manager", manager)
+    png = manager.artifacts.put_bytes(PNG)
+    blob = manager.artifacts.put_bytes(b"plain output")
+
+    [content] = (await main.mcp.read_resource(png)).contents
+    assert (content.content, content.mime_type) == (PNG, "image/png")
+    [content] = (await main.mcp.read_resource(blob)).contents
+    assert content.mime_type == "application/octet-stream"
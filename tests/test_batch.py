@@ -0,0 +1,205 @@
+"""Tests for batched suite files (many tests, one Hercules process)."""
+
+import ast
+import stat
+import sys
+import textwrap
+import time
+
+import pytest
+
+from src.processes import pid_alive
+
+# Minimal stand-in for the `hercules` package so generated modules can
+# actually execute. Steps mentioning FAIL raise; every launch is counted.
+HERCULES_PKG = '''
+import os, time
+
+class HerculesTest:
+    def log(self, msg):
+        print(msg, flush=True)
+
+    def execute_step(self, step):
+        time.sleep(0.05)
+        if "FAIL" in step:
+            raise AssertionError(f"step failed: {step}")
+
+    def verify_outcome(self, outcome):
+        pass
+
+    def run(self):
+        self.setup()
+        try:
+            self.execute()
+        finally:
+            self.teardown()
+'''
+
+
+@pytest.fixture
+def python_hercules(tmp_path):
+    pkg = tmp_path / "fakepkg"
+    pkg.mkdir()
+    (pkg / "hercules.py").write_text(HERCULES_PKG)
+    launches = tmp_path / "launches.log"
+    script = tmp_path / "hercules"
+    script.write_text(textwrap.dedent(f"""\
+        #!/bin/sh
+        echo x >> {launches}
+        PYTHONPATH={pkg} exec {sys.executable} "$2"
+    """))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script), launches
+
+
+def test_suite_file_is_valid_python(make_manager, create_case, python_hercules):
+    """The generated module parses and lists every case once."""
+    manager = make_manager(python_hercules[0])
+    cases = [create_case(manager, "Same Name", steps=["Step 1"]) for _ in range(3)]
+
+    source = manager._generate_suite_file(cases)
+
+    tree = ast.parse(source)
+    class_names = [n.name for n in tree.body if isinstance(n, ast.ClassDef)]
+    assert len(class_names) == len(set(class_names)) == 4  # shared base + 3 cases
+    for case in cases:
+        assert f'("{case.id}",' in source
+
+
+@pytest.mark.asyncio
+async def test_run_batch_splits_results(make_manager, create_case, python_hercules):
+    """One process, but one accurately timed result per test."""
+    manager = make_manager(python_hercules[0])
+    ok = create_case(manager, "Batch OK", steps=["Open page", "Click button"])
+    bad = create_case(manager, "Batch Bad", steps=["Open page", "FAIL here"])
+
+    results = await manager.run_batch([ok.id, bad.id])
+
+    assert python_hercules[1].read_text().count("x") == 1
+    by_id = {r.test_id: r for r in results}
+    assert by_id[ok.id].status == "passed"
+    assert by_id[bad.id].status == "failed"
+    assert "FAIL here" in by_id[bad.id].error_message
+    assert "Step 2: Click button" in by_id[ok.id].logs
+    assert not any("Click button" in line for line in by_id[bad.id].logs)
+    # two steps of ~50ms each
+    assert 0.09 < by_id[ok.id].execution_time < 1.0
+    assert by_id[ok.id].completed_at <= by_id[bad.id].started_at
+    assert manager.get_test_result(bad.id) is by_id[bad.id]
+    assert manager._running_processes == {}
+    # Per-test usage deltas come back on the END markers
+    assert by_id[ok.id].resource_usage.max_rss_kb > 0
+    assert by_id[ok.id].resource_usage.voluntary_ctx_switches >= 1
+    # Steps are timed per test from the streamed markers
+    assert [t.index for t in by_id[ok.id].step_timings] == [1, 2]
+    assert all(0.04 < t.duration < 0.5 for t in by_id[ok.id].step_timings)
+    assert by_id[bad.id].step_timings[-1].description == "FAIL here"
+
+
+@pytest.mark.asyncio
+async def test_batched_suite_checkpoints_per_test(make_manager, create_case, python_hercules):
+    """Suite runs in batch mode still record every outcome."""
+    manager = make_manager(python_hercules[0])
+    cases = [create_case(manager, f"Batch {i}", steps=["Step 1"]) for i in range(4)]
+
+    suite = await manager.run_suite([c.id for c in cases], max_parallel=2, batch=True)
+
+    assert suite.status == "completed"
+    assert set(suite.outcomes.values()) == {"passed"}
+    assert python_hercules[1].read_text().count("x") == 2
+
+
+@pytest.mark.asyncio
+async def test_batched_suite_runs_prerequisites_in_earlier_waves(
+    make_manager, create_case, python_hercules,
+):
+    """Dependents wait for the wave holding their prerequisite, or are skipped."""
+    manager = make_manager(python_hercules[0])
+    login = create_case(manager, "Login", steps=["FAIL login"])
+    cart = create_case(manager, "Cart", depends_on=[login.id])
+    search = create_case(manager, "Search", steps=["Step 1"])
+
+    suite = await manager.run_suite([cart.id, search.id], max_parallel=1, batch=True)
+
+    assert suite.outcomes == {login.id: "failed", cart.id: "skipped", search.id: "passed"}
+    # One process for the first wave; the skipped dependent never launches one
+    assert python_hercules[1].read_text().count("x") == 1
+    assert manager.get_test_result(cart.id).status == "skipped"
+
+
+def _marker_script(fake_hercules, tmp_path, *lines, hang=False):
+    """Make `fake_hercules` print raw markers for the suite's first test."""
+    pid_file = tmp_path / "pid"
+    with open(fake_hercules, "w") as fh:
+        fh.write(textwrap.dedent(f"""\
+            #!/bin/sh
+            echo $$ > {pid_file}
+            id=$(grep -o '("[0-9a-f-]*",' "$2" | head -n 1 | tr -d '(",')
+            now=$(date +%s)
+        """))
+        fh.writelines(f'echo "{line}"\n' for line in lines)
+        if hang:
+            fh.write("exec sleep 30\n")
+    return pid_file
+
+
+@pytest.mark.asyncio
+async def test_malformed_markers_are_plain_output(
+    make_manager, create_case, fake_hercules, tmp_path,
+):
+    """A marker that doesn't parse is logged, not fatal to the batch."""
+    _marker_script(
+        fake_hercules, tmp_path,
+        "@@hercules-suite START $id $now",
+        "@@hercules-suite START",
+        "@@hercules-suite END $id soon passed null",
+        "@@hercules-suite END $id $now bogus null",
+        "@@hercules-suite END $id $now passed null",
+    )
+    manager = make_manager(fake_hercules)
+    case = create_case(manager, "Odd output", steps=["Step 1"])
+
+    [result] = await manager.run_batch([case.id])
+
+    assert result.status == "passed"
+    assert "@@hercules-suite START" in result.logs
+    assert any(line.endswith("bogus null") for line in result.logs)
+
+
+@pytest.mark.asyncio
+async def test_error_mid_batch_kills_process(make_manager, create_case, fake_hercules, tmp_path):
+    """Test the suite process doesn't outlive a batch that blew up."""
+    pid_file = _marker_script(
+        fake_hercules, tmp_path,
+        "@@hercules-suite START $id $now",
+        "@@hercules-suite END $id $now passed null",
+        hang=True,
+    )
+    manager = make_manager(fake_hercules)
+    first = create_case(manager, "First", steps=["Step 1"])
+    second = create_case(manager, "Second", steps=["Step 1"])
+
+    def on_result(result):
+        if result.test_id == first.id:
+            raise RuntimeError("callback failed")
+
+    started = time.monotonic()
+    results = await manager.run_batch([first.id, second.id], on_result=on_result)
+
+    assert time.monotonic() - started < 10
+    assert not pid_alive(int(pid_file.read_text()))
+    assert results[1].status == "error"
+    assert results[1].error_message == "callback failed"
+    assert manager._running_processes == {}
+    assert list((tmp_path / "state" / "inflight").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_run_batch_simulation(make_manager, create_case):
+    """Without Hercules, batches fall back to simulated runs."""
+    manager = make_manager()
+    cases = [create_case(manager, f"Sim {i}", steps=["Step 1"]) for i in range(2)]
+
+    results = await manager.run_batch([c.id for c in cases])
+
+    assert [r.status for r in results] == ["passed", "passed"]
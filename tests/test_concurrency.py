@@ -0,0 +1,159 @@
+"""Tests for the adaptive concurrency controller."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.artifacts import ArtifactStore
+from src.concurrency import AdaptiveLimiter
+from src.hercules_manager import HerculesManager
+
+HEALTHY = (0.2, 0.8)
+
+
+class FakeHost:
+    """Settable load/memory readings."""
+
+    def __init__(self):
+        self.reading = HEALTHY
+
+    def __call__(self):
+        return self.reading
+
+
+class TestController:
+    """Test AIMD decisions."""
+
+    def setup_method(self):
+        self.host = FakeHost()
+        self.limiter = AdaptiveLimiter(1, 8, initial=4, sampler=self.host, interval=3600)
+
+    def _saturate(self):
+        self.limiter._peak_in_flight = self.limiter.limit
+
+    def test_grows_additively_when_healthy_and_busy(self):
+        """Test +1 per step while the limit is in use, capped at max."""
+        for expected in (5, 6, 7, 8, 8):
+            self._saturate()
+            assert self.limiter.evaluate()["new_limit"] == expected
+        assert self.limiter.decisions()[-1]["action"] == "hold"
+
+    def test_holds_when_limit_unused(self):
+        """Test an idle server doesn't inflate its limit."""
+        decision = self.limiter.evaluate()
+        assert decision["action"] == "hold"
+        assert self.limiter.limit == 4
+
+    @pytest.mark.parametrize("reading", [(2.5, 0.8), (0.2, 0.05)])
+    def test_backs_off_multiplicatively(self, reading):
+        """Test high load or low memory halves the limit, down to min."""
+        self.host.reading = reading
+        self._saturate()
+
+        assert [self.limiter.evaluate()["new_limit"] for _ in range(3)] == [2, 1, 1]
+        assert self.limiter.decisions()[0]["action"] == "decrease"
+        assert self.limiter.decisions()[0]["reasons"]
+
+    def test_backs_off_on_latency_inflation(self):
+        """Test runs slower than their own average count as congestion."""
+        for _ in range(3):
+            self.limiter.record("t", 1.0, errored=False)
+        for _ in range(3):
+            self.limiter.record("t", 5.0, errored=False)
+
+        decision = self.limiter.evaluate()
+        assert decision["action"] == "decrease"
+        assert "slower" in decision["reasons"][0]
+
+    def test_slow_tests_are_not_congestion(self):
+        """Test a consistently slow test doesn't trigger a decrease."""
+        for _ in range(5):
+            self.limiter.record("fast", 1.0, errored=False)
+            self.limiter.record("slow", 60.0, errored=False)
+
+        assert self.limiter.evaluate()["action"] != "decrease"
+
+    def test_backs_off_on_errors(self):
+        """Test a burst of errored runs triggers a decrease."""
+        for _ in range(4):
+            self.limiter.record("t", None, errored=True)
+
+        assert self.limiter.evaluate()["action"] == "decrease"
+
+
+class TestSemaphore:
+    """Test the limit is enforced on concurrent runs."""
+
+    @pytest.mark.asyncio
+    async def test_limit_enforced_and_raised(self):
+        """Test waiters queue at the limit and are admitted when it grows."""
+        limiter = AdaptiveLimiter(1, 4, initial=1, sampler=lambda: HEALTHY, interval=3600)
+        running = 0
+        peak = 0
+
+        async def run():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.05)
+                running -= 1
+
+        tasks = [asyncio.create_task(run()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        assert limiter.status()["waiting"] == 3
+
+        limiter.evaluate()  # saturated and healthy -> limit 2
+        await asyncio.gather(*tasks)
+
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_nothing(self):
+        """Test cancelling a queued acquire doesn't leak or steal a slot."""
+        limiter = AdaptiveLimiter(1, 1, sampler=lambda: HEALTHY, interval=3600)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release()
+        assert limiter.in_flight == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+
+@pytest.mark.asyncio
+async def test_manager_respects_adaptive_limit(fake_hercules, tmp_path):
+    """Test suite runs stay within the adaptive limit and feed it back."""
+    (tmp_path / "hercules").write_text("#!/bin/sh\nsleep 0.2\n")
+    limiter = AdaptiveLimiter(1, 1, sampler=lambda: HEALTHY, interval=3600)
+    manager = HerculesManager(
+        hercules_path=fake_hercules,
+        artifact_store=ArtifactStore(tmp_path / "artifacts"),
+        adaptive_limiter=limiter,
+    )
+    cases = [
+        manager.create_test_case(name=f"Adaptive {i}", description="d",
+                                 steps=["Step 1"], expected_outcome="ok")
+        for i in range(3)
+    ]
+
+    started = time.monotonic()
+    suite = await manager.run_suite([c.id for c in cases], max_parallel=3)
+
+    assert set(suite.outcomes.values()) == {"passed"}
+    # limit 1: the runs went one at a time despite max_parallel=3
+    assert time.monotonic() - started >= 0.6
+    assert len(limiter._outcomes) == 3
+    assert manager.get_concurrency_status()["limit"] == 1
+    assert manager.get_concurrency_status()["in_flight"] == 0
+
+
+def test_disabled_by_default():
+    """Test the adaptive mode is opt-in."""
+    assert HerculesManager().get_concurrency_status() == {"enabled": False}
@@ -0,0 +1,122 @@
+"""Tests for the vscode_plugin daemon."""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import vscode_plugin
+from src.daemon import HerculesDaemon
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~100 bytes, pytest's tmp_path can be longer
+    short_dir = tempfile.mkdtemp(prefix="hd-")
+    yield os.path.join(short_dir, "d.sock")
+    shutil.rmtree(short_dir, ignore_errors=True)
+
+
+class TestDaemonRequests:
+    """Test request dispatch without a socket."""
+
+    def setup_method(self):
+        self.daemon = HerculesDaemon("/unused.sock", idle_timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_state_persists_between_requests(self):
+        """Test a case created by one request is visible to the next."""
+        created = await self.daemon.handle_request({
+            "action": "create",
+            "args": {"name": "Daemon", "description": "d", "steps": ["Step 1"],
+                     "expected_outcome": "ok"},
+        })
+        assert created["ok"]
+        test_id = created["result"]["id"]
+
+        listed = await self.daemon.handle_request({"action": "list"})
+        assert [case["id"] for case in listed["result"]] == [test_id]
+
+        run = await self.daemon.handle_request({"action": "run", "args": {"test_id": test_id}})
+        assert run["result"]["status"] == "passed"
+
+    @pytest.mark.asyncio
+    async def test_errors_are_reported(self):
+        """Test unknown actions, bad args and failures come back as errors."""
+        assert not (await self.daemon.handle_request({"action": "nope"}))["ok"]
+        bad_args = await self.daemon.handle_request({"action": "run", "args": {"x": 1}})
+        assert "Bad arguments" in bad_args["error"]
+        missing = await self.daemon.handle_request({"action": "run", "args": {"test_id": "zz"}})
+        assert not missing["ok"] and "zz" in missing["error"]
+
+
+class TestDaemonSocket:
+    """Test the daemon over a real Unix socket."""
+
+    @pytest.mark.asyncio
+    async def test_client_round_trip(self, socket_path):
+        """Test the plugin client talks to a running daemon."""
+        daemon = HerculesDaemon(socket_path, idle_timeout=0)
+        server = asyncio.create_task(daemon.serve())
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+
+        created = await asyncio.to_thread(
+            vscode_plugin.request, "create", socket_path, False,
+            name="Socket", description="d", steps=["Step 1"], expected_outcome="ok",
+        )
+        listed = await asyncio.to_thread(vscode_plugin.request, "list", socket_path, False)
+        assert [case["id"] for case in listed] == [created["id"]]
+
+        # A second daemon on the same socket backs off, without a manager
+        loser = HerculesDaemon(socket_path, idle_timeout=0)
+        assert await loser.serve() is False
+        assert loser._manager is None
+
+        await asyncio.to_thread(vscode_plugin.request, "shutdown", socket_path, False)
+        assert await asyncio.wait_for(server, 5) is True
+        assert not os.path.exists(socket_path)
+
+    @pytest.mark.asyncio
+    async def test_idle_timeout(self, socket_path):
+        """Test the daemon exits on its own once idle."""
+        daemon = HerculesDaemon(socket_path, idle_timeout=0.2)
+        assert await asyncio.wait_for(daemon.serve(), 5) is True
+
+
+def test_daemon_import_skips_server():
+    """Test the daemon doesn't pull in the MCP server and its manager."""
+    code = (
+        "import sys, src.daemon\n"
+        "assert 'src.main' not in sys.modules, sorted(sys.modules)\n"
+        "assert 'fastmcp' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True, timeout=60)
+
+
+def test_plugin_autostarts_daemon(socket_path):
+    """Test separate plugin invocations share state via an auto-started daemon."""
+    env = {**os.environ, "HERCULES_DAEMON_SOCKET": socket_path}
+
+    def plugin(*args):
+        return subprocess.run(
+            [sys.executable, "vscode_plugin.py", *args],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=60,
+        )
+
+    try:
+        created = plugin("create")
+        assert created.returncode == 0, created.stderr
+        test_id = created.stdout.split(":")[1].strip()
+
+        assert test_id in plugin("list").stdout
+        assert plugin("run", test_id).stdout.strip() == f"Test {test_id}: passed"
+    finally:
+        plugin("stop")
@@ -0,0 +1,175 @@
+"""Tests for dependency-aware suite scheduling."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from src.dag import critical_path, levels, run_dag, topological_order
+from src.hercules_manager import HerculesManager
+from src.host_limiter import HostSlotLimiter
+
+
+class TestGraph:
+    """Test ordering, levels and critical path."""
+
+    def test_topological_order(self):
+        """Test prerequisites come before their dependents."""
+        deps = {"c": ["a", "b"], "a": [], "b": ["a"], "d": ["outside"]}
+        order = topological_order(deps)
+        assert order.index("a") < order.index("b") < order.index("c")
+        assert set(order) == set(deps)
+
+    def test_cycle_rejected(self):
+        """Test a cycle is reported by name."""
+        with pytest.raises(ValueError, match="Dependency cycle: .*a -> b"):
+            topological_order({"a": ["b"], "b": ["c"], "c": ["a"]})
+
+    def test_levels(self):
+        """Test independent nodes share a wave."""
+        assert levels({"a": [], "b": [], "c": ["a"], "d": ["c", "b"]}) == [
+            ["a", "b"], ["c"], ["d"],
+        ]
+
+    def test_critical_path(self):
+        """Test the longest chain by duration wins, not the longest by count."""
+        deps = {"login": [], "seed": [], "cart": ["login"], "pay": ["cart", "seed"]}
+        durations = {"login": 1.0, "seed": 5.0, "cart": 1.0, "pay": 2.0}
+        assert critical_path(deps, durations) == (["seed", "pay"], 7.0)
+        assert critical_path({}, {}) == ([], 0.0)
+
+
+class TestRunDag:
+    """Test the scheduler itself."""
+
+    @pytest.mark.asyncio
+    async def test_independent_branches_overlap(self):
+        """Test branches run in parallel and dependents wait."""
+        started = {}
+
+        async def run(node):
+            started[node] = time.monotonic()
+            await asyncio.sleep(0.1)
+            return "passed"
+
+        deps = {"a": [], "b": [], "c": ["a"]}
+        outcomes = await run_dag(deps, run, max_parallel=4, skip=None)
+
+        assert outcomes == {"a": "passed", "b": "passed", "c": "passed"}
+        assert abs(started["a"] - started["b"]) < 0.05
+        assert started["c"] - started["a"] >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_downstream(self):
+        """Test a failed prerequisite skips its whole subtree only."""
+        ran, skipped = [], []
+
+        async def run(node):
+            ran.append(node)
+            return "failed" if node == "a" else "passed"
+
+        deps = {"a": [], "b": ["a"], "c": ["b"], "d": [], "e": ["x"], "f": ["gone"]}
+        outcomes = await run_dag(
+            deps, run, max_parallel=2,
+            skip=lambda node, dep, outcome: skipped.append((node, dep, outcome)),
+            external={"x": "error"},
+        )
+
+        assert sorted(ran) == ["a", "d"]
+        assert outcomes == {
+            "a": "failed", "b": "skipped", "c": "skipped", "d": "passed",
+            "e": "skipped", "f": "skipped",
+        }
+        assert ("b", "a", "failed") in skipped
+        assert ("c", "b", "skipped") in skipped
+        assert ("e", "x", "error") in skipped
+        assert ("f", "gone", "error") in skipped  # unknown counts as an error
+
+
+class TestDependentSuites:
+    """Test suites of test cases with prerequisites."""
+
+    def setup_method(self):
+        self.manager = HerculesManager()
+
+    def test_unknown_prerequisite_rejected(self, create_case):
+        """Test depends_on must name existing test cases."""
+        with pytest.raises(ValueError, match="unknown test case"):
+            create_case(self.manager, "Orphan", depends_on=["missing-id"])
+        assert self.manager.list_test_cases() == []
+
+    def test_batch_with_unknown_prerequisite_rejected(self, create_case):
+        """Test one bad prerequisite in create_test_cases creates nothing."""
+        login = create_case(self.manager, "Login")
+        definitions = [
+            {"name": "Cart", "description": "", "steps": ["x"],
+             "expected_outcome": "y", "depends_on": [login.id]},
+            {"name": "Pay", "description": "", "steps": ["x"],
+             "expected_outcome": "y", "depends_on": ["missing-id"]},
+        ]
+        with pytest.raises(ValueError, match="unknown test case"):
+            self.manager.create_test_cases(definitions)
+        assert self.manager.list_test_cases() == [login]
+
+    @pytest.mark.asyncio
+    async def test_prerequisites_pulled_in(self, create_case):
+        """Test requesting a dependent adds its prerequisites, first."""
+        login = create_case(self.manager, "Login")
+        cart = create_case(self.manager, "Cart", depends_on=[login.id])
+        checkout = create_case(self.manager, "Checkout", depends_on=[cart.id])
+
+        suite = await self.manager.run_suite([checkout.id])
+
+        assert suite.test_ids == [login.id, cart.id, checkout.id]
+        assert set(suite.outcomes.values()) == {"passed"}
+        assert suite.critical_path == [login.id, cart.id, checkout.id]
+        assert suite.critical_path_seconds > 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("batch", [False, True])
+    async def test_deleted_prerequisite_skips_dependents(self, create_case, batch):
+        """Test a prerequisite deleted after the fact doesn't count as passed."""
+        login = create_case(self.manager, "Login")
+        checkout = create_case(self.manager, "Checkout", depends_on=[login.id])
+        assert self.manager.delete_test_case(login.id)
+
+        suite = await self.manager.run_suite([checkout.id], batch=batch)
+
+        assert suite.test_ids == [checkout.id]
+        assert suite.outcomes == {checkout.id: "skipped"}
+        result = self.manager.get_test_result(checkout.id)
+        assert result.error_message == f"Skipped: prerequisite {login.id} error"
+
+    @pytest.mark.asyncio
+    async def test_failed_prerequisite_skips_dependents(
+        self, make_manager, create_case, failing_hercules,
+    ):
+        """Test dependents of a failure are skipped, never run, and recorded."""
+        manager = make_manager(failing_hercules[0], host_limiter=HostSlotLimiter(slots=4))
+        login = create_case(manager, "Login FAIL")
+        cart = create_case(manager, "Cart", depends_on=[login.id])
+        checkout = create_case(manager, "Checkout", depends_on=[cart.id])
+        search = create_case(manager, "Search")
+
+        suite = await manager.run_suite(
+            [checkout.id, search.id], max_parallel=2
+        )
+
+        assert suite.status == "completed"
+        assert suite.outcomes == {
+            login.id: "failed", cart.id: "skipped",
+            checkout.id: "skipped", search.id: "passed",
+        }
+        ran = failing_hercules[1].read_text()
+        assert cart.file_path not in ran and checkout.file_path not in ran
+
+        result = manager.get_test_result(checkout.id)
+        assert result.status == "skipped"
+        assert cart.id in result.error_message
+
+        # Once the prerequisite passes, a rerun runs its dependents too
+        script = Path(failing_hercules[0])
+        script.write_text(script.read_text().replace("FAIL", "NEVER"))
+        suite = await manager.rerun_failed(suite.id)
+        assert set(suite.outcomes.values()) == {"passed"}
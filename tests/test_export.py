@@ -0,0 +1,125 @@
+"""Tests for streaming result export."""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.export import main as export_main
+from src.export import write_junit, write_jsonl
+from src.hercules_manager import HerculesManager
+
+
+async def _run_some(manager, n=2):
+    cases = [
+        manager.create_test_case(
+            name=f"Export {i}", description="Exported",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+        for i in range(n)
+    ]
+    for case in cases:
+        await manager.run_test(case.id)
+    # A second run of the same test is its own record
+    await manager.run_test(cases[0].id)
+    return cases
+
+
+@pytest.mark.asyncio
+async def test_export_jsonl_includes_every_run():
+    """Every finished run is exported, not just the latest per test."""
+    manager = HerculesManager()
+    await _run_some(manager)
+
+    out = io.StringIO()
+    count = manager.export_results(out, "jsonl")
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert count == len(records) == 3
+    assert len({r["run_id"] for r in records}) == 3
+    assert all(r["status"] == "passed" for r in records)
+
+
+@pytest.mark.asyncio
+async def test_export_filters():
+    """Status and time filters narrow the export."""
+    manager = HerculesManager()
+    await _run_some(manager)
+
+    assert manager.export_results(io.StringIO(), statuses=["failed"]) == 0
+    future = datetime.now() + timedelta(days=1)
+    assert manager.export_results(io.StringIO(), since=future) == 0
+    assert manager.export_results(io.StringIO(), until=future) == 3
+
+
+def test_junit_is_valid_xml():
+    """JUnit output parses and maps statuses to failure/error elements."""
+    records = [
+        {"test_id": "a", "test_name": "Good", "status": "passed", "execution_time": 1.5},
+        {"test_id": "b", "test_name": "Bad <&>", "status": "failed",
+         "error_message": "boom \x1b[31m", "logs": ["line \"1\"", "line 2"]},
+        {"test_id": "c", "test_name": "Broken", "status": "error"},
+    ]
+    out = io.StringIO()
+
+    assert write_junit(iter(records), out) == 3
+
+    suite = ET.fromstring(out.getvalue()).find("testsuite")
+    cases = suite.findall("testcase")
+    assert [c.get("name") for c in cases] == ["Good", "Bad <&>", "Broken"]
+    assert cases[0].get("time") == "1.500"
+    assert cases[1].find("failure").get("message") == "boom [31m"
+    assert 'line "1"' in cases[1].find("system-out").text
+    assert cases[2].find("error") is not None
+
+
+def test_writers_consume_lazily():
+    """Writers pull records one at a time from a generator."""
+    pulled = []
+
+    def records():
+        for i in range(3):
+            pulled.append(i)
+            yield {"test_id": str(i), "status": "passed"}
+
+    out = io.StringIO()
+    assert write_jsonl(records(), out) == 3
+    assert pulled == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_cli_export(tmp_path, isolated_state_dir):
+    """The CLI reads the journal straight from the state dir."""
+    manager = HerculesManager()
+    await _run_some(manager)
+    manager._result_journal.close()
+
+    target = tmp_path / "report.xml"
+    today = datetime.now().date().isoformat()
+    assert export_main([
+        "--format", "junit", "--output", str(target),
+        "--state-dir", str(isolated_state_dir), "--until", today,
+    ]) == 0
+
+    assert len(ET.parse(target).getroot().find("testsuite").findall("testcase")) == 3
+
+
+def test_cli_has_no_server_side_effects(tmp_path, isolated_state_dir):
+    """`python -m src.export` only reads the journal: no manager, no warnings."""
+    out = subprocess.run(
+        [sys.executable, "-W", "error::RuntimeWarning", "-m", "src.export",
+         "--output", str(tmp_path / "out.jsonl")],
+        cwd=Path(__file__).resolve().parent.parent, env=dict(os.environ),
+        capture_output=True, text=True, timeout=60,
+    )
+
+    assert out.returncode == 0, out.stderr
+    assert out.stderr.strip() == "Exported 0 result(s)"
+    assert not isolated_state_dir.exists()  # no in-flight dir, cold store, ...
+    assert not (tmp_path / "workspace").exists()
@@ -158,4 +158,77 @@ async def test_concurrent_execution():
     assert len(results) == 2
     assert all(result.status == "passed" for result in results)
     assert results[0].test_id == test1.id
-    assert results[1].test_id == test2.id
\ No newline at end of file
+    assert results[1].test_id == test2.id
+
+class TestUpdateTestCase:
+    """Test copy-on-write versioning of test cases."""
+
+    def setup_method(self):
+        self.manager = HerculesManager()
+        self.case = self.manager.create_test_case(
+            name="Checkout", description="Buy something",
+            steps=["Open cart", "Pay"], expected_outcome="Order placed",
+        )
+
+    def test_update_publishes_new_version(self):
+        """Test the old version is untouched and unchanged fields are shared."""
+        rendered = self.manager.render_stats()["rendered"]
+
+        v2 = self.manager.update_test_case(self.case.id, steps=["Open cart", "Pay by card"])
+
+        assert v2.version == 2 and self.case.version == 1
+        assert self.case.steps == ["Open cart", "Pay"]
+        assert v2.description is self.case.description
+        assert self.manager.list_test_cases() == [v2]
+        assert self.manager.get_test_case_versions(self.case.id) == [self.case, v2]
+        # Steps appear in the file, so it was rendered again
+        assert self.manager.render_stats()["rendered"] == rendered + 1
+        self.manager.flush_test_files()
+        assert "Pay by card" in open(v2.file_path).read()
+
+    def test_non_rendered_change_keeps_file(self):
+        """Test a dependency-only change doesn't regenerate the file."""
+        other = self.manager.create_test_case(
+            name="Login", description="", steps=["Log in"], expected_outcome="In",
+        )
+        rendered = self.manager.render_stats()["rendered"]
+
+        v2 = self.manager.update_test_case(self.case.id, depends_on=[other.id])
+
+        assert self.manager.render_stats()["rendered"] == rendered
+        assert v2.steps is self.case.steps
+        assert v2.file_path == self.case.file_path
+
+    def test_noop_update(self):
+        """Test identical values don't create a version."""
+        same = self.manager.update_test_case(self.case.id, name="Checkout", steps=["Open cart", "Pay"])
+        assert same is self.case
+        assert self.manager.get_test_case_versions(self.case.id) == [self.case]
+
+    def test_invalid_update_rejected(self):
+        """Test unknown ids and dependency cycles leave the case as it was."""
+        dependent = self.manager.create_test_case(
+            name="Receipt", description="", steps=["Open receipt"],
+            expected_outcome="Shown", depends_on=[self.case.id],
+        )
+        with pytest.raises(ValueError, match="Dependency cycle"):
+            self.manager.update_test_case(self.case.id, depends_on=[dependent.id])
+        with pytest.raises(ValueError, match="not found"):
+            self.manager.update_test_case("fake-id", name="x")
+        assert self.manager.get_test_case_versions(self.case.id) == [self.case]
+
+    def test_search_follows_update(self):
+        """Test the search index sees the current version."""
+        self.manager.update_test_case(self.case.id, name="Wishlist")
+        assert [c.id for c in self.manager.search_test_cases("wishlist")] == [self.case.id]
+        assert self.manager.search_test_cases("checkout") == []
+
+    @pytest.mark.asyncio
+    async def test_results_record_version(self):
+        """Test each result names the version it ran against."""
+        first = await self.manager.run_test(self.case.id)
+        self.manager.update_test_case(self.case.id, expected_outcome="Order confirmed")
+        second = await self.manager.run_test(self.case.id)
+
+        assert (first.test_version, second.test_version) == (1, 2)
+        assert "Verifying: Order confirmed" in second.logs
@@ -0,0 +1,98 @@
+"""Tests for the cross-process execution slot limiter."""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.artifacts import ArtifactStore
+from src.hercules_manager import HerculesManager
+from src.host_limiter import HostSlotLimiter
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="flock based")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestHostSlotLimiter:
+    """Test slot acquisition, visibility and reclamation."""
+
+    def test_slots_are_exclusive_across_instances(self, tmp_path):
+        """Two limiters on one directory share the same slot pool."""
+        first = HostSlotLimiter(1, tmp_path)
+        second = HostSlotLimiter(1, tmp_path)
+
+        slot = first.try_acquire("test-a")
+        assert slot is not None and slot.held
+        assert second.try_acquire("test-b") is None
+
+        [holder] = second.holders()
+        assert holder["owner"] == "test-a"
+        assert holder["pid"] == os.getpid()
+
+        first.release(slot)
+        assert second.holders() == []
+        assert second.try_acquire("test-b") is not None
+
+    def test_crashed_holder_slot_is_reclaimed(self, tmp_path):
+        """A slot held by a killed process frees up by itself."""
+        code = (
+            "import sys, time; sys.path.insert(0, sys.argv[1]);"
+            "from src.host_limiter import HostSlotLimiter;"
+            "s = HostSlotLimiter(1, sys.argv[2]).try_acquire('crasher');"
+            "print('held', flush=True); time.sleep(60)"
+        )
+        proc = subprocess.Popen(
+            [sys.executable, "-c", code, str(REPO_ROOT), str(tmp_path)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            assert proc.stdout.readline().strip() == "held"
+            limiter = HostSlotLimiter(1, tmp_path)
+            assert limiter.holders()[0]["pid"] == proc.pid
+            assert limiter.try_acquire("me") is None
+        finally:
+            proc.kill()
+            proc.wait()
+
+        assert limiter.holders() == []
+        assert limiter.try_acquire("me") is not None
+
+    def test_zero_slots_disables(self, tmp_path):
+        """slots=0 turns the limiter off."""
+        limiter = HostSlotLimiter(0, tmp_path)
+        assert not limiter.enabled
+        assert limiter.try_acquire("x") is not None
+
+
+@pytest.mark.asyncio
+async def test_managers_share_host_slots(fake_hercules, tmp_path):
+    """Separate managers never exceed the host-wide slot count."""
+    with open(fake_hercules, "a") as fh:
+        fh.write("sleep 0.3\n")
+
+    def make_manager():
+        return HerculesManager(
+            hercules_path=fake_hercules,
+            artifact_store=ArtifactStore(tmp_path / "artifacts"),
+            host_limiter=HostSlotLimiter(1, tmp_path / "slots", poll_interval=0.02),
+        )
+
+    managers = [make_manager(), make_manager()]
+    cases = [
+        m.create_test_case(name="Slot Test", description="Needs a slot",
+                           steps=["Step 1"], expected_outcome="Works")
+        for m in managers
+    ]
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *(m.run_test(c.id) for m, c in zip(managers, cases))
+    )
+
+    assert all(r.status == "passed" for r in results)
+    assert time.monotonic() - start >= 0.6
@@ -0,0 +1,181 @@
+"""Tests for orphan reaping after a server crash."""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+from src.artifacts import ArtifactStore
+from src.hercules_manager import HerculesManager
+from src.inflight import InFlightJournal
+from src.processes import group_members, pid_alive, process_start_ticks
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="needs /proc"
+)
+
+# A "server" that starts a run (a shell with a child, in its own session
+# like a Hercules run), journals it and dies without cleaning up
+CRASHING_SERVER = textwrap.dedent("""\
+    import os, subprocess, sys
+    from src.inflight import InFlightJournal
+
+    journal = InFlightJournal(sys.argv[1])
+    proc = subprocess.Popen(
+        ["sh", "-c", "sleep 60 & sleep 60"],
+        start_new_session=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    journal.add("run-1", proc.pid, {"test-1": "Checkout"})
+    print(proc.pid, flush=True)
+    os._exit(1)
+""")
+
+
+def _alive(pid):
+    stat = Path(f"/proc/{pid}/stat")
+    try:
+        return stat.read_text().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+def _crash_a_server(inflight_dir):
+    out = subprocess.run(
+        [sys.executable, "-c", CRASHING_SERVER, str(inflight_dir)],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=30,
+    )
+    pgid = int(out.stdout.strip())
+    # The shell and its sleeps (some shells exec the last command)
+    assert _wait_for(lambda: len(group_members(pgid, None)) >= 2)
+    return pgid, len(group_members(pgid, None))
+
+
+def test_pid_alive():
+    """Test liveness checks, including pids that can't exist."""
+    assert pid_alive(os.getpid())
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    assert not pid_alive(proc.pid)
+    assert not pid_alive(2 ** 40)
+
+
+class TestRecovery:
+    """Test what a manager does with runs a dead server left behind."""
+
+    def test_orphans_killed_and_results_failed(self, isolated_state_dir):
+        """Test the orphaned group dies and its test gets an error result."""
+        inflight_dir = isolated_state_dir / "inflight"
+        pgid, members = _crash_a_server(inflight_dir)
+
+        # Neither importing the server nor building a manager reaps anything
+        subprocess.run(
+            [sys.executable, "-c", "import src.main"], cwd=REPO_ROOT, check=True, timeout=60,
+        )
+        manager = HerculesManager()
+        assert len(group_members(pgid, None)) == members
+        manager.recover()
+
+        assert _wait_for(lambda: group_members(pgid, None) == [])
+        result = manager.get_test_result("test-1")
+        assert result.status == "error"
+        assert result.run_id == "run-1"
+        assert f"{members} orphaned process(es) killed" in result.error_message
+        assert list(inflight_dir.iterdir()) == []
+
+        # Only reported once
+        HerculesManager().recover()
+        assert len(list(manager._result_journal.iter_records())) == 1
+
+    def test_live_owner_left_alone(self, isolated_state_dir, tmp_path):
+        """Test runs of a server that is still up aren't touched."""
+        owner = subprocess.Popen(["sleep", "60"])
+        run = subprocess.Popen(["sleep", "60"], start_new_session=True)
+        try:
+            entry = {
+                "run_id": "run-2", "pid": run.pid, "pgid": run.pid,
+                "start_ticks": process_start_ticks(run.pid),
+                "boot_id": InFlightJournal(tmp_path / "scratch")._boot_id,
+                "owner_pid": owner.pid,
+                "owner_start_ticks": process_start_ticks(owner.pid),
+                "test_names": {"test-2": "Search"},
+                "started_at": "2026-01-01T00:00:00",
+            }
+            inflight_dir = isolated_state_dir / "inflight"
+            inflight_dir.mkdir(parents=True)
+            (inflight_dir / "run-2.json").write_text(json.dumps(entry))
+
+            HerculesManager().recover()
+            assert _alive(run.pid)
+            assert (inflight_dir / "run-2.json").exists()
+
+            owner.kill()
+            owner.wait()
+            manager = HerculesManager()
+            manager.recover()
+            run.wait(timeout=5)
+            assert run.returncode == -signal.SIGKILL
+            assert manager.get_test_result("test-2").status == "error"
+        finally:
+            for proc in (owner, run):
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+
+    def test_reused_group_id_spared(self, tmp_path):
+        """Test a process older than the recorded run is never killed."""
+        bystander = subprocess.Popen(["sleep", "60"], start_new_session=True)
+        try:
+            journal = InFlightJournal(tmp_path / "inflight")
+            journal.add("run-3", bystander.pid, {"t": "T"})
+            path = tmp_path / "inflight" / "run-3.json"
+            entry = json.loads(path.read_text())
+            # As if the dead server's run had started later, and this is
+            # an unrelated process that happens to have the same group id
+            entry.update(owner_pid=2 ** 22 + 1, start_ticks=entry["start_ticks"] + 10_000)
+            path.write_text(json.dumps(entry))
+
+            (recovered,) = journal.recover()
+
+            assert recovered["reaped"] == 0
+            assert _alive(bystander.pid)
+        finally:
+            bystander.kill()
+            bystander.wait()
+
+
+@pytest.mark.asyncio
+async def test_run_journaled_while_in_flight(fake_hercules, tmp_path, isolated_state_dir):
+    """Test a run is journaled while it runs and forgotten once reaped."""
+    seen = tmp_path / "seen"
+    with open(fake_hercules, "w") as fh:
+        fh.write(f'#!/bin/sh\nls "$HERCULES_STATE_DIR/inflight" > {seen}\necho ok\n')
+    manager = HerculesManager(
+        hercules_path=fake_hercules,
+        artifact_store=ArtifactStore(tmp_path / "artifacts"),
+    )
+    case = manager.create_test_case(
+        name="Tracked", description="", steps=["Step"], expected_outcome="Done",
+    )
+
+    result = await manager.run_test(case.id)
+
+    assert result.status == "passed"
+    assert seen.read_text().split() == [f"{result.run_id}.json"]
+    assert os.listdir(isolated_state_dir / "inflight") == []
@@ -0,0 +1,127 @@
+"""Tests for parametrized test cases."""
+
+import json
+import stat
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from src.hercules_manager import HerculesManager
+from src.host_limiter import HostSlotLimiter
+from src.parameters import placeholders, substitute
+
+ROWS = [
+    {"user": "alice", "plan": "free"},
+    {"user": "bob", "plan": "pro"},
+    {"user": "carol", "plan": "bad"},
+]
+
+
+SIGNUP = dict(
+    name="Signup",
+    description="Data-driven signup",
+    steps=["Sign up as {{user}}", "Choose the {{ plan }} plan"],
+    expected_outcome="{{user}} is on {{plan}}",
+)
+
+
+def test_placeholders():
+    """Test placeholder discovery and substitution."""
+    assert placeholders(["a {{x}} {{ y }}", "{{x}}"]) == {"x", "y"}
+    assert substitute("Hi {{ name }} {{other}}", {"name": "Ann"}) == "Hi Ann {{other}}"
+
+
+class TestParametrizedCases:
+    """Test creation and simulated fan-out."""
+
+    def setup_method(self):
+        self.manager = HerculesManager()
+
+    def test_missing_parameter_rejected(self, create_case):
+        """Test every set must define every placeholder."""
+        with pytest.raises(ValueError, match="Parameter set 1 is missing plan"):
+            create_case(
+                self.manager, **SIGNUP,
+                parameters=[{"user": "a", "plan": "x"}, {"user": "b"}],
+            )
+
+    def test_one_file_for_all_rows(self, create_case):
+        """Test the template is generated once with placeholders intact."""
+        case = create_case(self.manager, **SIGNUP, parameters=ROWS)
+        self.manager.flush_test_files()
+
+        source = open(case.file_path).read()
+        assert source.count('execute_step(_p("Sign up as {{user}}"))') == 1
+        compile(source, case.file_path, "exec")
+
+    @pytest.mark.asyncio
+    async def test_simulated_instances_grouped_under_parent(self, create_case):
+        """Test each row runs and reports under the parent result."""
+        case = create_case(self.manager, **SIGNUP, parameters=ROWS)
+
+        result = await self.manager.run_test(case.id)
+
+        assert result.status == "passed"
+        assert [i.parameters for i in result.instances] == ROWS
+        assert "Step 1: Sign up as bob" in result.instances[1].logs
+        assert result.instances[2].test_name == "Signup [user=carol, plan=bad]"
+        assert self.manager.get_test_result(case.id) is result
+
+
+FAKE_HERCULES = '''\
+#!/bin/sh
+sleep 0.3
+case "$HERCULES_PARAMS" in
+    *bad*) echo "plan rejected" >&2; exit 1 ;;
+esac
+echo "ran with $HERCULES_PARAMS"
+'''
+
+
+@pytest.mark.asyncio
+async def test_real_instances_run_concurrently(make_manager, create_case, tmp_path):
+    """Test rows fan out concurrently and failures roll up to the parent."""
+    script = tmp_path / "hercules"
+    script.write_text(FAKE_HERCULES)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    manager = make_manager(str(script), host_limiter=HostSlotLimiter(slots=3))
+    case = create_case(manager, **SIGNUP, parameters=ROWS)
+
+    started = time.monotonic()
+    result = await manager.run_test(case.id)
+
+    assert time.monotonic() - started < 0.85  # three 0.3s runs, not in sequence
+    assert [i.status for i in result.instances] == ["passed", "passed", "failed"]
+    assert result.status == "failed"
+    assert "1 of 3" in result.error_message and "plan=bad" in result.error_message
+    assert json.dumps(ROWS[0]) in result.instances[0].logs[0]
+
+
+def test_generated_file_fills_in_parameters(make_manager, create_case, tmp_path):
+    """Test the generated file substitutes its parameter set when run."""
+    pkg = tmp_path / "pkg"
+    pkg.mkdir()
+    (pkg / "hercules.py").write_text(textwrap.dedent('''\
+        class HerculesTest:
+            def log(self, msg): print(msg)
+            def execute_step(self, step): print("EXEC", step)
+            def verify_outcome(self, outcome): print("VERIFY", outcome)
+            def setup(self): pass
+            def teardown(self): pass
+            def run(self):
+                self.setup(); self.execute(); self.teardown()
+    '''))
+    manager = make_manager()
+    case = create_case(manager, **SIGNUP, parameters=ROWS)
+    manager.flush_test_files()
+
+    out = subprocess.run(
+        [sys.executable, case.file_path], capture_output=True, text=True, check=True,
+        env={"PYTHONPATH": str(pkg), "HERCULES_PARAMS": json.dumps(ROWS[1])},
+    ).stdout
+
+    assert "EXEC Sign up as bob" in out
+    assert "VERIFY bob is on pro" in out
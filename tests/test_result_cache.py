@@ -0,0 +1,93 @@
+"""Tests for the skip-if-unchanged result cache."""
+
+import os
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_rerun_hits_cache(make_manager, create_case, fake_hercules):
+    """Second opt-in run returns the stored pass marked as cached."""
+    manager = make_manager(fake_hercules)
+    test_case = create_case(manager, "Cached Test")
+
+    first = await manager.run_test(test_case.id, use_cache=True)
+    second = await manager.run_test(test_case.id, use_cache=True)
+
+    assert first.status == "passed" and not first.cached
+    assert second.cached
+    assert second.status == "passed"
+    assert second.logs == first.logs
+    assert manager.result_cache_stats()["hits"] == 1
+
+    # Journaled as a run of its own, not a copy of the first one
+    assert second.run_id != first.run_id
+    assert second.started_at >= first.completed_at
+    assert second.execution_time == 0.0
+    records = list(manager._result_journal.iter_records())
+    assert [r["run_id"] for r in records] == [first.run_id, second.run_id]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_opt_in(make_manager, create_case, fake_hercules):
+    """Without use_cache every call is a fresh run."""
+    manager = make_manager(fake_hercules)
+    test_case = create_case(manager, "Cached Test")
+
+    await manager.run_test(test_case.id, use_cache=True)
+    result = await manager.run_test(test_case.id)
+
+    assert not result.cached
+
+
+@pytest.mark.asyncio
+async def test_key_changes_miss(make_manager, create_case, fake_hercules):
+    """Env fingerprint, test file or binary changes all force a rerun."""
+    manager = make_manager(fake_hercules)
+    test_case = create_case(manager, "Cached Test")
+    await manager.run_test(test_case.id, use_cache=True, env_fingerprint="sha-1")
+
+    other_env = await manager.run_test(test_case.id, use_cache=True, env_fingerprint="sha-2")
+    assert not other_env.cached
+
+    with open(test_case.file_path, "a") as fh:
+        fh.write("\n# edited\n")
+    edited = await manager.run_test(test_case.id, use_cache=True, env_fingerprint="sha-2")
+    assert not edited.cached
+
+    stat = os.stat(fake_hercules)
+    os.utime(fake_hercules, (stat.st_atime, stat.st_mtime + 10))
+    new_binary = await manager.run_test(test_case.id, use_cache=True, env_fingerprint="sha-2")
+    assert not new_binary.cached
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(make_manager, create_case, fake_hercules):
+    """Only passes are reusable."""
+    manager = make_manager(fake_hercules)
+    with open(fake_hercules, "w") as fh:
+        fh.write("#!/bin/sh\necho boom >&2\nexit 1\n")
+    test_case = create_case(manager, "Cached Test")
+
+    await manager.run_test(test_case.id, use_cache=True)
+    result = await manager.run_test(test_case.id, use_cache=True)
+
+    assert result.status == "failed"
+    assert not result.cached
+
+
+@pytest.mark.asyncio
+async def test_invalidation(make_manager, create_case, fake_hercules):
+    """Explicit invalidation drops entries per test or globally."""
+    manager = make_manager(fake_hercules)
+    test1 = create_case(manager, "Cached Test")
+    test2 = create_case(manager, "Cached Test")
+    await manager.run_test(test1.id, use_cache=True)
+    await manager.run_test(test2.id, use_cache=True)
+
+    assert manager.invalidate_result_cache(test1.id) == 1
+    assert not (await manager.run_test(test1.id, use_cache=True)).cached
+    assert (await manager.run_test(test2.id, use_cache=True)).cached
+
+    assert manager.invalidate_result_cache() == 2
+    assert not (await manager.run_test(test2.id, use_cache=True)).cached
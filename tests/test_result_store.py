@@ -0,0 +1,140 @@
+"""Tests for the hot/cold tiered result store."""
+
+from datetime import datetime
+
+import pytest
+
+from src.hercules_manager import HerculesManager
+from src.models import MCPTestResult
+from src.result_store import TieredResultStore
+
+
+def _result(test_id, status="passed", logs=None):
+    finished = status in ("passed", "failed", "error")
+    return MCPTestResult(
+        test_id=test_id,
+        test_name=f"Test {test_id}",
+        status=status,
+        logs=logs or [f"log line for {test_id}"],
+        started_at=datetime.now(),
+        completed_at=datetime.now() if finished else None,
+    )
+
+
+class TestTieredResultStore:
+    """Test tiering, transparent reads and mapping behaviour."""
+
+    def setup_method(self):
+        self.stores = []
+
+    def teardown_method(self):
+        for store in self.stores:
+            store.close()
+
+    def _store(self, tmp_path, **kwargs):
+        store = TieredResultStore(tmp_path / "cold", **kwargs)
+        self.stores.append(store)
+        return store
+
+    def test_settled_results_move_to_cold_tier(self, tmp_path):
+        """Test expired results are compressed out and read back intact."""
+        store = self._store(tmp_path, hot_ttl=0)
+        original = _result("a", logs=["x" * 200] * 50)
+        store["a"] = original
+        store["b"] = _result("b")
+
+        stats = store.stats()
+        assert stats["cold"] == 2 and stats["hot"] == 0
+        assert stats["cold_bytes"] < 1000  # 10 KB of logs compress well
+
+        loaded = store["a"]
+        assert loaded is not original
+        assert loaded.logs == original.logs
+        assert loaded.completed_at == original.completed_at
+
+        # Repeat reads hit the read cache, not the disk
+        assert store["a"] is loaded
+        assert store.stats()["cold_reads"] == 1
+        assert store.stats()["cache_hits"] == 1
+
+    def test_running_results_stay_hot(self, tmp_path):
+        """Test results still being mutated are never demoted."""
+        store = self._store(tmp_path, hot_ttl=0, hot_max=1)
+        running = _result("a", status="running")
+        store["a"] = running
+        store["b"] = _result("b", status="queued")
+
+        assert store.stats()["cold"] == 0
+        assert store["a"] is running
+
+        running.status = "passed"
+        running.completed_at = datetime.now()
+        store.demote()
+        assert store.stats()["cold"] == 1
+
+    def test_hot_max_bounds_memory(self, tmp_path):
+        """Test the oldest settled results are demoted past hot_max."""
+        store = self._store(tmp_path, hot_ttl=3600, hot_max=3)
+        for i in range(10):
+            store[f"t{i}"] = _result(f"t{i}")
+
+        stats = store.stats()
+        assert stats["hot"] == 3
+        assert stats["cold"] == 7
+        assert store["t0"].test_id == "t0"
+
+    def test_mapping_behaviour(self, tmp_path):
+        """Test len/iter/contains/delete span both tiers."""
+        store = self._store(tmp_path, hot_ttl=3600, hot_max=1)
+        store["a"] = _result("a")
+        store["b"] = _result("b")
+
+        assert len(store) == 2
+        assert set(store) == {"a", "b"}
+        assert "a" in store and "zzz" not in store
+        assert store.get("zzz") is None
+
+        # Overwriting a cold entry brings the new value in hot
+        replacement = _result("a", status="failed")
+        store["a"] = replacement
+        assert store["a"] is replacement
+        assert len(store) == 2
+
+        del store["a"]
+        del store["b"]
+        assert len(store) == 0
+        with pytest.raises(KeyError):
+            del store["a"]
+
+    def test_dead_instance_files_removed(self, tmp_path):
+        """Test cold files of exited processes are cleaned up."""
+        cold_dir = tmp_path / "cold"
+        cold_dir.mkdir()
+        stale = cold_dir / "999999999-deadbeef.db"
+        stale.write_bytes(b"")
+
+        store = self._store(tmp_path)
+
+        assert not stale.exists()
+        store.close()
+        assert not store.path.exists()
+
+
+@pytest.mark.asyncio
+async def test_manager_reads_cold_results(monkeypatch):
+    """Test get_test_result transparently decodes demoted results."""
+    monkeypatch.setenv("HERCULES_RESULTS_HOT_TTL", "0")
+    manager = HerculesManager()
+    cases = [
+        manager.create_test_case(name=f"Cold {i}", description="d",
+                                 steps=["Step 1"], expected_outcome="ok")
+        for i in range(2)
+    ]
+    first = await manager.run_test(cases[0].id)
+    await manager.run_test(cases[1].id)
+
+    assert manager._test_results.stats()["cold"] >= 1
+    loaded = manager.get_test_result(cases[0].id)
+    assert loaded.run_id == first.run_id
+    assert loaded.logs == first.logs
+    assert len(manager.list_test_results()) == 2
@@ -0,0 +1,107 @@
+"""Tests for per-run resource accounting."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.rusage import WRAPPER_PATH, UsageAggregator, available
+
+pytestmark = pytest.mark.skipif(not available(), reason="needs os.wait4")
+
+
+def _wrap(tmp_path, *cmd):
+    usage_file = tmp_path / "usage.json"
+    proc = subprocess.run([sys.executable, WRAPPER_PATH, str(usage_file), *cmd])
+    return proc.returncode, usage_file
+
+
+class TestWrapper:
+    """Test the reaping wrapper script."""
+
+    def test_records_usage_and_exit_code(self, tmp_path):
+        """Test the child's rusage is written and its exit code passed on."""
+        code, usage_file = _wrap(
+            tmp_path, sys.executable, "-c",
+            "import sys; sum(range(2_000_000)); sys.exit(3)",
+        )
+
+        assert code == 3
+        usage = json.loads(usage_file.read_text())
+        assert usage["user_cpu"] + usage["system_cpu"] > 0
+        assert usage["max_rss_kb"] > 1000  # a python interpreter, in KiB
+
+    def test_counts_grandchildren(self, tmp_path):
+        """Test descendants reaped by the child are included."""
+        code, usage_file = _wrap(
+            tmp_path, "sh", "-c",
+            f"{sys.executable} -c 'x = bytearray(64 * 1024 * 1024)'",
+        )
+
+        assert code == 0
+        assert json.loads(usage_file.read_text())["max_rss_kb"] > 64 * 1024
+
+    def test_propagates_signals(self, tmp_path):
+        """Test a child killed by a signal looks the same to the caller."""
+        code, usage_file = _wrap(tmp_path, "sh", "-c", "kill -TERM $$")
+
+        assert code == -15
+        assert usage_file.exists()
+
+
+class TestManagerUsage:
+    """Test usage recorded on results and aggregated per test."""
+
+    def setup_method(self):
+        self.test_steps = ["Open page"]
+
+    @pytest.mark.asyncio
+    async def test_usage_recorded_and_aggregated(self, make_manager, create_case, fake_hercules):
+        """Test each run has usage and the per-test summary covers all runs."""
+        manager = make_manager(fake_hercules)
+        case = create_case(manager, "Usage", steps=self.test_steps)
+
+        first = await manager.run_test(case.id)
+        assert first.status == "passed"
+        assert first.resource_usage.max_rss_kb > 0
+
+        # Cached hits didn't use anything and aren't counted
+        await manager.run_test(case.id, use_cache=True)
+        assert (await manager.run_test(case.id, use_cache=True)).cached
+
+        summary = manager.get_resource_usage(case.id)[case.id]
+        assert summary["runs"] == 2
+        assert summary["peak_max_rss_kb"] >= first.resource_usage.max_rss_kb
+
+        # History survives a restart via the result journal
+        manager._result_journal.close()
+        restarted = make_manager(fake_hercules)
+        assert restarted.get_resource_usage()[case.id]["runs"] == 2
+
+    @pytest.mark.asyncio
+    async def test_simulated_runs_have_no_usage(self, make_manager, create_case):
+        """Test simulated runs don't pretend to have usage."""
+        manager = make_manager("/nonexistent/hercules")
+        case = create_case(manager, "Sim", steps=self.test_steps)
+
+        result = await manager.run_test(case.id)
+
+        assert result.resource_usage is None
+        assert manager.get_resource_usage(case.id) == {case.id: None}
+
+
+def test_aggregator_means():
+    """Test summaries average over runs and keep the peak RSS."""
+    stats = UsageAggregator()
+    stats.add("t", {"user_cpu": 1.0, "system_cpu": 0.5, "max_rss_kb": 100,
+                    "voluntary_ctx_switches": 10, "involuntary_ctx_switches": 2})
+    stats.add("t", {"user_cpu": 2.0, "system_cpu": 0.5, "max_rss_kb": 300,
+                    "voluntary_ctx_switches": 20, "involuntary_ctx_switches": 4})
+
+    summary = stats.summary("t")
+    assert summary["runs"] == 2
+    assert summary["mean_cpu"] == 2.0
+    assert summary["peak_max_rss_kb"] == 300
+    assert summary["mean_max_rss_kb"] == 200
+    assert summary["mean_voluntary_ctx_switches"] == 15
@@ -0,0 +1,75 @@
+"""Tests for test case search."""
+
+from src.hercules_manager import HerculesManager
+from src.search import SearchIndex
+
+
+class TestSearchIndex:
+    """Test the inverted index on its own."""
+
+    def test_ranking_prefers_name_matches(self):
+        """A hit in the name outranks the same word in a step."""
+        index = SearchIndex()
+        index.add("a", {"name": "Checkout flow", "steps": ["Open cart"]})
+        index.add("b", {"name": "Cart page", "steps": ["Go to checkout"]})
+
+        hits = index.search("checkout")
+
+        assert [doc_id for doc_id, _ in hits] == ["a", "b"]
+        assert hits[0][1] > hits[1][1]
+
+    def test_remove_and_reindex(self):
+        """Removing or re-adding a document updates postings in place."""
+        index = SearchIndex()
+        index.add("a", {"name": "Login"})
+        index.add("a", {"name": "Logout"})
+
+        assert index.search("login") == []
+        assert index.search("logout")[0][0] == "a"
+
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert len(index) == 0
+        assert index.search("logout") == []
+
+    def test_limit_and_empty_query(self):
+        """Limit caps the results; queries without tokens match nothing."""
+        index = SearchIndex()
+        for i in range(20):
+            index.add(str(i), {"name": f"search test {i}"})
+
+        assert len(index.search("search", limit=5)) == 5
+        assert index.search("   ") == []
+
+
+class TestManagerSearch:
+    """Test search through the manager."""
+
+    def setup_method(self):
+        self.manager = HerculesManager()
+
+    def test_search_test_cases(self):
+        """Created cases are searchable across all text fields."""
+        login = self.manager.create_test_case(
+            name="Login Test", description="Test login",
+            steps=["Enter password"], expected_outcome="Dashboard shown",
+        )
+        search = self.manager.create_test_case(
+            name="Search Products", description="Product search",
+            steps=["Type laptop"], expected_outcome="Results shown",
+        )
+
+        assert self.manager.search_test_cases("password") == [login]
+        assert self.manager.search_test_cases("laptop") == [search]
+        assert len(self.manager.search_test_cases("shown")) == 2
+
+    def test_deleted_cases_drop_out_of_search(self):
+        """Deleting a case removes it from the index too."""
+        test_case = self.manager.create_test_case(
+            name="Temporary", description="Goes away",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+
+        assert self.manager.delete_test_case(test_case.id)
+        assert self.manager.search_test_cases("temporary") == []
+        assert not self.manager.delete_test_case(test_case.id)
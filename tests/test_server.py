@@ -140,6 +140,34 @@ def test_mcp_server_import():
         pytest.skip("FastMCP not available")
 
 
+def test_run_as_module_loads_server_once():
+    """`python -m src.main` runs the one copy of the module, with one manager."""
+    import os
+    import subprocess
+
+    code = (
+        "import gc, runpy, sys\n"
+        "import src\n"
+        "assert 'src.main' not in sys.modules, 'src imported src.main eagerly'\n"
+        "sys.argv = ['src.main']\n"
+        "try:\n"
+        "    runpy.run_module('src.main', run_name='__main__', alter_sys=True)\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "from src.hercules_manager import HerculesManager\n"
+        "print(sum(isinstance(o, HerculesManager) for o in gc.get_objects()))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-W", "error::RuntimeWarning", "-c", code],
+        cwd=repo_root, env=dict(os.environ, CI="true"),
+        capture_output=True, text=True, timeout=60,
+    )
+
+    assert out.returncode == 0, out.stderr
+    assert "found in sys.modules" not in out.stderr
+    assert out.stdout.strip() == "1"
+
+
 def test_manager_direct_usage():
     """Test using the manager directly."""
     manager = HerculesManager()
@@ -153,4 +181,43 @@ def test_manager_direct_usage():
     )
     
     assert test.name == "Direct Test"
-    assert len(manager.list_test_cases()) == 1
\ No newline at end of file
+    assert len(manager.list_test_cases()) == 1
+
+def test_manager_thread_safety():
+    """Concurrent creates/deletes from a thread pool keep state consistent."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    manager = HerculesManager()
+
+    def create(i):
+        return manager.create_test_case(
+            name=f"Threaded {i}", description="Created from a worker thread",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        cases = list(pool.map(create, range(50)))
+        deleted = list(pool.map(manager.delete_test_case, [c.id for c in cases[:20]]))
+
+    assert all(deleted)
+    assert len(manager.list_test_cases()) == 30
+    assert len(manager.search_test_cases("threaded", limit=100)) == 30
+
+
+def test_http_transport_options():
+    """Network transport settings are passed through to the server."""
+    import src.main
+
+    args = src.main._parse_args([
+        "--transport", "http", "--port", "9000",
+        "--max-connections", "16", "--keep-alive", "10",
+    ])
+    kwargs = src.main._transport_kwargs(args)
+
+    assert kwargs["transport"] == "http"
+    assert kwargs["port"] == 9000
+    assert kwargs["uvicorn_config"]["limit_concurrency"] == 16
+    assert kwargs["uvicorn_config"]["timeout_keep_alive"] == 10
+
+    # stdio keeps FastMCP's defaults
+    assert src.main._transport_kwargs(src.main._parse_args([])) == {}
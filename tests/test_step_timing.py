@@ -0,0 +1,168 @@
+"""Tests for step-level timings."""
+
+import pytest
+
+from src.models import MCPTestResult
+from src.step_timing import StepLatencyStats, StepTimer
+
+# Takes ~0.2s on step 1 and ~0.05s on step 2, logging like a generated file
+SLOW_FIRST_STEP = """#!/bin/sh
+echo "Setting up test environment"
+echo "Step 1: Open the dashboard"
+sleep 0.2
+echo "Step 2: Click export"
+sleep 0.05
+echo "Verifying expected outcome"
+sleep 0.3
+echo done
+"""
+
+
+EXPORT_STEPS = ["Open the dashboard", "Click export"]
+
+
+class TestStepTimer:
+    """Test the marker parser."""
+
+    def test_steps_end_at_next_marker(self):
+        """Test each step runs from its marker to the next, verify, or finish."""
+        result = MCPTestResult(test_id="t", test_name="T")
+        timer = StepTimer(result.step_timings)
+        timer.feed("Setting up test environment", 100.0)
+        timer.feed("INFO Step 1: Log in", 101.0)
+        timer.feed("some step output", 101.5)
+        timer.feed("Step 2: Open cart", 103.0)
+        timer.feed("Verifying expected outcome", 103.25)
+        timer.feed("Cleaning up", 104.0)
+        timer.finish(105.0)
+
+        assert [(t.index, t.description, t.duration) for t in result.step_timings] == [
+            (1, "Log in", 2.0), (2, "Open cart", 0.25),
+        ]
+        assert result.step_timings[0].started_at.timestamp() == 101.0
+
+    def test_unfinished_step_closed_by_finish(self):
+        """Test a run that dies mid-step still times that step."""
+        timings = []
+        timer = StepTimer(timings)
+        timer.feed("Step 1: Hang", 10.0)
+        assert timings[0].completed_at is None
+        timer.finish(12.5)
+        assert timings[0].duration == 2.5
+
+
+class TestStepLatencyStats:
+    """Test aggregation over recent runs."""
+
+    def _record(self, test_id, *durations, **extra):
+        return {
+            "test_id": test_id,
+            "step_timings": [
+                {"index": i, "description": f"step {i}", "duration": d}
+                for i, d in enumerate(durations, 1)
+            ],
+            **extra,
+        }
+
+    def test_summary_and_slowest(self):
+        """Test per-step stats and the cross-test ranking."""
+        stats = StepLatencyStats(window=3)
+        stats.add_records([
+            self._record("a", 9.0, 1.0),  # falls out of the window
+            self._record("a", 1.0, 2.0),
+            self._record("a", 3.0, 2.0),
+            self._record("a", 2.0, 2.0),
+            self._record("b", 0.5),
+            self._record("b", 100.0, cached=True),
+            {"test_id": "c", "instances": [self._record("c", 4.0)]},
+        ])
+
+        first, second = stats.summary("a")
+        assert (first["index"], first["runs"], first["mean"], first["max"]) == (1, 3, 2.0, 3.0)
+        assert first["p50"] == 2.0 and first["last"] == 2.0
+        assert second["mean"] == 2.0
+
+        slowest = stats.slowest(2)
+        assert [(s["test_id"], s["index"]) for s in slowest] == [("c", 1), ("a", 1)]
+        assert [s["test_id"] for s in stats.slowest(test_ids=["b"])] == ["b"]
+        assert stats.summary("missing") == []
+
+
+class TestManagerStepTimings:
+    """Test timings recorded by real and simulated runs."""
+
+    @pytest.mark.asyncio
+    async def test_simulated_run(self, make_manager, create_case):
+        """Test simulated steps are timed and queryable."""
+        manager = make_manager()
+        case = create_case(manager, "Export", steps=EXPORT_STEPS)
+
+        await manager.run_test(case.id)
+        await manager.run_test(case.id)
+
+        timings = manager.get_step_timings(case.id)
+        steps = timings["latest_run"]["steps"]
+        assert [s["index"] for s in steps] == [1, 2]
+        assert all(0.05 < s["duration"] < 1.0 for s in steps)
+        assert [s["runs"] for s in timings["recent_runs"]] == [2, 2]
+        assert len(manager.get_slowest_steps(limit=1)) == 1
+
+    @pytest.mark.asyncio
+    async def test_real_run_streams_markers(self, make_manager, create_case, fake_hercules):
+        """Test timings come from when each marker arrived, not from the end."""
+        with open(fake_hercules, "w") as fh:
+            fh.write(SLOW_FIRST_STEP)
+        manager = make_manager(fake_hercules)
+        case = create_case(manager, "Export", steps=EXPORT_STEPS)
+
+        result = await manager.run_test(case.id)
+
+        assert result.status == "passed"
+        first, second = result.step_timings
+        assert 0.15 < first.duration < 0.6
+        assert 0.02 < second.duration < 0.25  # ends at "Verifying", not at exit
+        assert "Step 2: Click export" in result.logs
+
+        slowest = manager.get_slowest_steps()
+        assert (slowest[0]["test_id"], slowest[0]["description"]) == (case.id, "Open the dashboard")
+
+    @pytest.mark.asyncio
+    async def test_overlong_line_truncated(self, make_manager, create_case, fake_hercules):
+        """Test a line over the stream limit is cut, and the run carries on."""
+        with open(fake_hercules, "w") as fh:
+            fh.write(
+                "#!/bin/sh\n"
+                "echo 'Step 1: Dump the DOM'\n"
+                "head -c 3000000 /dev/zero | tr '\\0' x\n"
+                "echo\n"
+                "echo 'Step 2: Carry on'\n"
+                "echo done\n"
+            )
+        manager = make_manager(fake_hercules)
+        case = create_case(manager, "Export", steps=EXPORT_STEPS)
+
+        result = await manager.run_test(case.id)
+
+        assert result.status == "passed"
+        dump = result.logs[1]
+        assert dump.endswith("[line truncated]") and len(dump) < 1_100_000
+        assert result.logs[2:] == ["Step 2: Carry on", "done"]
+        assert [t.index for t in result.step_timings] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_history_reloaded_from_journal(self, make_manager, create_case):
+        """Test recent-run stats survive a restart."""
+        manager = make_manager()
+        case = create_case(manager, "Export", steps=["Only step"])
+        await manager.run_test(case.id)
+
+        restarted = make_manager()
+        assert [s["runs"] for s in restarted.get_slowest_steps()] == [1]
+
+    def test_unknown_test(self, make_manager):
+        """Test unknown ids and suites are rejected."""
+        manager = make_manager()
+        with pytest.raises(ValueError, match="not found"):
+            manager.get_step_timings("nope")
+        with pytest.raises(ValueError, match="not found"):
+            manager.get_slowest_steps(suite_run_id="nope")
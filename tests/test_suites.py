@@ -0,0 +1,184 @@
+"""Tests for suite runs, rerun-failed and checkpoint/resume."""
+
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from src.models import SuiteRun
+from src.processes import process_start_ticks
+from src.suites import SuiteCheckpointStore
+
+
+def _calls(hercules):
+    return hercules[1].read_text().splitlines()
+
+
+async def _interrupt(manager, hercules, test_ids):
+    """Start a suite and cancel it once every test has been launched."""
+    task = asyncio.create_task(manager.run_suite(test_ids))
+    for _ in range(100):
+        await asyncio.sleep(0.05)
+        if len(_calls(hercules)) == len(test_ids):
+            break
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_run_suite_records_outcomes(make_manager, create_case, isolated_state_dir):
+    """A simulated suite completes with every outcome checkpointed."""
+    manager = make_manager()
+    tests = [create_case(manager, f"Test {i}") for i in range(3)]
+
+    suite = await manager.run_suite([t.id for t in tests], max_parallel=2)
+
+    assert suite.status == "completed"
+    assert suite.outcomes == {t.id: "passed" for t in tests}
+    assert manager.get_suite_run(suite.id) is suite
+    assert (isolated_state_dir / "suites" / f"{suite.id}.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_run_suite_missing_test(make_manager):
+    """Unknown ids are rejected up front."""
+    manager = make_manager()
+    with pytest.raises(ValueError, match="not found"):
+        await manager.run_suite(["fake-id"])
+
+
+@pytest.mark.asyncio
+async def test_rerun_failed_only_reruns_failures(make_manager, create_case, failing_hercules):
+    """rerun_failed skips tests that already passed."""
+    manager = make_manager(failing_hercules[0])
+    good = create_case(manager, "Good")
+    bad = create_case(manager, "FAIL sometimes")
+
+    suite = await manager.run_suite([good.id, bad.id])
+    assert suite.outcomes == {good.id: "passed", bad.id: "failed"}
+    assert len(_calls(failing_hercules)) == 2
+
+    suite = await manager.rerun_failed(suite.id)
+
+    assert suite.attempts == 2
+    assert suite.outcomes[bad.id] == "failed"
+    assert _calls(failing_hercules)[2:] == [bad.file_path]
+
+
+@pytest.mark.asyncio
+async def test_resume_after_restart(make_manager, create_case, failing_hercules):
+    """A new manager picks up an interrupted suite and finishes it."""
+    manager = make_manager(failing_hercules[0])
+    done = create_case(manager, "Quick")
+    stuck = create_case(manager, "HANG forever")
+
+    await _interrupt(manager, failing_hercules, [done.id, stuck.id])
+
+    # While the first manager is open, another one leaves its suite alone
+    bystander = make_manager(failing_hercules[0])
+    bystander.recover()
+    assert bystander.list_suite_runs() == []
+
+    # "Restart": fresh manager, same state dir
+    with open(failing_hercules[0]) as fh:
+        script = fh.read().replace("sleep 30", "true")
+    with open(failing_hercules[0], "w") as fh:
+        fh.write(script)
+    manager.close()
+    restarted = make_manager(failing_hercules[0])
+    restarted.recover()
+
+    [suite] = restarted.list_suite_runs()
+    assert suite.status == "interrupted"
+    assert suite.outcomes[done.id] == "passed"
+    assert stuck.id in {c.id for c in restarted.list_test_cases()}
+
+    suite = await restarted.resume_suite(suite.id)
+
+    assert suite.status == "completed"
+    assert suite.outcomes[stuck.id] == "passed"
+    assert _calls(failing_hercules).count(done.file_path) == 1
+
+
+@pytest.mark.asyncio
+async def test_deleted_case_not_restored(make_manager, create_case, failing_hercules):
+    """A case deleted while its suite was unfinished stays deleted."""
+    manager = make_manager(failing_hercules[0])
+    done = create_case(manager, "Quick")
+    stuck = create_case(manager, "HANG forever")
+    await _interrupt(manager, failing_hercules, [done.id, stuck.id])
+
+    assert manager.delete_test_case(stuck.id)
+    manager.close()
+    restarted = make_manager(failing_hercules[0])
+    restarted.recover()
+
+    [suite] = restarted.list_suite_runs()
+    assert [c.id for c in restarted.list_test_cases()] == [done.id]
+    suite = await restarted.resume_suite(suite.id)
+    assert suite.outcomes[stuck.id] == "error"
+
+
+@pytest.mark.asyncio
+async def test_finished_suites_not_restored(make_manager, create_case, isolated_state_dir):
+    """Only interrupted suites come back after a restart."""
+    manager = make_manager()
+    case = create_case(manager, "Once")
+    suite = await manager.run_suite([case.id])
+    manager.delete_test_case(case.id)
+
+    restarted = make_manager()
+    restarted.recover()
+
+    assert restarted.list_suite_runs() == []
+    assert restarted.list_test_cases() == []
+    assert (isolated_state_dir / "suites" / f"{suite.id}.jsonl").exists()
+
+
+def test_live_owners_suite_left_alone(make_manager, create_case, isolated_state_dir):
+    """A suite another running server owns isn't taken over."""
+    owner = subprocess.Popen(["sleep", "60"])
+    try:
+        store = SuiteCheckpointStore(isolated_state_dir / "suites")
+        store._pid, store._pid_start = owner.pid, process_start_ticks(owner.pid)
+        manager = make_manager()
+        case = create_case(manager, "Theirs")
+        store.start(SuiteRun(test_ids=[case.id]), [case])
+
+        restarted = make_manager()
+        restarted.recover()
+        assert restarted.list_suite_runs() == []
+
+        owner.kill()
+        owner.wait()
+        restarted = make_manager()
+        restarted.recover()
+        [suite] = restarted.list_suite_runs()
+        assert suite.status == "interrupted"
+    finally:
+        if owner.poll() is None:
+            owner.kill()
+            owner.wait()
+
+
+def test_old_journals_pruned(make_manager, create_case, isolated_state_dir):
+    """Journals untouched for longer than max_age are removed on load."""
+    store = SuiteCheckpointStore(isolated_state_dir / "suites", max_age=3600)
+    manager = make_manager()
+    case = create_case(manager, "Old")
+    old, recent = SuiteRun(test_ids=[case.id]), SuiteRun(test_ids=[case.id])
+    for suite in (old, recent):
+        store.start(suite, [case])
+    old_path = isolated_state_dir / "suites" / f"{old.id}.jsonl"
+    an_hour_ago = time.time() - 3700
+    os.utime(old_path, (an_hour_ago, an_hour_ago))
+
+    store.close()
+    loaded = SuiteCheckpointStore(isolated_state_dir / "suites", max_age=3600).load_all()
+
+    assert [suite.id for suite, _ in loaded] == [recent.id]
+    assert not old_path.exists()
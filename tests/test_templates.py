@@ -0,0 +1,158 @@
+"""Tests for the test file renderer."""
+
+import ast
+
+import pytest
+
+from src.hercules_manager import HerculesManager
+from src.models import MCPTestCase
+from src.templates import Template, TemplateRenderer, class_name_for
+
+NASTY = [
+    'Type "hello" into the box',
+    "Check the path C:\\new\\table",
+    "Enter it's ''' and \"\"\" quotes",
+    "Line one\nline two\ttabbed \x00 nul",
+    "Literal {braces} and ${dollar} and {{not_a_param}}",
+]
+
+
+def _case(**overrides):
+    data = dict(
+        name='Quote "Test" \\ 1',
+        description='Has """ and \\ in it',
+        steps=NASTY,
+        expected_outcome='Says "done"',
+    )
+    data.update(overrides)
+    return MCPTestCase(**data)
+
+
+class TestRenderer:
+    """Test escaping and batch rendering."""
+
+    def setup_method(self):
+        self.renderer = TemplateRenderer(check_syntax=True)
+
+    def test_values_round_trip_through_literals(self):
+        """Test awkward step text comes out of the file unchanged."""
+        case = _case()
+        source = self.renderer.render(case)
+
+        tree = ast.parse(source)
+        strings = {n.value for n in ast.walk(tree) if isinstance(n, ast.Constant)}
+        for i, step in enumerate(NASTY, 1):
+            assert step in strings
+            assert f"Step {i}: {step}" in strings
+        assert case.name in strings
+        assert 'Says "done"' in strings
+
+    def test_parametrized_literals(self):
+        """Test placeholders survive escaping inside _p(...)."""
+        case = _case(steps=['Say "{{word}}"'], expected_outcome="{{word}}",
+                     parameters=[{"word": "hi"}])
+        source = self.renderer.render(case)
+
+        assert 'self.execute_step(_p("Say \\"{{word}}\\""))' in source
+        compile(source, "<test>", "exec")
+
+    def test_class_names_are_identifiers(self):
+        """Test any test name yields a usable class name."""
+        names = [
+            "Sample Test", "123 go", "a.b(c)", "", "class", "Ünïcode-тест",
+            "Login²", "Test ½ price", "٣ items", "\u0301accent",
+        ]
+        for name in names:
+            ident = class_name_for(name)
+            assert ident.isidentifier()
+            compile(f"class {ident}: pass", "<test>", "exec")
+        assert class_name_for("Sample Test") == "Sample_TestTest"
+        assert class_name_for("Login²") == "Login_Test"
+
+    def test_render_many_and_stats(self):
+        """Test one call renders a batch, in order, and is accounted for."""
+        cases = [_case(name=f"Case {i}") for i in range(50)]
+
+        sources = self.renderer.render_many(cases)
+
+        assert len(sources) == 50
+        assert all(f'"{c.id}"' in src for c, src in zip(cases, sources))
+        stats = self.renderer.stats()
+        assert stats["rendered"] == 50
+        assert stats["per_second"] > 0
+
+    def test_suite_is_valid_python(self):
+        """Test the suite module escapes values too."""
+        source = self.renderer.render_suite([_case(), _case()], '@@marker "x"')
+        tree = ast.parse(source)
+        assert '@@marker "x"' in {n.value for n in ast.walk(tree) if isinstance(n, ast.Constant)}
+
+    def test_check_reports_line(self):
+        """Test syntax errors are turned into ValueError with a location."""
+        with pytest.raises(ValueError, match="line 2"):
+            TemplateRenderer.check("x = 1\nx = (", "<bad>")
+
+
+def test_template_slots_parsed_once():
+    """Test values are inserted verbatim and never re-parsed."""
+    template = Template("a ${x} b ${y} c")
+    assert template.render({"x": "${y}", "y": "2"}) == "a ${y} b 2 c"
+
+
+class TestManagerIntegration:
+    """Test the manager renders through the engine."""
+
+    def setup_method(self):
+        self.manager = HerculesManager()
+
+    def test_unicode_names_can_be_created(self):
+        """Test names with non-identifier characters still render."""
+        case = self.manager.create_test_case(
+            name="Test ½ price", description="d", steps=["s"], expected_outcome="o",
+        )
+        assert case.file_path
+
+    def test_create_with_awkward_steps(self):
+        """Test quotes and backslashes no longer produce broken files."""
+        case = self.manager.create_test_case(
+            name="Awkward", description="d", steps=NASTY, expected_outcome='"ok"',
+        )
+        self.manager.flush_test_files()
+
+        compile(open(case.file_path).read(), case.file_path, "exec")
+
+    def test_create_fails_fast_on_bad_output(self, monkeypatch):
+        """Test a file that doesn't compile is rejected at create time."""
+        monkeypatch.setattr(
+            self.manager._renderer, "render_class",
+            lambda *args: "class Broken(:\n    pass",
+        )
+
+        with pytest.raises(ValueError, match="not valid Python"):
+            self.manager.create_test_case(
+                name="Broken", description="d", steps=["s"], expected_outcome="o",
+            )
+        assert self.manager.list_test_cases() == []
+
+    def test_create_test_cases_is_all_or_nothing(self):
+        """Test bulk creation validates every definition first."""
+        good = {"name": "A", "description": "d", "steps": ["s"], "expected_outcome": "o"}
+
+        created = self.manager.create_test_cases([good, {**good, "name": "B"}])
+        assert [c.name for c in created] == ["A", "B"]
+        assert all(c.file_path for c in created)
+
+        with pytest.raises(ValueError, match="Test case 1"):
+            self.manager.create_test_cases([{**good, "name": "C"}, {"name": "D"}])
+        assert len(self.manager.list_test_cases()) == 2
+
+    def test_create_test_cases_rejects_assigned_fields(self):
+        """Test ids, versions and paths can't be supplied by the caller."""
+        good = {"name": "A", "description": "d", "steps": ["s"], "expected_outcome": "o"}
+        existing = self.manager.create_test_case(**good)
+
+        for extra in ({"id": existing.id}, {"id": "../../x"}, {"version": 7}, {"file_path": "/tmp/x.py"}):
+            with pytest.raises(ValueError, match="unknown field"):
+                self.manager.create_test_cases([{**good, **extra}])
+        assert self.manager.list_test_cases() == [existing]
+        assert existing.version == 1
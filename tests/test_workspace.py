@@ -0,0 +1,160 @@
+"""Tests for the write-behind workspace and its collector."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from src.hercules_manager import HerculesManager
+from src.host_limiter import HostSlotLimiter
+from src.workspace import Workspace
+
+
+class TestWorkspace:
+    """Test write-behind and garbage collection."""
+
+    def test_writes_are_coalesced_and_flushed(self, tmp_path):
+        """Queued writes land on flush; the latest content wins."""
+        ws = Workspace(tmp_path, gc_interval=0)
+        path = ws.path_for("a.py")
+
+        ws.write(path, "first")
+        ws.write(path, "second")
+        assert ws.flush(timeout=5)
+
+        assert path.read_text() == "second"
+        ws.close()
+
+    def test_discard_removes_file(self, tmp_path):
+        """Discarding a path drops its pending write and the file."""
+        ws = Workspace(tmp_path, gc_interval=0)
+        path = ws.path_for("gone.py")
+        ws.write(path, "x")
+
+        ws.discard(path)
+        ws.flush()
+
+        assert not path.exists()
+
+    def test_collect_orphans_expired_and_budget(self, tmp_path):
+        """GC removes deleted-case files, old files, then oldest over budget."""
+        ws = Workspace(tmp_path, gc_interval=0, disk_budget_bytes=250, max_age=3600)
+        paths = {name: ws.path_for(name) for name in ("orphan", "old", "a", "b", "c")}
+        for path in paths.values():
+            ws.write(path, "x" * 100)
+        ws.flush()
+        now = time.time()
+        os.utime(paths["old"], (now - 7200, now - 7200))
+        os.utime(paths["a"], (now - 60, now - 60))
+
+        live = [str(p) for name, p in paths.items() if name != "orphan"]
+        removed = set(ws.collect(live))
+
+        assert removed == {str(paths["orphan"]), str(paths["old"]), str(paths["a"])}
+        assert paths["b"].exists() and paths["c"].exists()
+
+    def test_pinned_files_survive_collection(self, tmp_path):
+        """A pinned file is kept, however old, until its last unpin."""
+        ws = Workspace(tmp_path, gc_interval=0, max_age=3600)
+        path = ws.path_for("queued.py")
+        ws.write(path, "x")
+        ws.flush()
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+        ws.pin(path)
+        with ws.pinned(path):
+            assert ws.collect([str(path)]) == []
+        assert ws.collect([str(path)]) == []
+        ws.unpin(path)
+
+        assert ws.collect([str(path)]) == [str(path)]
+
+    def test_dead_instance_workspaces_are_swept(self, tmp_path):
+        """Directories left by exited processes are removed on startup."""
+        stale = tmp_path / "999999999-deadbeef"
+        stale.mkdir()
+        (stale / "old.py").write_text("x")
+
+        ws = Workspace(tmp_path, gc_interval=0)
+
+        assert not stale.exists()
+        assert ws.root.exists()
+        assert ws.root.name.startswith(f"{os.getpid()}-")
+
+
+class TestManagerWorkspace:
+    """Test the manager's use of its workspace."""
+
+    def setup_method(self):
+        self.manager = HerculesManager()
+
+    def test_files_live_in_instance_workspace(self):
+        """Each manager writes into its own directory."""
+        other = HerculesManager()
+        test_case = self.manager.create_test_case(
+            name="Workspace Test", description="Where does it go",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+
+        assert self.manager.flush_test_files(timeout=5)
+        assert os.path.dirname(test_case.file_path) == str(self.manager.workspace.root)
+        assert self.manager.workspace.root != other.workspace.root
+        assert "Step 1: Step 1" in open(test_case.file_path).read()
+
+    def test_delete_removes_file(self):
+        """Deleted cases don't leave files behind."""
+        test_case = self.manager.create_test_case(
+            name="Short Lived", description="Deleted soon",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+        self.manager.delete_test_case(test_case.id)
+        self.manager.flush_test_files()
+
+        assert not os.path.exists(test_case.file_path)
+
+    @pytest.mark.asyncio
+    async def test_collected_file_is_regenerated(self, fake_hercules):
+        """A live case whose file was collected is re-rendered before running."""
+        self.manager.hercules_path = fake_hercules
+        test_case = self.manager.create_test_case(
+            name="Regenerated", description="File collected",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+        self.manager.flush_test_files()
+        os.unlink(test_case.file_path)
+
+        result = await self.manager.run_test(test_case.id)
+
+        assert result.status == "passed"
+        assert "Step 1: Step 1" in result.logs
+
+    @pytest.mark.asyncio
+    async def test_queued_run_keeps_its_file(self, fake_hercules, tmp_path):
+        """A run waiting for a slot still finds its file once it gets one."""
+        manager = HerculesManager(
+            fake_hercules, host_limiter=HostSlotLimiter(slots=1),
+        )
+        test_case = manager.create_test_case(
+            name="Queued", description="Waits for a slot",
+            steps=["Step 1"], expected_outcome="Works",
+        )
+        manager.flush_test_files()
+        old = time.time() - 30 * 24 * 3600
+        os.utime(test_case.file_path, (old, old))
+
+        async with manager._execution_slot(owner="someone else"):
+            run = asyncio.create_task(manager.run_test(test_case.id))
+            while manager.get_test_result(test_case.id) is None or \
+                    manager.get_test_result(test_case.id).status != "queued":
+                await asyncio.sleep(0.01)
+            # Expired, but pinned by the queued run
+            assert manager.workspace.collect() == []
+            # Even if it goes anyway, it is re-rendered once the slot is free
+            os.unlink(test_case.file_path)
+
+        result = await run
+
+        assert result.status == "passed"
+        assert "Step 1: Step 1" in result.logs
+        assert manager.workspace._pinned == {}
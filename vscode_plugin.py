@@ -2,48 +2,145 @@
 """
 VSCode integration helper script.
 Called by VSCode tasks to interact with the MCP server.
+
+This is a thin client: the actual HerculesManager lives in a local
+daemon (src/daemon.py) that keeps test cases and results between calls.
+The daemon is started automatically the first time it's needed.  Only
+stdlib modules are imported here so each call stays fast.
 """
 
+import json
+import os
+import socket
+import subprocess
 import sys
-import asyncio
+import tempfile
+import time
 from pathlib import Path
 
-# Add src to path
 repo_root = Path(__file__).resolve().parent
-sys.path.insert(0, str(repo_root))
 
-from src.hercules_manager import HerculesManager
+STARTUP_TIMEOUT = 15.0  # seconds to wait for a freshly spawned daemon
+
+
+def socket_path():
+    # Keep in sync with src.daemon.default_socket_path
+    env_path = os.getenv("HERCULES_DAEMON_SOCKET")
+    if env_path:
+        return env_path
+    base = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"hercules-daemon-{os.getuid()}.sock")
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _spawn_daemon(path):
+    subprocess.Popen(
+        [sys.executable, "-m", "src.daemon", "--socket", path],
+        cwd=str(repo_root),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,  # outlive this call and the VSCode task
+    )
+
+
+def connect(path=None, autostart=True):
+    """Connect to the daemon, starting it if nothing is listening."""
+    path = path or socket_path()
+    try:
+        return _connect(path)
+    except OSError:
+        if not autostart:
+            raise
+    _spawn_daemon(path)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            return _connect(path)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Hercules daemon did not start on {path}")
+            time.sleep(0.05)
+
+
+def request(action, path=None, autostart=True, **args):
+    """Send one request and return its result (raises on daemon errors)."""
+    sock = connect(path, autostart=autostart)
+    try:
+        sock.sendall(json.dumps({"action": action, "args": args}).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    finally:
+        sock.close()
+    if not line:
+        raise RuntimeError("Hercules daemon closed the connection")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "unknown error"))
+    return response.get("result")
 
-async def main():
+
+def main():
     if len(sys.argv) < 2:
         print("Usage: python vscode_plugin.py <action> [args...]")
-        return
-    
+        print("Actions: create, list, run <id>, result <id>, delete <id>, stop")
+        return 1
+
     action = sys.argv[1]
-    manager = HerculesManager()
-    
-    if action == "create":
-        # Simple test creation for VSCode tasks
-        test = manager.create_test_case(
-            name="VSCode Test",
-            description="Test created from VSCode",
-            steps=["Step 1", "Step 2"],
-            expected_outcome="Success"
-        )
-        print(f"Created test: {test.id}")
-        
-    elif action == "list":
-        tests = manager.list_test_cases()
-        for test in tests:
-            print(f"{test.id}: {test.name}")
-            
-    elif action == "run" and len(sys.argv) > 2:
-        test_id = sys.argv[2]
-        result = await manager.run_test(test_id)
-        print(f"Test {test_id}: {result.status}")
-        
-    else:
-        print("Unknown action")
+    arg = sys.argv[2] if len(sys.argv) > 2 else None
+
+    try:
+        if action == "create":
+            # Simple test creation for VSCode tasks
+            test = request(
+                "create",
+                name="VSCode Test",
+                description="Test created from VSCode",
+                steps=["Step 1", "Step 2"],
+                expected_outcome="Success",
+            )
+            print(f"Created test: {test['id']}")
+
+        elif action == "list":
+            for test in request("list"):
+                print(f"{test['id']}: {test['name']}")
+
+        elif action == "run" and arg:
+            result = request("run", test_id=arg)
+            print(f"Test {arg}: {result['status']}")
+
+        elif action == "result" and arg:
+            result = request("result", test_id=arg)
+            print(f"Test {arg}: {result['status'] if result else 'no result'}")
+
+        elif action == "delete" and arg:
+            deleted = request("delete", test_id=arg)
+            print(f"Deleted test: {arg}" if deleted else f"Test not found: {arg}")
+
+        elif action == "stop":
+            try:
+                request("shutdown", autostart=False)
+            except OSError:
+                pass  # not running
+            print("Daemon stopped")
+
+        else:
+            print("Unknown action")
+            return 1
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(main())